@@ -0,0 +1,17 @@
+{% macro reprocessed_dates(date_column, source_relation, lookback_days=var('load_lookback_days')) %}
+    {#-
+        Predicate for the source rows an incremental model rebuilds: every
+        `date_column` value with rows loaded by a dlt load newer than the
+        model's latest _dlt_load_id. Loads up to `lookback_days` older than
+        that are re-checked as well, to pick up late data from loads that
+        finished after the previous dbt run.
+    -#}
+    {{ date_column }} in (
+        select distinct {{ date_column }}
+        from {{ source_relation }}
+        where cast(_dlt_load_id as double) > (
+            select coalesce(max(cast(_dlt_load_id as double)), 0) - {{ lookback_days * 86400 }}
+            from {{ this }}
+        )
+    )
+{% endmacro %}
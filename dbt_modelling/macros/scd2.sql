@@ -0,0 +1,23 @@
+{% macro scd2_effective_from(key_column, valid_from_column) %}
+    {#-
+        Start of the period an SCD2 version applies to. dlt stamps valid_from
+        with the load time, so a key's first version starts at the earliest
+        timestamp instead, making it cover history from before the first load.
+    -#}
+    case
+        when row_number() over (partition by {{ key_column }} order by {{ valid_from_column }}) = 1
+            then cast('1900-01-01 00:00:00' as timestamp(3))
+        else cast({{ valid_from_column }} as timestamp(3))
+    end
+{% endmacro %}
+
+
+{% macro valid_at(version_alias, at) %}
+    {#-
+        Predicate matching the SCD2 version of `version_alias` in effect at the
+        date or timestamp `at`. Versions of a key do not overlap, so it matches
+        at most one version per key.
+    -#}
+    cast({{ at }} as timestamp(3)) >= {{ version_alias }}.effective_from
+    and ({{ version_alias }}.valid_to is null or cast({{ at }} as timestamp(3)) < {{ version_alias }}.valid_to)
+{% endmacro %}
@@ -0,0 +1,9 @@
+with combined as (
+    select
+        sf.plan_id,
+        sf.feature_id,
+        lower(sf.feature_name) as feature_name
+    from {{ ref('stg_features') }} sf
+    inner join {{ ref('stg_plans') }} sp on sf.plan_id = sp.plan_id
+)
+select * from combined
@@ -1,4 +1,13 @@
-with combined as (
+with plan_features as (
+    select
+        plan_id,
+        array_agg(feature_name order by feature_name) as features,
+        count(*) as feature_count
+    from {{ ref('stg_features') }}
+    group by plan_id
+),
+
+combined as (
     select 
         sp.plan_id,
         lower(sp.plan_name) as plan_name,
@@ -7,8 +16,10 @@ with combined as (
         sp.api_limit,
         sp.storage_limit_mb,
         sp.project_limit,
-        lower(sf.feature_name) as feature_name
+        pf.features,
+        coalesce(pf.feature_count, 0) as feature_count
     from {{ ref('stg_plans') }} sp
-    left join {{ ref('stg_features') }} sf on sp.plan_id = sf.plan_id
+    -- Features are aggregated per plan first, so the dimension keeps one row per plan
+    left join plan_features pf on sp.plan_id = pf.plan_id
 )
-select * from combined
\ No newline at end of file
+select * from combined
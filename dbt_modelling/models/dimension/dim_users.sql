@@ -8,6 +8,7 @@ with combined as (
         lower(pl.plan_name) as subscription_plan,
         lower(rf.source_name) as referral_source,
         cast(us.valid_from as timestamp(3)) as valid_from,
+        {{ scd2_effective_from('us.user_id', 'us.valid_from') }} as effective_from,
         cast(us.valid_to as timestamp(3)) as valid_to
     from {{ ref('stg_users') }} us
     left join {{ ref('stg_plans') }} pl on us.plan_id = pl.plan_id
@@ -0,0 +1,4 @@
+{{ config(materialized='view') }}
+
+select * from {{ ref('dim_users') }}
+where valid_to is null
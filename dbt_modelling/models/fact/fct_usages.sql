@@ -1,20 +1,42 @@
-with combined as (
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge' if target.type == 'athena' else 'delete+insert',
+        unique_key=['usage_date', 'user_id', 'subscription_id'],
+        table_type='iceberg',
+        partitioned_by=['month(usage_date)'],
+        on_schema_change='append_new_columns'
+    )
+}}
+
+with usages as (
+    select * from {{ ref('stg_usages') }}
+    {% if is_incremental() %}
+    -- Only rebuild the usage dates touched by loads since the last run
+    where {{ reprocessed_dates('usage_date', ref('stg_usages')) }}
+    {% endif %}
+),
+
+combined as (
     select 
-        sug.usage_date,
-        u.user_id,
-        s.subscription_id,
-        s.plan_name,
+        cast(sug.usage_date as date) as usage_date,
+        sug.user_id,
+        sug.subscription_id,
+        ds.plan_name,
         sum(sug.actions_performed) as total_actions_performed,
         sum(sug.active_minutes) as total_active_minutes,
         sum(sug.api_calls) as total_api_calls,
-        sum(sug.storage_used_mb) as total_storage_used_mb
-    from {{ ref('stg_usages') }} sug
-    left join {{ ref('dim_users') }} du on sug.user_id = du.user_id
-    left join {{ ref('dim_subscriptions') }} ds on sug.subscription_id = ds.subscription_id
+        sum(sug.storage_used_mb) as total_storage_used_mb,
+        max(sug._dlt_load_id) as _dlt_load_id
+    from usages sug
+    -- Point-in-time join: the subscription version in effect on the usage date
+    left join {{ ref('dim_subscriptions') }} ds
+        on sug.subscription_id = ds.subscription_id
+        and {{ valid_at('ds', 'sug.usage_date') }}
     group by 
-        sug.usage_date,
-        du.user_id,
-        ds.subscription_id,
+        cast(sug.usage_date as date),
+        sug.user_id,
+        sug.subscription_id,
         ds.plan_name
 )
-select * from combined
\ No newline at end of file
+select * from combined
@@ -0,0 +1,36 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge' if target.type == 'athena' else 'delete+insert',
+        unique_key=['usage_month', 'plan_name'],
+        table_type='iceberg',
+        partitioned_by=['year(usage_month)'],
+        on_schema_change='append_new_columns'
+    )
+}}
+
+with usages as (
+    select * from {{ ref('fct_usages') }}
+    {% if is_incremental() %}
+    -- Only rebuild the months touched by fact rows loaded since the last run
+    where {{ reprocessed_dates("cast(date_trunc('month', usage_date) as date)", ref('fct_usages')) }}
+    {% endif %}
+),
+
+combined as (
+    select
+        cast(date_trunc('month', usage_date) as date) as usage_month,
+        plan_name,
+        count(distinct user_id) as active_users,
+        count(distinct subscription_id) as active_subscriptions,
+        sum(total_actions_performed) as total_actions_performed,
+        sum(total_active_minutes) as total_active_minutes,
+        sum(total_api_calls) as total_api_calls,
+        sum(total_storage_used_mb) as total_storage_used_mb,
+        max(_dlt_load_id) as _dlt_load_id
+    from usages
+    group by
+        cast(date_trunc('month', usage_date) as date),
+        plan_name
+)
+select * from combined
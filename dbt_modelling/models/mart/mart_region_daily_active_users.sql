@@ -0,0 +1,35 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge' if target.type == 'athena' else 'delete+insert',
+        unique_key=['usage_date', 'region'],
+        table_type='iceberg',
+        partitioned_by=['month(usage_date)'],
+        on_schema_change='append_new_columns'
+    )
+}}
+
+with usages as (
+    select * from {{ ref('fct_usages') }}
+    {% if is_incremental() %}
+    -- Only rebuild the usage dates touched by fact rows loaded since the last run
+    where {{ reprocessed_dates('usage_date', ref('fct_usages')) }}
+    {% endif %}
+),
+
+combined as (
+    select
+        fu.usage_date,
+        du.region,
+        count(distinct fu.user_id) as active_users,
+        max(fu._dlt_load_id) as _dlt_load_id
+    from usages fu
+    -- Point-in-time join: the region the user was in on the usage date
+    left join {{ ref('dim_users') }} du
+        on fu.user_id = du.user_id
+        and {{ valid_at('du', 'fu.usage_date') }}
+    group by
+        fu.usage_date,
+        du.region
+)
+select * from combined
@@ -0,0 +1,53 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge' if target.type == 'athena' else 'delete+insert',
+        unique_key=['usage_month', 'user_id', 'plan_name'],
+        table_type='iceberg',
+        partitioned_by=['usage_month'],
+        on_schema_change='append_new_columns'
+    )
+}}
+
+with usages as (
+    select * from {{ ref('fct_usages') }}
+    {% if is_incremental() %}
+    -- Only rebuild the months touched by fact rows loaded since the last run
+    where {{ reprocessed_dates("cast(date_trunc('month', usage_date) as date)", ref('fct_usages')) }}
+    {% endif %}
+),
+
+monthly as (
+    select
+        cast(date_trunc('month', usage_date) as date) as usage_month,
+        user_id,
+        plan_name,
+        count(*) as usage_days,
+        sum(total_api_calls) as api_used,
+        sum(total_storage_used_mb) as storage_used_mb,
+        max(_dlt_load_id) as _dlt_load_id
+    from usages
+    group by
+        cast(date_trunc('month', usage_date) as date),
+        user_id,
+        plan_name
+),
+
+combined as (
+    -- Plan limits are monthly, so utilisation compares them with the month's totals
+    select
+        mo.usage_month,
+        mo.user_id,
+        mo.plan_name,
+        mo.usage_days,
+        mo.api_used,
+        sp.api_limit,
+        round(100.0 * mo.api_used / nullif(sp.api_limit, 0), 1) as api_usage_pct,
+        mo.storage_used_mb,
+        sp.storage_limit_mb,
+        round(100.0 * mo.storage_used_mb / nullif(sp.storage_limit_mb, 0), 1) as storage_usage_pct,
+        mo._dlt_load_id
+    from monthly mo
+    left join {{ ref('stg_plans') }} sp on mo.plan_name = sp.plan_name
+)
+select * from combined
@@ -7,7 +7,8 @@ with usage_source as (
     {{ adapter.quote("actions_performed") }},
     {{ adapter.quote("api_calls") }},
     {{ adapter.quote("storage_used_mb") }},
-    {{ adapter.quote("active_minutes") }}
+    {{ adapter.quote("active_minutes") }},
+    {{ adapter.quote("_dlt_load_id") }}
   from {{ source('fake_source', 'usages') }}
 )
 select * from usage_source  
\ No newline at end of file
@@ -0,0 +1,12 @@
+-- Every usage row must join to exactly one version of its subscription in
+-- dim_subscriptions. More than one match fans the row out and inflates the
+-- sums in fct_usages; no match leaves its plan_name empty.
+select
+    sug.usage_id,
+    count(ds.subscription_id) as matching_versions
+from {{ ref('stg_usages') }} sug
+left join {{ ref('dim_subscriptions') }} ds
+    on sug.subscription_id = ds.subscription_id
+    and {{ valid_at('ds', 'sug.usage_date') }}
+group by sug.usage_id
+having count(ds.subscription_id) != 1
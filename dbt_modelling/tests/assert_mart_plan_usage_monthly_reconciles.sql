@@ -0,0 +1,28 @@
+-- The monthly plan totals must add up to the daily totals in fct_usages.
+-- A mismatch means a month was not rebuilt after its fact rows changed.
+with fact as (
+    select
+        cast(date_trunc('month', usage_date) as date) as usage_month,
+        plan_name,
+        sum(total_actions_performed) as total_actions_performed,
+        sum(total_active_minutes) as total_active_minutes,
+        sum(total_api_calls) as total_api_calls,
+        sum(total_storage_used_mb) as total_storage_used_mb
+    from {{ ref('fct_usages') }}
+    group by
+        cast(date_trunc('month', usage_date) as date),
+        plan_name
+)
+select
+    coalesce(fa.usage_month, mt.usage_month) as usage_month,
+    coalesce(fa.plan_name, mt.plan_name) as plan_name
+from fact fa
+full outer join {{ ref('mart_plan_usage_monthly') }} mt
+    on fa.usage_month = mt.usage_month
+    and fa.plan_name = mt.plan_name
+where fa.usage_month is null
+    or mt.usage_month is null
+    or fa.total_actions_performed != mt.total_actions_performed
+    or fa.total_active_minutes != mt.total_active_minutes
+    or fa.total_api_calls != mt.total_api_calls
+    or abs(fa.total_storage_used_mb - mt.total_storage_used_mb) > 0.01
@@ -0,0 +1,26 @@
+-- Every active user counts in exactly one region per day, so the regions'
+-- active users must add up to the distinct users in fct_usages on that day.
+with fact as (
+    select
+        usage_date,
+        count(distinct user_id) as active_users
+    from {{ ref('fct_usages') }}
+    group by usage_date
+),
+
+mart as (
+    select
+        usage_date,
+        sum(active_users) as active_users
+    from {{ ref('mart_region_daily_active_users') }}
+    group by usage_date
+)
+select
+    coalesce(fa.usage_date, mt.usage_date) as usage_date,
+    fa.active_users as fact_active_users,
+    mt.active_users as mart_active_users
+from fact fa
+full outer join mart mt on fa.usage_date = mt.usage_date
+where fa.active_users is null
+    or mt.active_users is null
+    or fa.active_users != mt.active_users
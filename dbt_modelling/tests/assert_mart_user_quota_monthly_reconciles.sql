@@ -0,0 +1,27 @@
+-- The monthly API and storage usage per user must add up to the daily totals
+-- in fct_usages.
+with fact as (
+    select
+        cast(date_trunc('month', usage_date) as date) as usage_month,
+        user_id,
+        plan_name,
+        sum(total_api_calls) as api_used,
+        sum(total_storage_used_mb) as storage_used_mb
+    from {{ ref('fct_usages') }}
+    group by
+        cast(date_trunc('month', usage_date) as date),
+        user_id,
+        plan_name
+)
+select
+    coalesce(fa.usage_month, mt.usage_month) as usage_month,
+    coalesce(fa.user_id, mt.user_id) as user_id
+from fact fa
+full outer join {{ ref('mart_user_quota_monthly') }} mt
+    on fa.usage_month = mt.usage_month
+    and fa.user_id = mt.user_id
+    and fa.plan_name is not distinct from mt.plan_name
+where fa.usage_month is null
+    or mt.usage_month is null
+    or fa.api_used != mt.api_used
+    or abs(fa.storage_used_mb - mt.storage_used_mb) > 0.01
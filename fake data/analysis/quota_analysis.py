@@ -0,0 +1,108 @@
+"""
+Quota analysis of generated usage data
+
+Usage is totalled per subscription with a single groupby and joined to the
+subscriptions once; plan names and limits are looked up by plan_id from the
+reference data arrays, so the report scales to millions of usage rows.
+"""
+import numpy as np
+import pandas as pd
+from data_generation.reference_data import reference_data
+
+HIT_LIMIT_PCT = 99.0  # Utilisation at which a subscription counts as having hit its quota
+
+# Utilisation buckets as (label, lower bound inclusive), from highest to lowest
+UTILISATION_BUCKETS = [
+    ('90-100%', 90),
+    ('70-90%', 70),
+    ('50-70%', 50),
+    ('below 50%', 0),
+]
+
+USAGE_METRICS = ['actions_performed', 'storage_used_mb', 'api_calls', 'active_minutes']
+
+
+def quota_utilisation(
+    usage_df: pd.DataFrame,
+    subscriptions_df: pd.DataFrame,
+    hit_limit_pct: float = HIT_LIMIT_PCT,
+) -> pd.DataFrame:
+    """
+    API and storage utilisation of each subscription against its plan's quota
+
+    Args:
+        usage_df: Usage records, as from generate_usage()
+        subscriptions_df: Subscriptions the usage belongs to
+        hit_limit_pct: Utilisation at which a subscription counts as having hit its quota
+
+    Returns:
+        DataFrame with one row per subscription on a known plan that has usage
+    """
+    plans = reference_data().plans
+
+    totals = usage_df.groupby('subscription_id', sort=False).agg(
+        usage_days=('usage_id', 'size'),
+        api_used=('api_calls', 'sum'),
+        storage_used=('storage_used_mb', 'sum'),
+    )
+    subs = subscriptions_df[plans.contains(subscriptions_df['plan_id'].to_numpy())]
+    report = subs[['subscription_id', 'user_id', 'plan_id']].merge(totals, left_on='subscription_id', right_index=True)
+
+    plan_ids = report['plan_id'].to_numpy()
+    report['plan_name'] = plans.plan_name[plan_ids]
+    report['api_limit'] = plans.api_limit[plan_ids]
+    report['storage_limit'] = plans.storage_limit_mb[plan_ids]
+
+    api_pct = report['api_used'] / report['api_limit'] * 100
+    storage_pct = report['storage_used'] / report['storage_limit'] * 100
+    report['api_usage_pct'] = api_pct.round(1)
+    report['storage_used'] = report['storage_used'].round(2)
+    report['storage_usage_pct'] = storage_pct.round(1)
+    report['hit_limit'] = (api_pct >= hit_limit_pct) | (storage_pct >= hit_limit_pct)
+
+    return report[[
+        'subscription_id', 'user_id', 'plan_id', 'plan_name', 'usage_days',
+        'api_used', 'api_limit', 'api_usage_pct',
+        'storage_used', 'storage_limit', 'storage_usage_pct',
+        'hit_limit',
+    ]].reset_index(drop=True)
+
+
+def utilisation_distribution(quota_df: pd.DataFrame, column: str = 'api_usage_pct') -> pd.Series:
+    """
+    Number of subscriptions per utilisation bucket
+
+    Args:
+        quota_df: Report from quota_utilisation()
+        column: Utilisation column to bucket
+
+    Returns:
+        Subscription counts indexed by bucket label, highest bucket first
+    """
+    labels = [label for label, _ in UTILISATION_BUCKETS]
+    lower_bounds = np.array([bound for _, bound in UTILISATION_BUCKETS])
+
+    # Index of the first (highest) bucket whose lower bound the value reaches
+    bucket = np.argmax(quota_df[column].to_numpy()[:, None] >= lower_bounds, axis=1)
+    counts = np.bincount(bucket, minlength=len(labels))
+    return pd.Series(counts, index=labels, name='subscriptions')
+
+
+def usage_by_plan(usage_df: pd.DataFrame, subscriptions_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Usage statistics per plan, taking each usage record's plan from its subscription
+
+    Args:
+        usage_df: Usage records, as from generate_usage()
+        subscriptions_df: Subscriptions the usage belongs to
+
+    Returns:
+        DataFrame indexed by plan_id with record counts, means and totals
+    """
+    plan_ids = usage_df['subscription_id'].map(subscriptions_df.set_index('subscription_id')['plan_id'])
+    return usage_df[USAGE_METRICS].groupby(plan_ids.rename('plan_id')).agg({
+        'actions_performed': ['count', 'mean'],
+        'storage_used_mb': ['mean', 'sum'],
+        'api_calls': ['mean', 'sum'],
+        'active_minutes': 'mean',
+    }).round(2)
@@ -0,0 +1,305 @@
+"""
+End-to-end benchmark of the ELT chain
+
+Runs the whole path locally at a chosen scale and measures every stage:
+
+    generate   FakerETL generates the dataset
+    seed       DLT loads it into SQLite (or Postgres with --database-url)
+    serve      fastapi/main.py starts under uvicorn on that database
+    extract    rest_athena_pipeline.py pages through the API into DuckDB
+               (or a local Iceberg lake with --destination filesystem)
+    transform  dbt builds the project on dbt-duckdb against the extracted data
+
+The rows/s and seconds of serve are its startup time; its peak RSS is the
+server's while it serves the extraction. Commands are measured together with
+their child processes. Results use the same format as benchmark_generation.py,
+so --baseline compares them against an earlier run in the same way.
+
+Usage:
+    python benchmark_e2e.py --users 1000 --output e2e.json
+    python benchmark_e2e.py --users 1000 --baseline e2e.json
+"""
+import sys
+import os
+import json
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+import psutil
+import requests
+import dlt
+
+# Add parent directory to path to allow imports from sibling directories
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.benchmark_generation import PeakRSS, compare, _environment, DEFAULT_TOLERANCE, SEED
+from pipeline.etl_pipeline import FakerETL, PIPELINE_NAME, TABLE_HINTS, UPSERT_DISPOSITION, faker_source
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+FASTAPI_DIR = os.path.join(REPO_DIR, 'fastapi')
+PIPELINE_DIR = os.path.join(REPO_DIR, 'pipeline')
+DBT_PROJECT_DIR = os.path.join(REPO_DIR, 'dbt_modelling')
+
+DESTINATIONS = ['duckdb', 'filesystem']
+EXTRACT_PIPELINE_NAME = 'benchmark_e2e'
+EXTRACT_DATASET_NAME = 'benchmark_e2e_data'
+API_USERNAME = 'benchmark'
+API_PASSWORD = 'benchmark'
+SERVER_STARTUP_TIMEOUT = 60  # Seconds to wait for the API to answer
+
+
+def _result(stage: str, user_count: int, rows: Optional[int], seconds: float, peak_rss: int) -> Dict[str, Any]:
+    return {
+        'case': stage,
+        'users': user_count,
+        'rows': rows,
+        'seconds': round(seconds, 4),
+        'rows_per_s': round(rows / seconds, 1) if rows and seconds else None,
+        'peak_rss_mb': round(peak_rss / 1024 ** 2, 1),
+    }
+
+
+def seed(user_count: int, database_url: str, workdir: str) -> List[Dict[str, Any]]:
+    """
+    Generates the dataset and loads it into the API's database.
+
+    Args:
+        user_count: Number of users to generate
+        database_url: SQLAlchemy URL of a SQLite or Postgres database
+        workdir: Directory holding the DLT pipeline state
+
+    Returns:
+        Results of the generate and seed stages
+    """
+    etl = FakerETL(user_count=user_count, seed=SEED)
+    is_sqlite = database_url.startswith('sqlite')
+    etl.pipeline = dlt.pipeline(
+        pipeline_name=PIPELINE_NAME,
+        destination=dlt.destinations.sqlalchemy(database_url) if is_sqlite else dlt.destinations.postgres(database_url),
+        dataset_name=PIPELINE_NAME,
+        pipelines_dir=os.path.join(workdir, 'seed_pipelines'),
+    )
+
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        etl.extract()
+        seconds = time.perf_counter() - start
+    rows = sum(len(df) for df in etl.data.values())
+    results = [_result('generate', user_count, rows, seconds, rss.peak)]
+
+    source = faker_source(etl.data)
+    if is_sqlite:
+        # SQLite supports delete-insert and scd2 merges only
+        for key, hints in TABLE_HINTS.items():
+            if hints['write_disposition'] is UPSERT_DISPOSITION and key in source.resources:
+                source.resources[key].apply_hints(write_disposition={"disposition": "merge", "strategy": "delete-insert"})
+
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        etl._run(source)
+        seconds = time.perf_counter() - start
+    results.append(_result('seed', user_count, rows, seconds, rss.peak))
+    return results
+
+
+def api_env(database_url: str) -> Dict[str, str]:
+    """Environment fastapi/main.py runs with to serve `database_url`."""
+    return {
+        **os.environ,
+        'BASIC_AUTH_USERNAME': API_USERNAME,
+        'BASIC_AUTH_PASSWORD': API_PASSWORD,
+        'RAILWAY_DATABASE_URL': database_url,
+        'LOCAL_DATABASE_URL': database_url,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _run_command(stage: str, command: List[str], cwd: str, env: Dict[str, str], workdir: str):
+    """
+    Runs `command` as a stage, logging its output to <workdir>/<stage>.log.
+
+    Returns:
+        Wall time and peak RSS of the command and its child processes
+    """
+    log_path = os.path.join(workdir, f'{stage}.log')
+    print(f"[{datetime.now()}] Running {stage}: {' '.join(command)}")
+    with open(log_path, 'w') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        with PeakRSS(process=psutil.Process(process.pid)) as rss:
+            returncode = process.wait()
+        seconds = time.perf_counter() - start
+
+    if returncode != 0:
+        raise RuntimeError(f"{stage} failed with exit code {returncode}, see {log_path}")
+    return seconds, rss.peak
+
+
+def start_server(env: Dict[str, str], port: int, workdir: str):
+    """
+    Starts the API under uvicorn and waits until it answers.
+
+    Returns:
+        The server process and its startup time
+    """
+    log_path = os.path.join(workdir, 'serve.log')
+    command = [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', str(port)]
+    print(f"[{datetime.now()}] Starting API: {' '.join(command)}")
+    start = time.perf_counter()
+    with open(log_path, 'w') as log:
+        server = subprocess.Popen(command, cwd=FASTAPI_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    url = f'http://127.0.0.1:{port}/regions'
+    params = {'username': API_USERNAME, 'password': API_PASSWORD}
+    while time.perf_counter() - start < SERVER_STARTUP_TIMEOUT:
+        if server.poll() is not None:
+            raise RuntimeError(f"API exited with code {server.returncode}, see {log_path}")
+        try:
+            if requests.get(url, params=params, timeout=1).status_code == 200:
+                return server, time.perf_counter() - start
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.1)
+
+    server.terminate()
+    raise RuntimeError(f"API did not answer within {SERVER_STARTUP_TIMEOUT}s, see {log_path}")
+
+
+def _extracted_rows(workdir: str) -> int:
+    """Rows normalized by the last run of the extraction pipeline, excluding DLT's own tables."""
+    pipeline = dlt.attach(EXTRACT_PIPELINE_NAME, pipelines_dir=os.path.join(workdir, 'dlt', 'pipelines'))
+    row_counts = pipeline.last_trace.last_normalize_info.row_counts
+    return sum(rows for table, rows in row_counts.items() if not table.startswith('_dlt'))
+
+
+def run_e2e(
+    user_count: int,
+    workdir: str,
+    database_url: Optional[str] = None,
+    destination: str = 'duckdb',
+    dbt_project_dir: str = DBT_PROJECT_DIR,
+    dbt_executable: str = 'dbt',
+) -> Dict[str, Any]:
+    """
+    Runs every stage of the chain once.
+
+    Args:
+        user_count: Number of users to generate
+        workdir: Directory for the databases, pipeline state and stage logs
+        database_url: Database the API serves (defaults to a SQLite file in `workdir`)
+        destination: Destination of the extraction, 'duckdb' or 'filesystem';
+            the dbt stage only runs on duckdb
+        dbt_project_dir: dbt project to build
+        dbt_executable: dbt command, with dbt-duckdb installed
+
+    Returns:
+        Benchmark report with environment metadata and one result per stage
+    """
+    database_url = database_url or f"sqlite:///{os.path.join(workdir, 'api.db')}"
+    lake_path = os.path.join(workdir, 'lake.duckdb')
+    env = {
+        **api_env(database_url),
+        'ATHENA_DESTINATION': destination,
+        'ATHENA_PIPELINE_NAME': EXTRACT_PIPELINE_NAME,
+        'ATHENA_DATASET_NAME': EXTRACT_DATASET_NAME,
+        'DLT_DATA_DIR': os.path.join(workdir, 'dlt'),
+        'DESTINATION__DUCKDB__CREDENTIALS': lake_path,
+        'DESTINATION__FILESYSTEM__BUCKET_URL': f"file://{os.path.join(workdir, 'lake')}",
+        'DBT_DUCKDB_PATH': lake_path,
+        'DBT_SOURCE_SCHEMA': EXTRACT_DATASET_NAME,
+    }
+
+    print(f"[{datetime.now()}] Generating and seeding {user_count} users...")
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        results = executor.submit(seed, user_count, database_url, workdir).result()
+
+    port = free_port()
+    server, startup_seconds = start_server(env, port, workdir)
+    try:
+        env['APP_URL'] = f'http://127.0.0.1:{port}'
+        with PeakRSS(process=psutil.Process(server.pid)) as server_rss:
+            seconds, peak = _run_command(
+                'extract', [sys.executable, 'rest_athena_pipeline.py'], PIPELINE_DIR, env, workdir
+            )
+    finally:
+        server.terminate()
+        server.wait()
+    rows = _extracted_rows(workdir)
+    results.append(_result('serve', user_count, None, startup_seconds, server_rss.peak))
+    results.append(_result('extract', user_count, rows, seconds, peak))
+
+    if destination == 'duckdb':
+        dbt_args = ['--project-dir', dbt_project_dir, '--profiles-dir', dbt_project_dir]
+        if not os.path.isdir(os.path.join(dbt_project_dir, 'dbt_packages')):
+            subprocess.run([dbt_executable, 'deps', *dbt_args], env=env, check=True)
+        seconds, peak = _run_command('transform', [
+            dbt_executable, 'build', *dbt_args, '--target', 'duckdb',
+            '--target-path', os.path.join(workdir, 'dbt_target'), '--log-path', os.path.join(workdir, 'dbt_logs'),
+        ], dbt_project_dir, env, workdir)
+        results.append(_result('transform', user_count, rows, seconds, peak))
+    else:
+        print("⚠ Skipping transform: dbt only runs on the duckdb destination")
+
+    for result in results:
+        rows_per_s = '' if result['rows_per_s'] is None else f", {result['rows_per_s']} rows/s"
+        print(
+            f"[{datetime.now()}] ✓ {result['case']}: {result['seconds']}s{rows_per_s}, "
+            f"peak RSS {result['peak_rss_mb']} MB"
+        )
+
+    meta = {
+        **_environment(),
+        'database': database_url.split(':')[0],
+        'destination': destination,
+    }
+    return {'meta': meta, 'results': results}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the ELT chain from generation to dbt")
+    parser.add_argument("--users", type=int, default=1000, help="Number of users to generate")
+    parser.add_argument("--database-url", default=None, help="Postgres URL the API serves (defaults to SQLite)")
+    parser.add_argument("--destination", choices=DESTINATIONS, default='duckdb', help="Destination of the extraction")
+    parser.add_argument("--dbt-project-dir", default=DBT_PROJECT_DIR, help="dbt project to build")
+    parser.add_argument("--dbt", default='dbt', help="dbt executable with dbt-duckdb installed")
+    parser.add_argument("--workdir", default=None, help="Keep databases and logs here instead of a temporary directory")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="Compare the results against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='fake-data-e2e-')
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        report = run_e2e(args.users, workdir, args.database_url, args.destination, args.dbt_project_dir, args.dbt)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[{datetime.now()}] ✓ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
@@ -0,0 +1,304 @@
+"""
+Benchmarks for data generation throughput and memory
+
+Measures rows/s and peak RSS of each generator and of FakerETL.extract()/load()
+at several user counts. Every case runs in a fresh process, so peak memory is
+not inflated by earlier cases, and only the measured call is timed: inputs such
+as the users for generate_subscriptions are generated beforehand.
+
+Results are written as JSON. Passing --baseline compares them against an
+earlier results file and exits with status 1 if any case got slower or used
+more memory than the tolerance allows. Small cases finish in milliseconds, so
+use --repeat to keep the fastest of several runs when comparing them.
+
+Usage:
+    python benchmark_generation.py --sizes 1000 100000 --output results.json
+    python benchmark_generation.py --sizes 1000 --baseline results.json
+"""
+import sys
+import os
+import json
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import psutil
+import dlt
+
+# Add parent directory to path to allow imports from sibling directories
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data_generation.generate_users import generate_users
+from data_generation.generate_subscriptions import generate_subscriptions
+from data_generation.generate_usage import generate_usage
+from analysis.quota_analysis import quota_utilisation
+from pipeline.etl_pipeline import FakerETL, PIPELINE_NAME
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_TOLERANCE = 0.2  # Allowed relative drop in rows/s or growth in peak RSS
+SEED = 42
+RSS_SAMPLE_INTERVAL = 0.01  # Seconds between RSS samples
+
+
+class PeakRSS:
+    """
+    Samples the RSS of a process in a background thread and keeps the peak.
+
+    Measures the current process by default. A given process is measured
+    together with its child processes, as commands like dlt or dbt fan out.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL, process: Optional[psutil.Process] = None):
+        self.interval = interval
+        self.peak = 0
+        self._process = process or psutil.Process()
+        self._children = process is not None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _rss(self) -> int:
+        processes = [self._process]
+        try:
+            if self._children:
+                processes += self._process.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return 0
+
+        rss = 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+            except psutil.NoSuchProcess:
+                pass
+        return rss
+
+    def _sample(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> 'PeakRSS':
+        self.peak = self._rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._rss())
+
+
+def _case_users(user_count: int) -> Tuple[Callable[[], int], Callable[[], None]]:
+    return lambda: len(generate_users(user_count, rng=np.random.default_rng(SEED))), lambda: None
+
+
+def _case_subscriptions(user_count: int) -> Tuple[Callable[[], int], Callable[[], None]]:
+    rng = np.random.default_rng(SEED)
+    users = generate_users(user_count, rng=rng)
+    return lambda: len(generate_subscriptions(users, rng=np.random.default_rng(SEED))), lambda: None
+
+
+def _case_usage(user_count: int) -> Tuple[Callable[[], int], Callable[[], None]]:
+    rng = np.random.default_rng(SEED)
+    users = generate_users(user_count, rng=rng)
+    subscriptions = generate_subscriptions(users, rng=rng)
+    return lambda: len(generate_usage(users, subscriptions, rng=np.random.default_rng(SEED))), lambda: None
+
+
+def _case_quota_analysis(user_count: int) -> Tuple[Callable[[], int], Callable[[], None]]:
+    rng = np.random.default_rng(SEED)
+    users = generate_users(user_count, rng=rng)
+    subscriptions = generate_subscriptions(users, rng=rng)
+    usage = generate_usage(users, subscriptions, rng=rng)
+
+    def run() -> int:
+        quota_utilisation(usage, subscriptions)
+        return len(usage)
+    return run, lambda: None
+
+
+def _case_extract(user_count: int) -> Tuple[Callable[[], int], Callable[[], None]]:
+    etl = FakerETL(user_count=user_count, seed=SEED)
+
+    def run() -> int:
+        etl.extract()
+        return sum(len(df) for df in etl.data.values())
+    return run, lambda: None
+
+
+def _case_load(user_count: int) -> Tuple[Callable[[], int], Callable[[], None]]:
+    # Loads into a throwaway DuckDB database so benchmarks never touch real pipeline state
+    workdir = tempfile.TemporaryDirectory(prefix='fake-data-benchmark-')
+    etl = FakerETL(user_count=user_count, seed=SEED)
+    etl.pipeline = dlt.pipeline(
+        pipeline_name=PIPELINE_NAME,
+        destination=dlt.destinations.duckdb(os.path.join(workdir.name, 'benchmark.duckdb')),
+        dataset_name=PIPELINE_NAME,
+        pipelines_dir=os.path.join(workdir.name, 'pipelines'),
+    )
+    etl.extract()
+
+    def run() -> int:
+        etl.load()
+        return sum(len(df) for df in etl.data.values())
+    return run, workdir.cleanup
+
+
+# Case name -> setup function returning (measured call returning its row count, cleanup).
+# Measured calls draw from a freshly seeded generator, so repeated runs produce the same rows.
+CASES: Dict[str, Callable[[int], Tuple[Callable[[], int], Callable[[], None]]]] = {
+    'generate_users': _case_users,
+    'generate_subscriptions': _case_subscriptions,
+    'generate_usage': _case_usage,
+    'quota_analysis': _case_quota_analysis,
+    'etl_extract': _case_extract,
+    'etl_load': _case_load,
+}
+
+
+def run_case(case: str, user_count: int, repeat: int = 1) -> Dict[str, Any]:
+    """
+    Runs one benchmark case in the current process.
+
+    Args:
+        case: Name of the case in CASES
+        user_count: Number of users the case works on
+        repeat: Number of times the measured call is run; the fastest run counts
+
+    Returns:
+        Result with the row count, wall time, rows/s and peak RSS of the measured call
+    """
+    measured, cleanup = CASES[case](user_count)
+    seconds = float('inf')
+    try:
+        with PeakRSS() as rss:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                rows = measured()
+                seconds = min(seconds, time.perf_counter() - start)
+    finally:
+        cleanup()
+
+    return {
+        'case': case,
+        'users': user_count,
+        'rows': rows,
+        'seconds': round(seconds, 4),
+        'rows_per_s': round(rows / seconds, 1) if seconds else None,
+        'peak_rss_mb': round(rss.peak / 1024 ** 2, 1),
+    }
+
+
+def run_benchmarks(cases: List[str], sizes: List[int], repeat: int = 1) -> Dict[str, Any]:
+    """
+    Runs every case at every size, each in a fresh process.
+
+    Args:
+        cases: Names of the cases to run
+        sizes: User counts to run every case at
+        repeat: Number of runs per case; the fastest run counts
+
+    Returns:
+        Benchmark report with environment metadata and one result per case and size
+    """
+    results = []
+    for user_count in sizes:
+        for case in cases:
+            print(f"[{datetime.now()}] Running {case} with {user_count} users...")
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                result = executor.submit(run_case, case, user_count, repeat).result()
+            print(
+                f"[{datetime.now()}] ✓ {case}: {result['rows']} rows in {result['seconds']}s "
+                f"({result['rows_per_s']} rows/s, peak RSS {result['peak_rss_mb']} MB)"
+            )
+            results.append(result)
+
+    return {'meta': _environment(), 'results': results}
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'total_memory_mb': round(psutil.virtual_memory().total / 1024 ** 2),
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compares a benchmark report against a baseline report.
+
+    Only cases present in both reports are compared.
+
+    Args:
+        report: Current benchmark report
+        baseline: Earlier benchmark report
+        tolerance: Allowed relative drop in rows/s and growth in peak RSS
+
+    Returns:
+        Description of every regression found (empty if none)
+    """
+    previous = {(r['case'], r['users']): r for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        base = previous.get((result['case'], result['users']))
+        if base is None:
+            continue
+
+        label = f"{result['case']} @ {result['users']} users"
+        if base['rows_per_s'] and result['rows_per_s'] < base['rows_per_s'] * (1 - tolerance):
+            regressions.append(
+                f"{label}: {result['rows_per_s']} rows/s vs baseline {base['rows_per_s']} rows/s"
+            )
+        if result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(
+                f"{label}: peak RSS {result['peak_rss_mb']} MB vs baseline {base['peak_rss_mb']} MB"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark data generation throughput and memory")
+    parser.add_argument("--sizes", type=int, nargs='+', default=DEFAULT_SIZES, help="User counts to benchmark")
+    parser.add_argument("--cases", nargs='+', choices=list(CASES), default=list(CASES), help="Cases to run")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; the fastest run counts")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="Compare the results against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.cases, args.sizes, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[{datetime.now()}] ✓ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
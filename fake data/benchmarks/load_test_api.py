@@ -0,0 +1,321 @@
+"""
+Load test of the FastAPI service
+
+Replays a weighted mix of API calls from concurrent virtual users and steps the
+concurrency up, reporting latency percentiles, throughput and error rates at
+every step:
+
+    lookup     one of the small lookup endpoints (/regions, /plans, ...)
+    deep_page  a random page from the last pages of /usages
+    crawl      a paginated crawl of /users, /subscriptions or /usages from
+               page 1, as rest_athena_pipeline.py does; every page is a request
+
+Without --url, a SQLite database is seeded with FakerETL and served with
+fastapi/main.py under uvicorn, as in benchmark_e2e.py. The capacity is the
+highest concurrency whose p95 latency and error rate stay within --slo-ms and
+--max-error-rate. Passing --baseline compares throughput and p95 latency at
+each concurrency against an earlier results file and exits with status 1 on a
+regression beyond the tolerance.
+
+Usage:
+    python load_test_api.py --users 1000 --concurrency 1 4 16 64 --output load.json
+    python load_test_api.py --url http://127.0.0.1:8000 --baseline load.json
+"""
+import sys
+import os
+import json
+import asyncio
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+import httpx
+import numpy as np
+
+# Add parent directory to path to allow imports from sibling directories
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.benchmark_generation import _environment, DEFAULT_TOLERANCE
+from benchmarks.benchmark_e2e import seed, api_env, free_port, start_server, API_USERNAME, API_PASSWORD
+from table_registry import TABLES
+
+DEFAULT_CONCURRENCY = [1, 4, 16, 64]
+DEFAULT_DURATION = 20  # Seconds per concurrency step
+DEFAULT_SLO_MS = 500  # p95 latency a step must stay within to count towards capacity
+DEFAULT_MAX_ERROR_RATE = 0.01
+REQUEST_TIMEOUT = 30
+
+LOOKUP_PATHS = [table.api_path for table in TABLES.values() if not table.paginated]
+CRAWL_PATHS = [table.api_path for table in TABLES.values() if table.paginated]
+USAGE_PATH = TABLES['usage'].api_path
+PAGE_SIZES = {table.api_path: table.page_size for table in TABLES.values()}  # Page sizes of rest_athena_pipeline.py
+DEEP_PAGE_FRACTION = 0.2  # Deep pages are drawn from this last fraction of /usages
+MAX_CRAWL_PAGES = 20  # Pages a crawl reads before starting over
+
+# Scenario -> relative weight in the call mix
+DEFAULT_MIX = {'lookup': 0.5, 'deep_page': 0.3, 'crawl': 0.2}
+
+
+@dataclass
+class StepStats:
+    """Requests made during one concurrency step."""
+    latencies: Dict[str, List[float]] = field(default_factory=dict)  # Seconds per request, by scenario
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, scenario: str, seconds: float, ok: bool) -> None:
+        self.latencies.setdefault(scenario, []).append(seconds)
+        if not ok:
+            self.errors[scenario] = self.errors.get(scenario, 0) + 1
+
+    @staticmethod
+    def _summary(latencies: List[float], errors: int, seconds: float) -> Dict[str, Any]:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000 if latencies else (None,) * 3
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'error_rate': round(errors / len(latencies), 4) if latencies else None,
+            'throughput_rps': round(len(latencies) / seconds, 1),
+            'p50_ms': None if p50 is None else round(p50, 1),
+            'p95_ms': None if p95 is None else round(p95, 1),
+            'p99_ms': None if p99 is None else round(p99, 1),
+        }
+
+    def summary(self, concurrency: int, seconds: float) -> Dict[str, Any]:
+        all_latencies = [latency for latencies in self.latencies.values() for latency in latencies]
+        return {
+            'concurrency': concurrency,
+            'seconds': round(seconds, 2),
+            **self._summary(all_latencies, sum(self.errors.values()), seconds),
+            'scenarios': {
+                scenario: self._summary(latencies, self.errors.get(scenario, 0), seconds)
+                for scenario, latencies in sorted(self.latencies.items())
+            },
+        }
+
+
+class VirtualUser:
+    """Calls the API in a loop, picking each call from the scenario mix."""
+
+    def __init__(self, client: httpx.AsyncClient, stats: StepStats, mix: Dict[str, float], usage_pages: int, rng: random.Random):
+        self.client = client
+        self.stats = stats
+        self.scenarios = list(mix)
+        self.weights = list(mix.values())
+        self.usage_pages = usage_pages
+        self.rng = rng
+
+    async def _get(self, scenario: str, path: str, **params) -> Optional[dict]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.get(f'/{path}', params=params)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.stats.record(scenario, time.perf_counter() - start, ok)
+        return response.json() if ok else None
+
+    async def lookup(self) -> None:
+        await self._get('lookup', self.rng.choice(LOOKUP_PATHS))
+
+    async def deep_page(self) -> None:
+        first_deep_page = max(1, int(self.usage_pages * (1 - DEEP_PAGE_FRACTION)))
+        page = self.rng.randint(first_deep_page, self.usage_pages)
+        await self._get('deep_page', USAGE_PATH, page=page, size=PAGE_SIZES[USAGE_PATH])
+
+    async def crawl(self) -> None:
+        path = self.rng.choice(CRAWL_PATHS)
+        for page in range(1, MAX_CRAWL_PAGES + 1):
+            body = await self._get('crawl', path, page=page, size=PAGE_SIZES[path])
+            if not body or page >= body.get('pages', 0):
+                break
+
+    async def run(self, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            scenario = self.rng.choices(self.scenarios, self.weights)[0]
+            await getattr(self, scenario)()
+
+
+async def _usage_pages(client: httpx.AsyncClient) -> int:
+    response = await client.get(f'/{USAGE_PATH}', params={'page': 1, 'size': PAGE_SIZES[USAGE_PATH]})
+    response.raise_for_status()
+    return max(1, response.json()['pages'])
+
+
+async def run_step(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    mix: Dict[str, float],
+    call_seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Runs `concurrency` virtual users against the API for `duration` seconds.
+
+    Args:
+        base_url: URL of the API
+        concurrency: Number of virtual users calling the API at the same time
+        duration: Seconds the step lasts; calls in flight at the end still count
+        mix: Relative weight of each scenario
+        call_seed: Seed of the virtual users' call choices
+
+    Returns:
+        Latency percentiles, throughput and error rate of the step, overall and per scenario
+    """
+    auth = {'username': API_USERNAME, 'password': API_PASSWORD}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, params=auth, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+        usage_pages = await _usage_pages(client)
+        stats = StepStats()
+        users = [VirtualUser(client, stats, mix, usage_pages, random.Random(call_seed + i)) for i in range(concurrency)]
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user.run(start + duration) for user in users))
+        return stats.summary(concurrency, time.perf_counter() - start)
+
+
+def capacity(steps: List[Dict[str, Any]], slo_ms: float, max_error_rate: float) -> Optional[int]:
+    """Highest concurrency whose p95 latency and error rate stay within the limits."""
+    passing = [
+        step['concurrency'] for step in steps
+        if step['requests'] and step['p95_ms'] <= slo_ms and step['error_rate'] <= max_error_rate
+    ]
+    return max(passing) if passing else None
+
+
+def run_load_test(
+    base_url: str,
+    concurrency_levels: List[int],
+    duration: float = DEFAULT_DURATION,
+    mix: Dict[str, float] = DEFAULT_MIX,
+    slo_ms: float = DEFAULT_SLO_MS,
+    max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+) -> Dict[str, Any]:
+    """
+    Runs one step per concurrency level, lowest first.
+
+    Returns:
+        Load test report with environment metadata, the steps and the capacity
+    """
+    steps = []
+    for concurrency in sorted(concurrency_levels):
+        print(f"[{datetime.now()}] Running {concurrency} virtual user(s) for {duration}s...")
+        step = asyncio.run(run_step(base_url, concurrency, duration, mix))
+        print(
+            f"[{datetime.now()}] ✓ {concurrency} user(s): {step['throughput_rps']} req/s, "
+            f"p50 {step['p50_ms']} ms, p95 {step['p95_ms']} ms, p99 {step['p99_ms']} ms, "
+            f"errors {step['errors']}/{step['requests']}"
+        )
+        steps.append(step)
+
+    print_steps(steps)
+    result = capacity(steps, slo_ms, max_error_rate)
+    print(f"\nCapacity: {result if result is not None else 'none'} concurrent user(s) within p95 {slo_ms} ms and {max_error_rate:.1%} errors")
+
+    meta = {**_environment(), 'duration': duration, 'mix': mix, 'slo_ms': slo_ms, 'max_error_rate': max_error_rate}
+    return {'meta': meta, 'steps': steps, 'capacity': result}
+
+
+def print_steps(steps: List[Dict[str, Any]]) -> None:
+    """Prints the latency, throughput and errors of every step and scenario."""
+    print(f"\n{'users':>6} {'scenario':<10} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for step in steps:
+        for scenario, summary in [('all', step), *step['scenarios'].items()]:
+            if not summary['requests']:
+                continue
+            print(
+                f"{step['concurrency']:>6} {scenario:<10} {summary['requests']:>9} {summary['throughput_rps']:>9} "
+                f"{summary['p50_ms']:>9} {summary['p95_ms']:>9} {summary['p99_ms']:>9} {summary['error_rate']:>8.2%}"
+            )
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compares a load test report against a baseline report.
+
+    Only concurrency levels present in both reports are compared.
+
+    Args:
+        report: Current load test report
+        baseline: Earlier load test report
+        tolerance: Allowed relative drop in throughput and growth in p95 latency
+
+    Returns:
+        Description of every regression found (empty if none)
+    """
+    previous = {step['concurrency']: step for step in baseline['steps']}
+    regressions = []
+    for step in report['steps']:
+        base = previous.get(step['concurrency'])
+        if base is None:
+            continue
+
+        label = f"{step['concurrency']} user(s)"
+        if step['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{label}: {step['throughput_rps']} req/s vs baseline {base['throughput_rps']} req/s")
+        if base['p95_ms'] and step['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {step['p95_ms']} ms vs baseline {base['p95_ms']} ms")
+        if step['error_rate'] > base['error_rate']:
+            regressions.append(f"{label}: error rate {step['error_rate']:.2%} vs baseline {base['error_rate']:.2%}")
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test the FastAPI service at increasing concurrency")
+    parser.add_argument("--url", default=None, help="URL of a running API (defaults to seeding and starting one)")
+    parser.add_argument("--users", type=int, default=1000, help="Users to seed the local database with")
+    parser.add_argument("--concurrency", type=int, nargs='+', default=DEFAULT_CONCURRENCY, help="Virtual users per step")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="Seconds per step")
+    parser.add_argument("--mix", type=json.loads, default=DEFAULT_MIX, help="Scenario weights as JSON")
+    parser.add_argument("--slo-ms", type=float, default=DEFAULT_SLO_MS, help="p95 latency limit for the capacity")
+    parser.add_argument("--max-error-rate", type=float, default=DEFAULT_MAX_ERROR_RATE, help="Error rate limit for the capacity")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="Compare the results against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    unknown = set(args.mix) - set(DEFAULT_MIX)
+    if unknown:
+        parser.error(f"Unknown scenarios in --mix: {', '.join(sorted(unknown))}")
+
+    server = workdir = None
+    base_url = args.url
+    try:
+        if base_url is None:
+            workdir = tempfile.mkdtemp(prefix='fake-data-load-')
+            database_url = f"sqlite:///{os.path.join(workdir, 'api.db')}"
+            print(f"[{datetime.now()}] Seeding {args.users} users...")
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                executor.submit(seed, args.users, database_url, workdir).result()
+            port = free_port()
+            server, _ = start_server(api_env(database_url), port, workdir)
+            base_url = f'http://127.0.0.1:{port}'
+
+        report = run_load_test(base_url, args.concurrency, args.duration, args.mix, args.slo_ms, args.max_error_rate)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[{datetime.now()}] ✓ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
@@ -1,168 +1,175 @@
 """
 Generate fake subscription data
 """
-import faker
-from typing import List
+from typing import Optional
 import pandas as pd
 import numpy as np
-from datetime import datetime
-from models import Plan, Subscription
-from data_generation.generate_plans import generate_plans
+from datetime import date
+from models import Subscription
+from data_generation.reference_data import reference_data
+from data_generation.ids import generate_ids
 
-def generate_subscriptions(user_df: pd.DataFrame) -> pd.DataFrame:
+# Renewal cohorts as (probability, min renewals, max renewals exclusive)
+# Most users (60%) get 7-11 renewals, some (25%) get 3-6, few (10%) get 12-20, rare (5%) get 21-30
+RENEWAL_COHORTS = [
+    (0.60, 7, 12),
+    (0.25, 3, 7),
+    (0.10, 12, 21),
+    (0.05, 21, 31),
+]
+
+# Payment method IDs: 1=credit card, 2=paypal, 3=bank transfer
+PAID_PAYMENT_METHODS = [1, 2, 3]
+PAID_PAYMENT_WEIGHTS = [0.60, 0.30, 0.10]
+FREE_PAYMENT_METHOD = 4  # N/A
+
+# Chance that a renewal keeps the same plan instead of switching to another paid plan
+SAME_PLAN_PROBABILITY = 0.7
+
+
+def _add_month(dates: np.ndarray) -> np.ndarray:
+    """Add one calendar month to an array of datetime64[D] values."""
+    shifted = pd.DatetimeIndex(dates) + pd.DateOffset(months=1)
+    return shifted.values.astype('datetime64[D]')
+
+
+def _draw_payment_methods(rng: np.random.Generator, size: int) -> np.ndarray:
+    return rng.choice(PAID_PAYMENT_METHODS, size=size, p=PAID_PAYMENT_WEIGHTS)
+
+
+def _draw_renewal_counts(rng: np.random.Generator, size: int) -> np.ndarray:
+    """Draw the number of renewals for each paid user from the weighted cohorts."""
+    weights = [cohort[0] for cohort in RENEWAL_COHORTS]
+    low = np.array([cohort[1] for cohort in RENEWAL_COHORTS])
+    high = np.array([cohort[2] for cohort in RENEWAL_COHORTS])
+
+    cohort = rng.choice(len(RENEWAL_COHORTS), size=size, p=weights)
+    return rng.integers(low[cohort], high[cohort])
+
+
+def generate_subscriptions(
+    user_df: pd.DataFrame,
+    rng: Optional[np.random.Generator] = None,
+    id_prefix: str = '',
+    renewals: bool = True,
+    as_of: Optional[date] = None,
+) -> pd.DataFrame:
     """
     Generate fake subscription data based on user data
-    
+
+    Every user gets an initial subscription on their signup date. Paid users
+    then get a chain of monthly renewals; the chains are built one renewal
+    round at a time, drawing gaps, plan switches and payment methods for all
+    users still renewing in that round at once.
+
     Args:
         user_df: DataFrame containing user data
-        
+        rng: Random generator used for all draws (fresh unseeded one if omitted)
+        id_prefix: Prefix added to every subscription_id, e.g. to keep shards apart
+        renewals: Generate renewal chains; if False only initial subscriptions are made
+        as_of: Date the data is generated as of; paid subscriptions ending before
+            it are expired (defaults to today)
+
     Returns:
         DataFrame containing subscription data
     """
-    subscriptions: List[Subscription] = []
-    plans = generate_plans().to_dict(orient='records')
-    
-    if not plans:
+    rng = rng if rng is not None else np.random.default_rng()
+
+    plans = reference_data().plans
+
+    if not len(plans.ids):
         raise ValueError("No plans available to generate subscriptions.")
 
-    # Generate initial subscription for each user
-    for i in range(len(user_df)):
-        uid = user_df.user_id.iloc[i]
-        pid = user_df.plan_id.iloc[i]
-        sd = pd.to_datetime(user_df.signup_date.iloc[i])
-
-        plan = next((plan for plan in plans if plan['plan_id'] == pid), None)
-        
-        if not plan:
-            continue
-
-        # Determine payment method and end date based on plan
-        if plan['plan_name'] == "Free":
-            pm_id = 4  # N/A
-            ed = 'N/A'
-            status = 'active'
-        else:
-            # Payment method IDs: 1=credit card, 2=paypal, 3=bank transfer
-            pm_id = np.random.choice(
-                [1, 2, 3],
-                p=[0.60, 0.30, 0.10]
-            )
-            ed = sd + pd.DateOffset(months=1)
-
-        # Determine status
-        if plan['plan_name'] != "Free" and ed != 'N/A' and ed.strftime('%Y-%m-%d') < pd.to_datetime(datetime.now().date()).strftime('%Y-%m-%d'):
-            st = 'expired'
-        else:
-            st = 'active'
-
-        subscription = Subscription(
-            subscription_id=faker.Faker().uuid4()[:8],
-            user_id=uid,
-            plan_id=pid,
-            start_date=sd.strftime('%Y-%m-%d'),
-            end_date=ed if ed == 'N/A' else ed.strftime('%Y-%m-%d'),
-            payment_method_id=pm_id,
-            status=st,
+    paid_plan_ids = plans.paid_ids
+
+    # Users on unknown plans get no subscriptions
+    users = user_df[plans.contains(user_df['plan_id'].to_numpy())]
+    user_ids = users['user_id'].to_numpy()
+    plan_ids = users['plan_id'].to_numpy(dtype=np.int64)
+    signup_dates = pd.to_datetime(users['signup_date'], format='%Y-%m-%d').to_numpy().astype('datetime64[D]')
+    today = np.datetime64(as_of or date.today(), 'D')
+
+    # Initial subscription for each user
+    is_free = plans.is_free[plan_ids]
+    is_paid = ~is_free
+    initial_end = _add_month(signup_dates)
+    initial_pm = np.full(len(users), FREE_PAYMENT_METHOD, dtype=np.int64)
+    initial_pm[is_paid] = _draw_payment_methods(rng, int(is_paid.sum()))
+    initial_status = np.where(is_paid & (initial_end < today), 'expired', 'active')
+    initial_end_str = np.where(is_free, 'N/A', np.datetime_as_string(initial_end, unit='D'))
+
+    # Renewal chains for paid users
+    paid_idx = np.flatnonzero(is_paid)
+    if renewals:
+        renewal_counts = _draw_renewal_counts(rng, len(paid_idx))
+    else:
+        renewal_counts = np.zeros(len(paid_idx), dtype=np.int64)
+
+    last_end = initial_end[paid_idx]
+    last_plan = plan_ids[paid_idx]
+    rounds = []
+    remaining = np.arange(len(paid_idx))
+    for renewal_num in range(int(renewal_counts.max(initial=0))):
+        remaining = remaining[renewal_counts[remaining] > renewal_num]
+        size = len(remaining)
+
+        # New subscription starts 1-7 days after the previous one ended
+        start = last_end[remaining] + rng.integers(1, 8, size=size).astype('timedelta64[D]')
+
+        # Keep the same plan or move to one of the other paid plans
+        current_plan = last_plan[remaining]
+        switch = rng.random(size) >= SAME_PLAN_PROBABILITY
+        offset = rng.integers(1, len(paid_plan_ids), size=size)
+        position = np.searchsorted(paid_plan_ids, current_plan)
+        new_plan = np.where(switch, paid_plan_ids[(position + offset) % len(paid_plan_ids)], current_plan)
+
+        end = _add_month(start)
+        last_end[remaining] = end
+        last_plan[remaining] = new_plan
+
+        rounds.append((paid_idx[remaining], np.full(size, renewal_num), new_plan, start, end, _draw_payment_methods(rng, size)))
+
+    if rounds:
+        owner, order, renewal_plan, renewal_start, renewal_end, renewal_pm = (np.concatenate(parts) for parts in zip(*rounds))
+        # Keep each user's renewals together and in chain order
+        sort = np.lexsort((order, owner))
+        owner, renewal_plan, renewal_start, renewal_end, renewal_pm = (
+            owner[sort], renewal_plan[sort], renewal_start[sort], renewal_end[sort], renewal_pm[sort]
         )
-        subscriptions.append(subscription)
-    
-    # Get all paid users (excluding free plan users)
-    paid_user_ids = [sub.user_id for sub in subscriptions if sub.plan_id != 1]
-    unique_paid_users = list(set(paid_user_ids))
-    
-    # Assign renewal counts to each paid user with weighted distribution
-    # Most users (60%) get 7-11 renewals, some (25%) get 3-6, few (10%) get 12-20, rare (5%) get 21-30
-    renewal_counts = {}
-    for user_id in unique_paid_users:
-        rand = np.random.random()
-        if rand < 0.60:  # 60% of users: moderate renewals (7-11)
-            renewal_count = np.random.randint(7, 12)
-        elif rand < 0.85:  # 25% of users: fewer renewals (3-6)
-            renewal_count = np.random.randint(3, 7)
-        elif rand < 0.95:  # 10% of users: more renewals (12-20)
-            renewal_count = np.random.randint(12, 21)
-        else:  # 5% of users: heavy users (21-30)
-            renewal_count = np.random.randint(21, 31)
-        
-        renewal_counts[user_id] = renewal_count
-    
-    # Generate renewals for each paid user
-    for user_id, num_renewals in renewal_counts.items():
-        # Get the initial subscription for this user
-        user_subscriptions = [sub for sub in subscriptions if sub.user_id == user_id]
-        if not user_subscriptions:
-            continue
-            
-        last_subscription = user_subscriptions[0]
-        
-        # Generate multiple renewals
-        for renewal_num in range(num_renewals):
-            # New subscription starts 1-7 days after the previous one ended
-            if last_subscription.end_date == 'N/A':
-                new_start = pd.to_datetime(last_subscription.start_date) + pd.DateOffset(days=np.random.randint(30, 40))
-            else:
-                new_start = pd.to_datetime(last_subscription.end_date) + pd.DateOffset(days=np.random.randint(1, 8))
-
-            # 70% chance to keep same plan, 30% chance to upgrade/downgrade
-            if np.random.random() < 0.7:
-                new_plan_id = last_subscription.plan_id
-            else:
-                # Choose a different paid plan (exclude free plan)
-                available_plans = [2, 3, 4, 5]
-                if last_subscription.plan_id in available_plans:
-                    available_plans.remove(last_subscription.plan_id)
-                new_plan_id = np.random.choice(available_plans)
-
-            new_plan = next((plan for plan in plans if plan['plan_id'] == new_plan_id), None)
-            
-            if not new_plan:
-                continue
-
-            # Determine payment method and end date for new subscription
-            if new_plan['plan_name'] == "Free":
-                new_pm_id = 4  # N/A
-                new_end = 'N/A'
-                new_st = 'active'
-            else:
-                # Payment method IDs: 1=credit card, 2=paypal, 3=bank transfer
-                new_pm_id = np.random.choice(
-                    [1, 2, 3],
-                    p=[0.60, 0.30, 0.10]
-                )
-                new_end = new_start + pd.DateOffset(months=1)
-
-                # Determine status for new subscription
-                if new_end.strftime('%Y-%m-%d') < pd.to_datetime(datetime.now().date()).strftime('%Y-%m-%d'):
-                    new_st = 'expired'
-                else:
-                    new_st = 'active'
-
-            new_subscription = Subscription(
-                subscription_id=faker.Faker().uuid4()[:8],
-                user_id=user_id,
-                plan_id=new_plan_id,
-                start_date=new_start.strftime('%Y-%m-%d'),
-                end_date=new_end if new_end == 'N/A' else new_end.strftime('%Y-%m-%d'),
-                payment_method_id=new_pm_id,
-                status=new_st
-            )
-            subscriptions.append(new_subscription)
-            
-            # Update last_subscription for the next iteration
-            last_subscription = new_subscription
-
-    return pd.DataFrame([subscription.model_dump() for subscription in subscriptions])
+    else:
+        owner = np.array([], dtype=np.int64)
+        renewal_plan = np.array([], dtype=np.int64)
+        renewal_start = np.array([], dtype='datetime64[D]')
+        renewal_end = np.array([], dtype='datetime64[D]')
+        renewal_pm = np.array([], dtype=np.int64)
+
+    total = len(users) + len(owner)
+    return pd.DataFrame(
+        {
+            'subscription_id': generate_ids(total, rng, prefix=id_prefix),
+            'user_id': np.concatenate([user_ids, user_ids[owner]]),
+            'plan_id': np.concatenate([plan_ids, renewal_plan]).astype(np.int64),
+            'start_date': np.concatenate([
+                np.datetime_as_string(signup_dates, unit='D'),
+                np.datetime_as_string(renewal_start, unit='D'),
+            ]),
+            'end_date': np.concatenate([initial_end_str, np.datetime_as_string(renewal_end, unit='D')]),
+            'payment_method_id': np.concatenate([initial_pm, renewal_pm]).astype(np.int64),
+            'status': np.concatenate([initial_status, np.where(renewal_end < today, 'expired', 'active')]),
+        },
+        columns=list(Subscription.model_fields),
+    )
 
 
 if __name__ == "__main__":
     # Generate sample data
     from generate_users import generate_users
-    
+
     users_df = generate_users(100)
     subscriptions_df = generate_subscriptions(users_df)
-    
+
     print(f"Generated {len(subscriptions_df)} subscriptions for {len(users_df)} users")
     print(subscriptions_df.head())
     print(f"\nData types:\n{subscriptions_df.dtypes}")
     print(f"\nStatus distribution:\n{subscriptions_df['status'].value_counts()}")
-    print(f"\n10 most renewal count:\n{subscriptions_df['user_id'].value_counts().head(10)}")
\ No newline at end of file
+    print(f"\n10 most renewal count:\n{subscriptions_df['user_id'].value_counts().head(10)}")
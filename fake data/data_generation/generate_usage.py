@@ -1,18 +1,121 @@
 """
 Generate fake usage data with quota tracking and limits enforcement
 """
-import faker
-from typing import List, Dict
+from typing import Optional
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import date
 from models import Usage
-from data_generation.generate_plans import generate_plans
+from data_generation.reference_data import reference_data
+from data_generation.ids import generate_ids
 
-fake = faker.Faker(locale='en_US')
+# Engagement levels as (share of users, days between usage, quota hit probability
+# on low-tier plans, quota hit probability on other plans); see PlanReference.is_low_tier
+ENGAGEMENT_LEVELS = {
+    'heavy': (0.15, 1, 0.40, 0.15),  # Daily usage, likely to hit limits
+    'moderate': (0.40, 2, 0.15, 0.05),  # Every 2-3 days
+    'light': (0.45, 4, 0.05, 0.01),  # Every 4-7 days, rarely hit limits
+}
+DEFAULT_ENGAGEMENT = 'moderate'
 
+FREE_PLAN_USAGE_PROBABILITY = 0.3  # Free users have usage on ~30% of their visits
+MAX_USAGE_PER_SUBSCRIPTION = 60  # Cap to avoid too many records
+STEPS_PER_BATCH = 32  # Usage intervals drawn per subscription in each batch
 
-def generate_usage(user_df: pd.DataFrame, subscription_df: pd.DataFrame) -> pd.DataFrame:
+
+def _draw_usage_steps(
+    rng: np.random.Generator,
+    days_between_usage: np.ndarray,
+    total_days: np.ndarray,
+    usage_probability: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Draw the days (relative to the subscription start) on which usage is recorded.
+
+    Intervals are drawn in batches of STEPS_PER_BATCH for every subscription that
+    has not yet run past its end date or hit MAX_USAGE_PER_SUBSCRIPTION records.
+
+    Returns:
+        Tuple of (subscription position, days since start), sorted by both
+    """
+    n = len(total_days)
+    offset = np.zeros(n, dtype=np.int64)
+    recorded = np.zeros(n, dtype=np.int64)
+    positions, days = [], []
+
+    pending = np.arange(n)
+    while pending.size:
+        size = len(pending)
+        # Add some randomness to usage frequency, at least 1 day between uses
+        gaps = days_between_usage[pending, None] + rng.integers(-1, 3, size=(size, STEPS_PER_BATCH))
+        day = offset[pending, None] + np.cumsum(np.maximum(gaps, 1), axis=1)
+
+        # Skip some days randomly based on usage probability
+        used = (day <= total_days[pending, None]) & (
+            rng.random((size, STEPS_PER_BATCH)) <= usage_probability[pending, None]
+        )
+        rank = recorded[pending, None] + np.cumsum(used, axis=1)
+        used &= rank <= MAX_USAGE_PER_SUBSCRIPTION
+
+        row, col = np.nonzero(used)
+        positions.append(pending[row])
+        days.append(day[row, col])
+
+        offset[pending] = day[:, -1]
+        recorded[pending] = np.minimum(rank[:, -1], MAX_USAGE_PER_SUBSCRIPTION)
+        pending = pending[(offset[pending] <= total_days[pending]) & (recorded[pending] < MAX_USAGE_PER_SUBSCRIPTION)]
+
+    positions = np.concatenate(positions) if positions else np.array([], dtype=np.int64)
+    days = np.concatenate(days) if days else np.array([], dtype=np.int64)
+    order = np.lexsort((days, positions))
+    return positions[order], days[order]
+
+
+def draw_usage_metrics(
+    rng: np.random.Generator,
+    plan_ids: np.ndarray,
+    base_multiplier: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Draw the metrics of usage records from their plan's per-use ranges.
+
+    Each metric is drawn as min + Beta(2, 5) * (max - min) and scaled by the
+    record's usage multiplier; actions get extra noise so they correlate with
+    API calls.
+
+    Args:
+        rng: Random generator used for all draws
+        plan_ids: Plan of each usage record
+        base_multiplier: Usage multiplier of each usage record
+
+    Returns:
+        Tuple of (storage increment, API calls, actions, active minutes)
+    """
+    plans = reference_data().plans
+    size = len(plan_ids)
+
+    def draw(metric: str) -> np.ndarray:
+        low = plans.usage_min[metric][plan_ids]
+        high = plans.usage_max[metric][plan_ids]
+        return (low + rng.beta(2, 5, size=size) * (high - low)) * base_multiplier
+
+    storage_increment = np.round(draw('storage'), 2)
+    api = draw('api').astype(np.int64)
+    actions = draw('actions').astype(np.int64)
+    active_mins = draw('minutes').astype(np.int64)
+
+    # Add correlation noise: higher API calls should correlate with more actions
+    actions = (actions * rng.uniform(0.8, 1.2, size=size)).astype(np.int64)
+    return storage_increment, api, actions, active_mins
+
+
+def generate_usage(
+    user_df: pd.DataFrame,
+    subscription_df: pd.DataFrame,
+    rng: Optional[np.random.Generator] = None,
+    id_prefix: str = '',
+    as_of: Optional[date] = None,
+) -> pd.DataFrame:
     """
     Generate realistic usage data with quota enforcement
     
@@ -21,292 +124,156 @@ def generate_usage(user_df: pd.DataFrame, subscription_df: pd.DataFrame) -> pd.D
     - Enforces plan limits (API calls, storage)
     - Users who hit limits stop generating usage until next renewal
     - Realistic quota exhaustion patterns (some users hit limits, most don't)
+
+    Usage for all subscriptions is simulated at once: usage days are drawn in
+    batches, the metrics are computed as arrays and quotas are enforced with a
+    cumulative sum per subscription that cuts off everything after the record
+    that exhausted the quota.
     
     Args:
         user_df: DataFrame containing user data
         subscription_df: DataFrame containing subscription data
+        rng: Random generator used for all draws (fresh unseeded one if omitted)
+        id_prefix: Prefix added to every usage_id, e.g. to keep shards apart
+        as_of: Date the data is generated as of; open-ended subscriptions have
+            usage until it (defaults to today)
         
     Returns:
         DataFrame containing usage data with quota enforcement
     """
-    usages: List[Usage] = []
-    
-    # Load plan limits
-    plans_df = generate_plans()
-    plan_limits = {
-        row['plan_id']: {
-            'api_limit': row['api_limit'],
-            'storage_limit_mb': row['storage_limit_mb']
-        }
-        for _, row in plans_df.iterrows()
-    }
-    
+    rng = rng if rng is not None else np.random.default_rng()
+
+    # Plan limits and usage ranges; subscriptions on unknown plans get no usage
+    plans = reference_data().plans
+    subs = subscription_df[plans.contains(subscription_df['plan_id'].to_numpy())]
+    plan_ids = subs['plan_id'].to_numpy(dtype=np.int64)
+
     # Assign engagement level to each user (affects usage frequency and quota exhaustion)
-    user_engagement = {}
-    for user_id in user_df.user_id.unique():
-        rand = np.random.random()
-        if rand < 0.15:  # 15% heavy users (daily usage, likely to hit limits)
-            engagement = 'heavy'
-        elif rand < 0.55:  # 40% moderate users (3-5 times per week)
-            engagement = 'moderate'
-        else:  # 45% light users (1-2 times per week, rarely hit limits)
-            engagement = 'light'
-        user_engagement[user_id] = engagement
-    
-    # Generate usage for EACH subscription with quota tracking
-    for _, sub in subscription_df.iterrows():
-        user_id = sub['user_id']
-        plan_id = sub['plan_id']
-        subscription_id = sub['subscription_id']
-        
-        # Get plan limits
-        limits = plan_limits.get(plan_id, None)
-        if limits is None:
-            continue
-        monthly_api_limit = limits['api_limit']
-        monthly_storage_limit = limits['storage_limit_mb']
-        
-        # Track cumulative usage for this subscription period
-        cumulative_api_calls = 0
-        cumulative_storage_mb = 0.0
-        quota_exhausted = False
-        
-        # Skip free users - they might have minimal usage
-        if plan_id == 1:
-            usage_probability = 0.3  # 30% chance of usage on any given day
-        else:
-            usage_probability = 1.0  # Paid users have regular usage
-        
-        start_date = pd.to_datetime(sub['start_date'])
-        end_date = pd.to_datetime(sub['end_date']) if sub['end_date'] != 'N/A' else pd.to_datetime(datetime.now().date())
-        
-        # Ensure valid date range
-        if start_date >= end_date:
-            end_date = start_date + pd.DateOffset(days=1)
-        
-        # Determine usage frequency based on engagement level
-        engagement = user_engagement.get(user_id, 'moderate')
-        if engagement == 'heavy':
-            days_between_usage = 1  # Daily
-            # Heavy users have higher chance of hitting quota
-            quota_hit_probability = 0.4 if plan_id in [1, 2] else 0.15
-        elif engagement == 'moderate':
-            days_between_usage = 2  # Every 2-3 days
-            quota_hit_probability = 0.15 if plan_id in [1, 2] else 0.05
-        else:
-            days_between_usage = 4  # Every 4-7 days
-            quota_hit_probability = 0.05 if plan_id in [1, 2] else 0.01
-        
-        # Determine if this user will hit quota this month
-        will_hit_quota = np.random.random() < quota_hit_probability
-        
-        # Generate usage records for this subscription period
-        current_date = start_date
-        usage_count = 0
-        max_usage_per_subscription = 60  # Cap to avoid too many records
-        
-        while current_date <= end_date and usage_count < max_usage_per_subscription and not quota_exhausted:
-            # Add some randomness to usage frequency
-            days_to_add = days_between_usage + np.random.randint(-1, 3)
-            days_to_add = max(1, days_to_add)  # At least 1 day
-            
-            current_date += pd.DateOffset(days=days_to_add)
-            
-            if current_date > end_date:
-                break
-            
-            # Skip some days randomly based on usage probability
-            if np.random.random() > usage_probability:
-                continue
-            
-            # Weekday vs Weekend pattern (lower usage on weekends)
-            is_weekend = current_date.weekday() >= 5
-            weekend_factor = 0.6 if is_weekend else 1.0
-            
-            # Growth pattern: usage tends to increase over time within a subscription
-            days_into_subscription = (current_date - start_date).days
-            total_subscription_days = (end_date - start_date).days
-            growth_factor = 1.0 + (days_into_subscription / max(total_subscription_days, 1)) * 0.3
-            
-            # If user will hit quota, make them use more resources as they approach the limit
-            if will_hit_quota:
-                # Aggressive usage multiplier (1.5x to 2.5x normal)
-                aggressive_factor = np.random.uniform(1.5, 2.5)
-            else:
-                # Normal usage (0.5x to 1.2x)
-                aggressive_factor = np.random.uniform(0.5, 1.2)
-            
-            # Generate correlated metrics based on plan
-            base_multiplier = weekend_factor * growth_factor * aggressive_factor
-            
-            # Plan-based usage patterns with beta distribution
-            # Adjusted to align with new realistic plan limits
-            if plan_id == 1:  # Free (100 API/month, 500 MB storage)
-                storage_increment = round((5 + np.random.beta(2, 5) * 45) * base_multiplier, 2)  # 5-50 MB per use
-                api = int((1 + np.random.beta(2, 5) * 9) * base_multiplier)  # 1-10 API calls per use
-                actions = int((3 + np.random.beta(2, 5) * 17) * base_multiplier)  # 3-20 actions
-                active_mins = int((5 + np.random.beta(2, 5) * 55) * base_multiplier)  # 5-60 mins
-            elif plan_id == 2:  # Starter (1,000 API/month, 5 GB storage)
-                storage_increment = round((50 + np.random.beta(2, 5) * 450) * base_multiplier, 2)  # 50-500 MB per use
-                api = int((10 + np.random.beta(2, 5) * 90) * base_multiplier)  # 10-100 API calls per use
-                actions = int((10 + np.random.beta(2, 5) * 90) * base_multiplier)  # 10-100 actions
-                active_mins = int((15 + np.random.beta(2, 5) * 135) * base_multiplier)  # 15-150 mins
-            elif plan_id == 3:  # Professional (10,000 API/month, 50 GB storage)
-                storage_increment = round((500 + np.random.beta(2, 5) * 4500) * base_multiplier, 2)  # 500-5000 MB per use
-                api = int((100 + np.random.beta(2, 5) * 900) * base_multiplier)  # 100-1000 API calls per use
-                actions = int((50 + np.random.beta(2, 5) * 450) * base_multiplier)  # 50-500 actions
-                active_mins = int((30 + np.random.beta(2, 5) * 270) * base_multiplier)  # 30-300 mins
-            elif plan_id == 4:  # Business (50,000 API/month, 200 GB storage)
-                storage_increment = round((2000 + np.random.beta(2, 5) * 18000) * base_multiplier, 2)  # 2-20 GB per use
-                api = int((500 + np.random.beta(2, 5) * 4500) * base_multiplier)  # 500-5000 API calls per use
-                actions = int((100 + np.random.beta(2, 5) * 900) * base_multiplier)  # 100-1000 actions
-                active_mins = int((60 + np.random.beta(2, 5) * 540) * base_multiplier)  # 60-600 mins
-            else:  # Enterprise (250,000 API/month, 1 TB storage)
-                storage_increment = round((10000 + np.random.beta(2, 5) * 90000) * base_multiplier, 2)  # 10-100 GB per use
-                api = int((2500 + np.random.beta(2, 5) * 22500) * base_multiplier)  # 2500-25000 API calls per use
-                actions = int((500 + np.random.beta(2, 5) * 4500) * base_multiplier)  # 500-5000 actions
-                active_mins = int((120 + np.random.beta(2, 5) * 1080) * base_multiplier)  # 120-1200 mins
-            
-            # Add correlation noise: higher API calls should correlate with more actions
-            correlation_factor = np.random.uniform(0.8, 1.2)
-            actions = int(actions * correlation_factor)
-            
-            # CHECK QUOTA LIMITS BEFORE ADDING USAGE
-            # Check if adding this usage would exceed limits
-            potential_api_total = cumulative_api_calls + api
-            potential_storage_total = cumulative_storage_mb + storage_increment
-            
-            # API Limit Check
-            if potential_api_total > monthly_api_limit:
-                # User hit API limit - cap at limit and mark quota exhausted
-                api = max(0, monthly_api_limit - cumulative_api_calls)
-                quota_exhausted = True
-            
-            # Storage Limit Check
-            if potential_storage_total > monthly_storage_limit:
-                # User hit storage limit - cap at limit and mark quota exhausted
-                storage_increment = max(0, monthly_storage_limit - cumulative_storage_mb)
-                quota_exhausted = True
-            
-            # Update cumulative usage
-            cumulative_api_calls += api
-            cumulative_storage_mb += storage_increment
-            
-            # Only create usage record if there's actual usage
-            if api > 0 or storage_increment > 0:
-                usage = Usage(
-                    usage_id=fake.uuid4()[:8],
-                    user_id=user_id,
-                    subscription_id=subscription_id,
-                    usage_date=current_date.strftime('%Y-%m-%d'),
-                    actions_performed=max(1, actions),
-                    storage_used_mb=max(0.1, storage_increment),
-                    api_calls=max(1, api),
-                    active_minutes=max(1, active_mins)
-                )
-                usages.append(usage)
-                usage_count += 1
-            
-            # If quota exhausted, stop generating usage for this subscription period
-            if quota_exhausted:
-                break
-    
-    return pd.DataFrame([usage.model_dump() for usage in usages])
+    levels = list(ENGAGEMENT_LEVELS)
+    level_table = np.array([ENGAGEMENT_LEVELS[level] for level in levels])
+    user_ids = pd.Index(user_df['user_id'].unique())
+    user_level = rng.choice(len(levels), size=len(user_ids), p=level_table[:, 0])
+    user_pos = user_ids.get_indexer(subs['user_id'])
+    engagement = np.where(user_pos >= 0, user_level[user_pos], levels.index(DEFAULT_ENGAGEMENT))
+
+    days_between_usage = level_table[engagement, 1].astype(np.int64)
+    quota_hit_probability = np.where(
+        plans.is_low_tier[plan_ids],
+        level_table[engagement, 2],
+        level_table[engagement, 3],
+    )
+    # Determine if each subscription will hit its quota this period
+    will_hit_quota = rng.random(len(subs)) < quota_hit_probability
+    usage_probability = np.where(plans.is_free[plan_ids], FREE_PLAN_USAGE_PROBABILITY, 1.0)
+
+    # Subscription periods; open-ended (free) subscriptions run until the as-of date
+    today = np.datetime64(as_of or date.today(), 'D')
+    start_dates = pd.to_datetime(subs['start_date'], format='%Y-%m-%d').to_numpy().astype('datetime64[D]')
+    end_dates = pd.to_datetime(subs['end_date'].replace('N/A', None), format='%Y-%m-%d').to_numpy().astype('datetime64[D]')
+    end_dates = np.where(np.isnat(end_dates), today, end_dates)
+    # Ensure valid date range
+    total_days = np.maximum((end_dates - start_dates).astype(np.int64), 1)
+
+    sub_pos, days = _draw_usage_steps(rng, days_between_usage, total_days, usage_probability)
+    usage_dates = start_dates[sub_pos] + days.astype('timedelta64[D]')
+
+    # Weekday vs Weekend pattern (lower usage on weekends), 1970-01-01 was a Thursday
+    weekday = (usage_dates.astype(np.int64) + 3) % 7
+    weekend_factor = np.where(weekday >= 5, 0.6, 1.0)
+
+    # Growth pattern: usage tends to increase over time within a subscription
+    growth_factor = 1.0 + days / total_days[sub_pos] * 0.3
+
+    # Users who will hit quota use 1.5x to 2.5x normal resources, others 0.5x to 1.2x
+    hits = will_hit_quota[sub_pos]
+    aggressive_factor = rng.uniform(np.where(hits, 1.5, 0.5), np.where(hits, 2.5, 1.2))
+
+    base_multiplier = weekend_factor * growth_factor * aggressive_factor
+
+    # Plan-based usage patterns with beta distribution
+    usage_plan_ids = plan_ids[sub_pos]
+    storage_increment, api, actions, active_mins = draw_usage_metrics(rng, usage_plan_ids, base_multiplier)
+
+    # QUOTA LIMITS: the first record that would exceed a limit is capped at the
+    # remaining quota and every later record of that subscription is dropped
+    api_limit = plans.api_limit[usage_plan_ids]
+    storage_limit = plans.storage_limit_mb[usage_plan_ids]
+
+    totals = pd.DataFrame({'api': api, 'storage': storage_increment}).groupby(sub_pos).cumsum()
+    api_total = totals['api'].to_numpy()
+    storage_total = totals['storage'].to_numpy()
+    api_exceeded = api_total > api_limit
+    storage_exceeded = storage_total > storage_limit
+    exhausted = api_exceeded | storage_exceeded
+    exhausted_before = pd.Series(exhausted).groupby(sub_pos).cumsum().to_numpy() - exhausted
+
+    api = np.where(api_exceeded, np.maximum(0, api_limit - (api_total - api)), api)
+    storage_increment = np.where(
+        storage_exceeded, np.maximum(0, storage_limit - (storage_total - storage_increment)), storage_increment
+    )
+
+    # Only create usage records if there's actual usage
+    keep = (exhausted_before == 0) & ((api > 0) | (storage_increment > 0))
+    sub_pos = sub_pos[keep]
+
+    return pd.DataFrame(
+        {
+            'usage_id': generate_ids(len(sub_pos), rng, prefix=id_prefix),
+            'user_id': subs['user_id'].to_numpy()[sub_pos],
+            'subscription_id': subs['subscription_id'].to_numpy()[sub_pos],
+            'usage_date': np.datetime_as_string(usage_dates[keep], unit='D').astype(object),
+            'actions_performed': np.maximum(1, actions[keep]),
+            'storage_used_mb': np.maximum(0.1, storage_increment[keep]),
+            'api_calls': np.maximum(1, api[keep]),
+            'active_minutes': np.maximum(1, active_mins[keep]),
+        },
+        columns=list(Usage.model_fields),
+    )
 
 
 if __name__ == "__main__":
     # Generate sample data
-    from generate_users import generate_users
-    from generate_subscriptions import generate_subscriptions
-    
+    from data_generation.generate_users import generate_users
+    from data_generation.generate_subscriptions import generate_subscriptions
+    from analysis.quota_analysis import quota_utilisation, usage_by_plan, utilisation_distribution
+
     print("Generating users...")
     users_df = generate_users(1000)
-    
+
     print("Generating subscriptions...")
     subscriptions_df = generate_subscriptions(users_df)
-    
+
     print("Generating usage data with quota enforcement...")
-    usage_df = generate_usage_with_quotas(users_df, subscriptions_df)
-    
+    usage_df = generate_usage(users_df, subscriptions_df)
+
     print(f"\n{'='*70}")
     print(f"Generated {len(usage_df)} usage records for {len(users_df)} users")
     print(f"Across {len(subscriptions_df)} subscriptions")
     print(f"{'='*70}\n")
-    
+
     print("Sample usage records:")
     print(usage_df.head(10))
-    
+
     print(f"\n{'='*70}")
     print("Usage statistics by metric:")
     print(usage_df[['actions_performed', 'storage_used_mb', 'api_calls', 'active_minutes']].describe())
-    
+
     print(f"\n{'='*70}")
     print("Usage distribution by plan:")
-    plan_stats = usage_df.groupby('plan_id').agg({
-        'usage_id': 'count',
-        'actions_performed': 'mean',
-        'storage_used_mb': ['mean', 'sum'],
-        'api_calls': ['mean', 'sum'],
-        'active_minutes': 'mean'
-    }).round(2)
-    print(plan_stats)
-    
+    print(usage_by_plan(usage_df, subscriptions_df))
+
     print(f"\n{'='*70}")
-    print("Quota Analysis - Checking for users who hit limits:")
-    
-    # Load plan limits for comparison
-    plans_df = generate_plans()
-    
-    # Analyze quota usage per subscription
-    quota_analysis = []
-    for _, sub in subscriptions_df.iterrows():
-        sub_usage = usage_df[usage_df['user_id'] == sub['user_id']]
-        
-        # Filter usage for this specific subscription period
-        start_date = pd.to_datetime(sub['start_date'])
-        end_date = pd.to_datetime(sub['end_date']) if sub['end_date'] != 'N/A' else pd.to_datetime(datetime.now().date())
-        
-        sub_usage_filtered = sub_usage[
-            (pd.to_datetime(sub_usage['usage_date']) >= start_date) &
-            (pd.to_datetime(sub_usage['usage_date']) <= end_date)
-        ]
-        
-        if len(sub_usage_filtered) > 0:
-            total_api = sub_usage_filtered['api_calls'].sum()
-            total_storage = sub_usage_filtered['storage_used_mb'].sum()
-            
-            plan_info = plans_df[plans_df['plan_id'] == sub['plan_id']].iloc[0]
-            api_limit = plan_info['api_limit']
-            storage_limit = plan_info['storage_limit_mb']
-            
-            api_usage_pct = (total_api / api_limit) * 100
-            storage_usage_pct = (total_storage / storage_limit) * 100
-            
-            quota_analysis.append({
-                'user_id': sub['user_id'],
-                'plan_id': sub['plan_id'],
-                'plan_name': plan_info['plan_name'],
-                'api_used': total_api,
-                'api_limit': api_limit,
-                'api_usage_pct': round(api_usage_pct, 1),
-                'storage_used': round(total_storage, 2),
-                'storage_limit': storage_limit,
-                'storage_usage_pct': round(storage_usage_pct, 1),
-                'hit_limit': api_usage_pct >= 99 or storage_usage_pct >= 99
-            })
-    
-    quota_df = pd.DataFrame(quota_analysis)
-    
-    print(f"\nUsers who hit their quota limits (>99% usage):")
-    limit_hitters = quota_df[quota_df['hit_limit'] == True]
+    print("Quota Analysis - Checking for subscriptions that hit limits:")
+    quota_df = quota_utilisation(usage_df, subscriptions_df)
+
+    print(f"\nSubscriptions that hit their quota limits (>99% usage):")
+    limit_hitters = quota_df[quota_df['hit_limit']]
     if len(limit_hitters) > 0:
         print(limit_hitters[['user_id', 'plan_name', 'api_usage_pct', 'storage_usage_pct']].tail(10))
     else:
-        print("No users hit their limits in this dataset")
-    
+        print("No subscriptions hit their limits in this dataset")
+
     print(f"\n{'='*70}")
-    print("Quota usage distribution:")
-    print(f"Users at 90-100% quota: {len(quota_df[quota_df['api_usage_pct'] >= 90])}")
-    print(f"Users at 70-90% quota: {len(quota_df[(quota_df['api_usage_pct'] >= 70) & (quota_df['api_usage_pct'] < 90)])}")
-    print(f"Users at 50-70% quota: {len(quota_df[(quota_df['api_usage_pct'] >= 50) & (quota_df['api_usage_pct'] < 70)])}")
-    print(f"Users below 50% quota: {len(quota_df[quota_df['api_usage_pct'] < 50])}")
+    print("API quota usage distribution:")
+    for bucket, count in utilisation_distribution(quota_df).items():
+        print(f"Subscriptions at {bucket} quota: {count}")
@@ -2,59 +2,65 @@
 Generate fake user data
 """
 import faker
-from typing import List
+from typing import List, Optional
 import pandas as pd
 import numpy as np
-from datetime import datetime
+from datetime import date
 from models import User
+from data_generation.ids import generate_ids
 
-fake = faker.Faker(locale='en_US')
+default_fake = faker.Faker(locale='en_US')
 
 
-def generate_users(count: int = 1000) -> pd.DataFrame:
+def generate_users(
+    count: int = 1000,
+    rng: Optional[np.random.Generator] = None,
+    fake: Optional[faker.Faker] = None,
+    id_prefix: str = '',
+    as_of: Optional[date] = None,
+) -> pd.DataFrame:
     """
     Generate fake user data
     
     Args:
         count: Number of users to generate
+        rng: Random generator used for all numeric draws (fresh unseeded one if omitted)
+        fake: Faker instance used for names and emails (module default if omitted)
+        id_prefix: Prefix added to every user_id, e.g. to keep shards apart
+        as_of: Date the data is generated as of; users signed up before it (defaults to today)
         
     Returns:
         DataFrame containing user data
     """
+    rng = rng if rng is not None else np.random.default_rng()
+    fake = fake if fake is not None else default_fake
+    as_of = as_of or date.today()
+
     users: List[User] = []
-    user_id = [fake.uuid4()[:8] for _ in range(count)]
+    user_id = generate_ids(count, rng, prefix=id_prefix)
     first_name = [fake.first_name() for _ in range(count)]
     last_name = [fake.last_name() for _ in range(count)]
     email = [fake.email() for _ in range(count)]
-    signup_date = [
-        pd.to_datetime(
-            np.random.randint(
-                pd.Timestamp('2024-08-01').value,
-                pd.Timestamp(datetime.now().date()).value
-            )
-        ).normalize().strftime('%Y-%m-%d')
-        for _ in range(count)
-    ]
-    plan_id = [
-        np.random.choice(
-            [1, 2, 3, 4, 5], 
-            p=[0.33, 0.27, 0.18, 0.16, 0.06]
+    signup_date = pd.to_datetime(
+        rng.integers(
+            pd.Timestamp('2024-08-01').value,
+            pd.Timestamp(as_of).value,
+            size=count
         )
-        for _ in range(count)
-    ]
+    ).normalize().strftime('%Y-%m-%d')
+    plan_id = rng.choice(
+        [1, 2, 3, 4, 5], 
+        size=count,
+        p=[0.33, 0.27, 0.18, 0.16, 0.06]
+    )
     # Region IDs (1-6) with equal probability
-    region_id = [
-        np.random.choice([1, 2, 3, 4, 5, 6])
-        for _ in range(count)
-    ]
+    region_id = rng.choice([1, 2, 3, 4, 5, 6], size=count)
     # Referral source IDs (1=web search, 2=paid ads, 3=social media, 4=referral)
-    referral_source_id = [
-        np.random.choice(
-            [1, 2, 3, 4],
-            p=[0.20, 0.45, 0.10, 0.25]
-        )
-        for _ in range(count)
-    ]
+    referral_source_id = rng.choice(
+        [1, 2, 3, 4],
+        size=count,
+        p=[0.20, 0.45, 0.10, 0.25]
+    )
 
     for i in range(count):
         user = User(
@@ -69,7 +75,7 @@ def generate_users(count: int = 1000) -> pd.DataFrame:
         )
         users.append(user)
 
-    return pd.DataFrame([user.model_dump() for user in users])
+    return pd.DataFrame([user.model_dump() for user in users], columns=list(User.model_fields))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+"""
+Generate unique IDs for the generated entities
+"""
+import binascii
+from typing import Optional
+import numpy as np
+
+DEFAULT_ID_WIDTH = 8  # Hex characters, matching the original uuid4()[:8] keys
+MAX_ID_WIDTH = 16  # Hex characters that fit in one uint64
+
+
+def generate_ids(
+    count: int,
+    rng: Optional[np.random.Generator] = None,
+    prefix: str = '',
+    width: int = DEFAULT_ID_WIDTH,
+) -> np.ndarray:
+    """
+    Generate `count` unique random hex string IDs in bulk
+
+    IDs are drawn as integers from `rng` and formatted as zero-padded lowercase
+    hex. Any value that repeats another one in the batch is redrawn until the
+    whole batch is unique, so IDs never collide within a call. Callers that
+    generate the same entity in several calls (e.g. one call per shard) keep
+    IDs apart with a distinct `prefix` per call.
+
+    Args:
+        count: Number of IDs to generate
+        rng: Random generator to draw from (fresh unseeded one if omitted)
+        prefix: String prepended to every ID
+        width: Number of hex characters after the prefix (1-16)
+
+    Returns:
+        Object array of `count` unique ID strings
+    """
+    if not 1 <= width <= MAX_ID_WIDTH:
+        raise ValueError(f"width must be between 1 and {MAX_ID_WIDTH}")
+
+    space = 16 ** width
+    if count > space:
+        raise ValueError(f"Cannot generate {count} unique IDs of width {width}")
+
+    rng = rng if rng is not None else np.random.default_rng()
+    values = rng.integers(0, space, size=count, dtype=np.uint64)
+
+    # Redraw one side of every duplicate pair until all values are unique
+    while True:
+        order = np.argsort(values)
+        sorted_values = values[order]
+        duplicate = order[1:][sorted_values[1:] == sorted_values[:-1]]
+        if not len(duplicate):
+            break
+        values[duplicate] = rng.integers(0, space, size=len(duplicate), dtype=np.uint64)
+
+    # Format all values at once: big-endian bytes -> hex -> last `width` characters
+    hex_chars = np.frombuffer(binascii.hexlify(values.astype('>u8').tobytes()), dtype='S1')
+    hex_ids = np.ascontiguousarray(hex_chars.reshape(count, MAX_ID_WIDTH)[:, MAX_ID_WIDTH - width:])
+    ids = hex_ids.view(f'S{width}').ravel().astype(str)
+
+    if prefix:
+        ids = np.char.add(prefix, ids)
+    return ids.astype(object)
+
+
+if __name__ == "__main__":
+    ids = generate_ids(1_000_000, np.random.default_rng(0))
+    print(f"Generated {len(ids)} IDs, {len(set(ids))} unique")
+    print(ids[:5])
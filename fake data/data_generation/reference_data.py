@@ -0,0 +1,166 @@
+"""
+Shared registry of the static reference data
+
+The lookup tables (plans, plan features, regions, payment methods and referral
+sources) are generated once per process and kept in an immutable registry.
+Besides the tables themselves, the registry exposes read-only NumPy arrays
+indexed directly by ID, so generators can look up plan attributes for whole
+columns of IDs with fancy indexing, e.g. `plans.api_limit[plan_ids]`.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
+import numpy as np
+import pandas as pd
+from data_generation.generate_regions import generate_regions
+from data_generation.generate_referral_sources import generate_referral_sources
+from data_generation.generate_payment_methods import generate_payment_methods
+from data_generation.generate_plans import generate_plans
+from data_generation.generate_plan_features import generate_plan_features
+
+# Per-use ranges by plan as (min, max), sized against each plan's monthly limits.
+# generate_usage draws each metric as min + Beta(2, 5) * (max - min) before its usage multipliers.
+PLAN_USAGE_RANGES = {
+    # plan_id: storage_mb, api_calls, actions, active_minutes
+    1: {'storage': (5, 50), 'api': (1, 10), 'actions': (3, 20), 'minutes': (5, 60)},  # Free (100 API/month, 500 MB storage)
+    2: {'storage': (50, 500), 'api': (10, 100), 'actions': (10, 100), 'minutes': (15, 150)},  # Starter (1,000 API/month, 5 GB storage)
+    3: {'storage': (500, 5000), 'api': (100, 1000), 'actions': (50, 500), 'minutes': (30, 300)},  # Professional (10,000 API/month, 50 GB storage)
+    4: {'storage': (2000, 20000), 'api': (500, 5000), 'actions': (100, 1000), 'minutes': (60, 600)},  # Business (50,000 API/month, 200 GB storage)
+    5: {'storage': (10000, 100000), 'api': (2500, 25000), 'actions': (500, 5000), 'minutes': (120, 1200)},  # Enterprise (250,000 API/month, 1 TB storage)
+}
+USAGE_METRICS = ['storage', 'api', 'actions', 'minutes']
+
+FREE_PLAN_NAME = 'Free'
+# Plans with at most this many API calls per month are low tier (Free and Starter);
+# their users are more likely to run into their quota
+LOW_TIER_MAX_API_LIMIT = 1000
+
+
+def _by_id(ids: np.ndarray, values: Any, fill: Any, dtype: Any = None) -> np.ndarray:
+    """
+    Read-only array with `values[i]` at position `ids[i]` and `fill` everywhere else.
+    """
+    values = np.asarray(values, dtype=dtype)
+    array = np.full((int(ids.max(initial=0)) + 1,) + values.shape[1:], fill, dtype=values.dtype)
+    array[ids] = values
+    array.setflags(write=False)
+    return array
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array = np.array(array)
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True)
+class PlanReference:
+    """
+    Plan attributes as arrays indexed by plan_id
+
+    Positions that are not a plan ID hold 0 (NaN for fees, None for names);
+    use `contains()` to check IDs before indexing.
+    """
+    ids: np.ndarray  # Sorted plan IDs
+    free_ids: np.ndarray  # Sorted IDs of the free plans
+    paid_ids: np.ndarray  # Sorted IDs of the paid plans
+    known: np.ndarray  # True at every plan ID
+    is_free: np.ndarray
+    is_low_tier: np.ndarray  # API limit of at most LOW_TIER_MAX_API_LIMIT
+    plan_name: np.ndarray
+    monthly_fee: np.ndarray
+    api_limit: np.ndarray
+    storage_limit_mb: np.ndarray
+    feature_count: np.ndarray
+    usage_min: Mapping[str, np.ndarray]  # Per-use minimum of each usage metric
+    usage_max: Mapping[str, np.ndarray]  # Per-use maximum of each usage metric
+
+    def contains(self, plan_ids: np.ndarray) -> np.ndarray:
+        """Boolean mask of the entries of `plan_ids` that are known plan IDs."""
+        plan_ids = np.asarray(plan_ids).astype(np.int64, copy=False)
+        in_range = (plan_ids >= 0) & (plan_ids < len(self.known))
+        return in_range & self.known[np.where(in_range, plan_ids, 0)]
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """Immutable registry of the reference tables and their ID-indexed arrays."""
+    plans: PlanReference
+    region_name: np.ndarray  # Indexed by region_id
+    payment_method_name: np.ndarray  # Indexed by payment_method_id
+    referral_source_name: np.ndarray  # Indexed by referral_source_id
+    tables: Mapping[str, pd.DataFrame]
+
+    def table(self, name: str) -> pd.DataFrame:
+        """
+        Copy of a reference table, keyed as in FakerETL.data
+
+        Copies are handed out so callers can never modify the shared tables.
+        """
+        return self.tables[name].copy()
+
+
+def _plan_reference(plans_df: pd.DataFrame, features_df: pd.DataFrame) -> PlanReference:
+    ids = plans_df['plan_id'].to_numpy(dtype=np.int64)
+    is_free = (plans_df['plan_name'] == FREE_PLAN_NAME).to_numpy()
+    api_limit = plans_df['api_limit'].to_numpy(dtype=np.int64)
+    feature_count = features_df['plan_id'].value_counts().reindex(ids, fill_value=0).to_numpy()
+
+    ranges = [PLAN_USAGE_RANGES.get(int(plan_id), {}) for plan_id in ids]
+    usage_min, usage_max = {}, {}
+    for metric in USAGE_METRICS:
+        usage_min[metric] = _by_id(ids, [r.get(metric, (0, 0))[0] for r in ranges], 0, np.int64)
+        usage_max[metric] = _by_id(ids, [r.get(metric, (0, 0))[1] for r in ranges], 0, np.int64)
+
+    return PlanReference(
+        ids=_read_only(np.sort(ids)),
+        free_ids=_read_only(np.sort(ids[is_free])),
+        paid_ids=_read_only(np.sort(ids[~is_free])),
+        known=_by_id(ids, np.ones(len(ids), dtype=bool), False),
+        is_free=_by_id(ids, is_free, False),
+        is_low_tier=_by_id(ids, api_limit <= LOW_TIER_MAX_API_LIMIT, False),
+        plan_name=_by_id(ids, plans_df['plan_name'].to_numpy(dtype=object), None),
+        monthly_fee=_by_id(ids, plans_df['monthly_fee'].to_numpy(dtype=np.float64), np.nan),
+        api_limit=_by_id(ids, api_limit, 0),
+        storage_limit_mb=_by_id(ids, plans_df['storage_limit_mb'].to_numpy(dtype=np.int64), 0),
+        feature_count=_by_id(ids, feature_count, 0, np.int64),
+        usage_min=MappingProxyType(usage_min),
+        usage_max=MappingProxyType(usage_max),
+    )
+
+
+@lru_cache(maxsize=None)
+def reference_data() -> ReferenceData:
+    """
+    The reference data registry, built on first use and shared afterwards
+
+    Returns:
+        ReferenceData holding the lookup tables and their ID-indexed arrays
+    """
+    tables = {
+        'regions': generate_regions(),
+        'referral_sources': generate_referral_sources(),
+        'payment_methods': generate_payment_methods(),
+        'plans': generate_plans(),
+        'plan_features': generate_plan_features(),
+    }
+
+    def names(df: pd.DataFrame, id_column: str, name_column: str) -> np.ndarray:
+        return _by_id(df[id_column].to_numpy(dtype=np.int64), df[name_column].to_numpy(dtype=object), None)
+
+    return ReferenceData(
+        plans=_plan_reference(tables['plans'], tables['plan_features']),
+        region_name=names(tables['regions'], 'region_id', 'region_name'),
+        payment_method_name=names(tables['payment_methods'], 'payment_method_id', 'method_name'),
+        referral_source_name=names(tables['referral_sources'], 'referral_source_id', 'source_name'),
+        tables=MappingProxyType(tables),
+    )
+
+
+if __name__ == "__main__":
+    plans = reference_data().plans
+    print(f"Plan IDs: {plans.ids}, free: {plans.free_ids}, paid: {plans.paid_ids}")
+    print(f"Low-tier plan IDs: {plans.ids[plans.is_low_tier[plans.ids]]}")
+    print(f"API limits by plan_id: {plans.api_limit}")
+    print(f"Storage usage ranges by plan_id:\n{np.stack([plans.usage_min['storage'], plans.usage_max['storage']], axis=1)}")
@@ -0,0 +1,160 @@
+"""
+Fast-path loader that seeds Postgres with COPY instead of DLT normalize/merge
+
+Each generated DataFrame is streamed into its `test_dlt_dataset` table as CSV
+through `COPY ... FROM STDIN`, in foreign-key order and in a single transaction.
+Tables are created with the same names and column types DLT would use, and
+carry the DLT system columns (`_dlt_load_id`, `_dlt_id`, plus `valid_from` /
+`valid_to` on SCD2 tables) so that the API, later DLT runs and the downstream
+pipeline keep working on a database seeded this way.
+"""
+import base64
+import hashlib
+import io
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from dlt.common import json
+from dlt.common.normalizers.json.helpers import DLT_ID_LENGTH_BYTES
+
+from data_generation.ids import generate_ids
+from table_registry import TABLES, MISSING_DATE
+
+# (key in FakerETL.data, destination table, primary key, is SCD2, date columns), in foreign-key order
+COPY_TABLES: List[Tuple[str, str, str, bool, Tuple[str, ...]]] = [
+    (table.key, table.table_name, table.primary_key, table.is_scd2, table.date_columns) for table in TABLES.values()
+]
+DLT_NOT_NULL_COLUMNS = ['_dlt_id', '_dlt_load_id']
+SCD2_VALIDITY_COLUMNS = ['valid_from', 'valid_to']
+
+COPY_CHUNK_ROWS = 500_000  # Rows serialized to CSV per COPY call
+CONTROL_CHARACTERS = r'[\x00-\x1f]'  # Escaped by JSON as \uXXXX or \n etc.
+
+
+def _postgres_type(dtype: np.dtype) -> str:
+    """Postgres column type DLT would create for a DataFrame column."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'boolean'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'bigint'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'double precision'
+    return 'varchar'
+
+
+def _json_values(values: pd.Series) -> pa.Array:
+    """Values of a column serialized the way DLT's JSON encoder serializes them."""
+    array = pa.array(values, from_pandas=True)
+    if pa.types.is_integer(array.type):
+        return pc.cast(array, pa.string())
+    if pa.types.is_string(array.type) and not pc.any(pc.match_substring_regex(array, CONTROL_CHARACTERS)).as_py():
+        escaped = pc.replace_substring(pc.replace_substring(array, '\\', '\\\\'), '"', '\\"')
+        return pc.fill_null(pc.binary_join_element_wise('"', escaped, '"', ''), 'null')
+    # Floats, dates and strings with control characters
+    return pa.array([json.dumps(value) for value in values.tolist()], pa.string())
+
+
+def row_hashes(df: pd.DataFrame) -> List[str]:
+    """
+    DLT row hashes of the rows of `df`, as DLT's SCD2 merges write them to `_dlt_id`.
+
+    Equal to dlt's get_row_hash of every row, i.e. the shake128 digest of the row
+    serialized as JSON with sorted keys, but the JSON is built column by column
+    with Arrow kernels instead of one dict per row. Only the digest itself is
+    computed per row.
+    """
+    columns = sorted(column for column in df.columns if not column.startswith('_dlt'))
+    parts = []
+    for i, column in enumerate(columns):
+        parts += [('{' if i == 0 else ',') + json.dumps(column) + ':', _json_values(df[column])]
+    rows = pc.cast(pc.binary_join_element_wise(*parts, '}', ''), pa.binary()).to_pylist()
+
+    # Pad the digests to whole base64 blocks, encode them at once and cut the padding off
+    padding = b'\0' * (-DLT_ID_LENGTH_BYTES % 3)
+    digests = b''.join(hashlib.shake_128(row).digest(DLT_ID_LENGTH_BYTES) + padding for row in rows)
+    encoded = np.frombuffer(base64.b64encode(digests), dtype=f'S{(DLT_ID_LENGTH_BYTES + len(padding)) * 4 // 3}')
+    return encoded.astype(f'S{-(-DLT_ID_LENGTH_BYTES * 4 // 3)}').astype(str).tolist()
+
+
+def _with_dlt_columns(df: pd.DataFrame, scd2: bool, load_id: str, loaded_at: datetime) -> pd.DataFrame:
+    """Adds the DLT system columns to a copy of `df`."""
+    df = df.copy()
+    if scd2:
+        # SCD2 tables use the DLT row hash as _dlt_id so later DLT merges detect unchanged rows
+        df['_dlt_id'] = row_hashes(df)
+        valid_from, valid_to = SCD2_VALIDITY_COLUMNS
+        df[valid_from] = loaded_at
+        df[valid_to] = pd.NaT
+    else:
+        df['_dlt_id'] = generate_ids(len(df), width=16)
+    df['_dlt_load_id'] = load_id
+    return df
+
+
+def copy_load(
+    sql_client,
+    data: Dict[str, pd.DataFrame],
+    truncate: bool = False,
+) -> Dict[str, int]:
+    """
+    Loads generated tables into Postgres with COPY
+
+    Args:
+        sql_client: Open DLT Postgres SQL client (e.g. from `pipeline.sql_client()`)
+        data: Generated tables keyed as in FakerETL.data
+        truncate: Empty each table before copying into it
+
+    Returns:
+        Number of rows copied per destination table
+    """
+    load_id = str(time.time())
+    loaded_at = datetime.now(timezone.utc)
+    conn = sql_client.native_connection
+    row_counts: Dict[str, int] = {}
+
+    if not sql_client.has_dataset():
+        sql_client.create_dataset()
+
+    with sql_client.begin_transaction(), conn.cursor() as cursor:
+        for data_key, table_name, primary_key, scd2, date_columns in COPY_TABLES:
+            if data_key not in data:
+                continue
+
+            df = data[data_key]
+            if date_columns:
+                # Missing dates are copied as NULL
+                df = df.replace({column: {MISSING_DATE: None} for column in date_columns})
+            df = _with_dlt_columns(df, scd2, load_id, loaded_at)
+
+            qualified_name = sql_client.make_qualified_table_name(table_name)
+            columns = [sql_client.escape_column_name(column) for column in df.columns]
+            column_defs = []
+            for column, escaped in zip(df.columns, columns):
+                if column in SCD2_VALIDITY_COLUMNS:
+                    column_type = 'timestamp with time zone'
+                elif column in date_columns:
+                    column_type = 'date'
+                else:
+                    column_type = _postgres_type(df[column].dtype)
+                not_null = ' NOT NULL' if column == primary_key or column in DLT_NOT_NULL_COLUMNS else ''
+                column_defs.append(f"{escaped} {column_type}{not_null}")
+
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {qualified_name} ({', '.join(column_defs)})")
+            if truncate:
+                cursor.execute(f"TRUNCATE TABLE {qualified_name}")
+
+            copy_sql = f"COPY {qualified_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+            for start in range(0, len(df), COPY_CHUNK_ROWS):
+                buffer = io.StringIO()
+                df.iloc[start:start + COPY_CHUNK_ROWS].to_csv(buffer, header=False, index=False)
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+
+            row_counts[table_name] = len(df)
+            print(f"[{datetime.now()}] ✓ Copied {len(df)} rows into {table_name}")
+
+    return row_counts
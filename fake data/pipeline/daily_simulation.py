@@ -0,0 +1,388 @@
+"""
+Day-by-day simulation that turns a generated dataset into a live change stream
+
+A simulation starts from a full generated dataset and then advances a clock one
+day at a time. Each day paid subscriptions that ended expire, some get renewed
+(possibly on another plan), some free users upgrade, new users sign up and the
+day's usage is recorded. Only the rows that were added or changed that day are
+returned, ready to be loaded as a delta.
+
+The clock and the part of the population that can still change (the current
+user rows and, per user, the latest subscription plus any still active ones)
+are persisted in a state directory, so every run continues where the last one
+stopped. A state file written last marks which step's files are current, so an
+interrupted run never leaves half-written state behind.
+"""
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional
+import faker
+import numpy as np
+import pandas as pd
+
+from models import User, Subscription, Usage
+from data_generation.generate_users import generate_users
+from data_generation.generate_subscriptions import (
+    generate_subscriptions,
+    PAID_PAYMENT_METHODS,
+    PAID_PAYMENT_WEIGHTS,
+    SAME_PLAN_PROBABILITY,
+)
+from data_generation.generate_usage import (
+    draw_usage_metrics,
+    ENGAGEMENT_LEVELS,
+    FREE_PLAN_USAGE_PROBABILITY,
+    MAX_USAGE_PER_SUBSCRIPTION,
+)
+from data_generation.ids import generate_ids
+from data_generation.reference_data import reference_data
+
+STATE_FILE = 'state.json'
+
+CHURN_PROBABILITY = 0.1  # Chance that a paid subscription is not renewed
+RENEWAL_GAP_DAYS = (1, 8)  # Renewals start 1-7 days after the previous subscription ended
+UPGRADE_PROBABILITY = 0.002  # Daily chance that an active free user upgrades to a paid plan
+
+LEVEL_TABLE = np.array(list(ENGAGEMENT_LEVELS.values()))
+
+
+def _to_days(dates: pd.Series) -> np.ndarray:
+    """datetime64[D] array of 'YYYY-MM-DD' strings, with NaT for 'N/A'."""
+    return pd.to_datetime(dates.replace('N/A', None), format='%Y-%m-%d').to_numpy().astype('datetime64[D]')
+
+
+def _add_month(days: np.ndarray) -> np.ndarray:
+    return (pd.DatetimeIndex(days) + pd.DateOffset(months=1)).values.astype('datetime64[D]')
+
+
+def _draw_engagement(rng: np.random.Generator, size: int) -> np.ndarray:
+    """Engagement level (index into ENGAGEMENT_LEVELS) of new users."""
+    return rng.choice(len(LEVEL_TABLE), size=size, p=LEVEL_TABLE[:, 0])
+
+
+def _subscription_state(
+    subs: pd.DataFrame,
+    engagement: np.ndarray,
+    rng: np.random.Generator,
+) -> pd.DataFrame:
+    """
+    Adds the simulation columns to new subscriptions.
+
+    Args:
+        subs: Subscription rows
+        engagement: Engagement level of each subscription's user
+        rng: Random generator used for all draws
+
+    Returns:
+        Copy of `subs` with whether it will run into its quota, when it gets
+        renewed (NaT for free and churning subscriptions) and its usage so far
+    """
+    subs = subs.copy()
+    plans = reference_data().plans
+    plan_ids = subs['plan_id'].to_numpy(dtype=np.int64)
+
+    hit_probability = np.where(
+        plans.is_low_tier[plan_ids],
+        LEVEL_TABLE[engagement, 2],
+        LEVEL_TABLE[engagement, 3],
+    )
+    subs['aggressive'] = rng.random(len(subs)) < hit_probability
+
+    renews = ~plans.is_free[plan_ids] & (rng.random(len(subs)) >= CHURN_PROBABILITY)
+    gap = rng.integers(*RENEWAL_GAP_DAYS, size=len(subs)).astype('timedelta64[D]')
+    renews_on = _to_days(subs['end_date']) + gap
+    subs['renews_on'] = pd.to_datetime(np.where(renews, renews_on, np.datetime64('NaT')))
+
+    subs['api_used'] = np.zeros(len(subs), dtype=np.int64)
+    subs['storage_used'] = np.zeros(len(subs), dtype=np.float64)
+    subs['usage_count'] = np.zeros(len(subs), dtype=np.int64)
+    return subs
+
+
+def _changeable(subs: pd.DataFrame) -> np.ndarray:
+    """Mask of the subscriptions that can still change: each user's latest and all active ones."""
+    latest = ~subs.duplicated('user_id', keep='last').to_numpy()
+    return latest | (subs['status'] == 'active').to_numpy()
+
+
+class DailySimulation:
+    def __init__(self, state_dir: str):
+        """
+        Args:
+            state_dir: Directory holding the persisted simulation state
+        """
+        self.state_dir = Path(state_dir)
+        self.seed: Optional[int] = None
+        self.step_count = 0
+        self.clock: Optional[np.datetime64] = None
+        self.daily_signups = 0.0
+        self.users = pd.DataFrame()
+        self.subscriptions = pd.DataFrame()
+
+        if (self.state_dir / STATE_FILE).exists():
+            self._load()
+
+    @property
+    def initialized(self) -> bool:
+        return self.clock is not None
+
+    def bootstrap(
+        self,
+        data: Dict[str, pd.DataFrame],
+        seed: Optional[int] = None,
+        clock: Optional[date] = None,
+    ) -> None:
+        """
+        Starts the simulation from a full dataset and saves its initial state.
+
+        Args:
+            data: Dataset keyed as in FakerETL.data (users, subscriptions and usage)
+            seed: Root seed of the daily steps (random if omitted)
+            clock: Date the full dataset was generated for (defaults to today)
+        """
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy)
+        self.step_count = 0
+        self.clock = np.datetime64(clock or date.today(), 'D')
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(0,)))
+
+        users = data['users'].copy()
+        users['engagement'] = _draw_engagement(rng, len(users))
+
+        subs = data['subscriptions']
+        subs = subs[_changeable(subs)]
+        engagement = users['engagement'].to_numpy()[pd.Index(users['user_id']).get_indexer(subs['user_id'])]
+        subs = _subscription_state(subs, engagement, rng)
+        # Users whose renewal would already have happened churned in the full dataset
+        subs.loc[subs['renews_on'] <= pd.Timestamp(self.clock), 'renews_on'] = pd.NaT
+
+        # Usage already recorded counts towards the quotas
+        usage = data['usage'].groupby('subscription_id').agg(
+            api_used=('api_calls', 'sum'),
+            storage_used=('storage_used_mb', 'sum'),
+            usage_count=('usage_id', 'size'),
+        )
+        recorded = usage.reindex(subs['subscription_id'], fill_value=0)
+        for column in recorded.columns:
+            subs[column] = recorded[column].to_numpy()
+
+        # New signups follow the average daily signup rate of the full dataset
+        first_signup = _to_days(users['signup_date']).min(initial=self.clock)
+        self.daily_signups = len(users) / max(1, int((self.clock - first_signup).astype(np.int64)))
+
+        self.users = users.reset_index(drop=True)
+        self.subscriptions = subs.reset_index(drop=True)
+        self.save()
+
+    def step(self) -> Dict[str, pd.DataFrame]:
+        """
+        Simulates the day after the clock and advances the clock to it.
+
+        The new state is kept in memory; call save() once the delta has been
+        loaded, so a failed load repeats the same day on the next run.
+
+        Returns:
+            The day's new and changed users and subscriptions and its usage,
+            keyed as in FakerETL.data
+        """
+        if not self.initialized:
+            raise RuntimeError("Simulation has no state yet. Run bootstrap() first.")
+
+        step = self.step_count + 1
+        day = self.clock + 1
+        day_str = str(day)
+        seed = np.random.SeedSequence(self.seed, spawn_key=(step,))
+        rng = np.random.default_rng(seed)
+        fake = faker.Faker(locale='en_US')
+        fake.seed_instance(int(seed.generate_state(1)[0]))
+        id_prefix = f"s{step:05d}"
+        plans = reference_data().plans
+
+        users = self.users.copy()
+        subs = self.subscriptions.copy()
+        user_changed = np.zeros(len(users), dtype=bool)
+        sub_changed = np.zeros(len(subs), dtype=bool)
+        user_pos = pd.Index(users['user_id'])
+
+        # Paid subscriptions that ended yesterday expire
+        expiring = (subs['status'] == 'active').to_numpy() & (_to_days(subs['end_date']) < day)
+        subs.loc[expiring, 'status'] = 'expired'
+        sub_changed |= expiring
+
+        latest = ~subs.duplicated('user_id', keep='last').to_numpy()
+        plan_ids = subs['plan_id'].to_numpy(dtype=np.int64)
+
+        # Renewals, keeping the same plan or moving to one of the other paid plans
+        renewing = latest & (subs['renews_on'] <= pd.Timestamp(day)).to_numpy()
+        renewed_plan = plan_ids[renewing]
+        switch = rng.random(len(renewed_plan)) >= SAME_PLAN_PROBABILITY
+        offset = rng.integers(1, len(plans.paid_ids), size=len(renewed_plan))
+        position = np.searchsorted(plans.paid_ids, renewed_plan)
+        renewed_plan = np.where(switch, plans.paid_ids[(position + offset) % len(plans.paid_ids)], renewed_plan)
+        subs.loc[renewing, 'renews_on'] = pd.NaT
+
+        # Some active free users upgrade; their free subscription ends today
+        upgrading = (
+            latest
+            & plans.is_free[plan_ids]
+            & (subs['status'] == 'active').to_numpy()
+            & (rng.random(len(subs)) < UPGRADE_PROBABILITY)
+        )
+        subs.loc[upgrading, ['end_date', 'status']] = [day_str, 'expired']
+        sub_changed |= upgrading
+        upgraded_plan = rng.choice(plans.paid_ids, size=int(upgrading.sum()))
+
+        new_owner = np.concatenate([subs['user_id'].to_numpy()[renewing], subs['user_id'].to_numpy()[upgrading]])
+        new_plan = np.concatenate([renewed_plan, upgraded_plan]).astype(np.int64)
+        new_subs = pd.DataFrame(
+            {
+                'subscription_id': generate_ids(len(new_owner), rng, prefix=f"{id_prefix}r"),
+                'user_id': new_owner,
+                'plan_id': new_plan,
+                'start_date': day_str,
+                'end_date': np.datetime_as_string(_add_month(np.full(len(new_owner), day)), unit='D'),
+                'payment_method_id': rng.choice(PAID_PAYMENT_METHODS, size=len(new_owner), p=PAID_PAYMENT_WEIGHTS),
+                'status': 'active',
+            },
+            columns=list(Subscription.model_fields),
+        )
+
+        # Plan changes produce a new version of the user
+        owner_pos = user_pos.get_indexer(new_owner)
+        plan_changed = users['plan_id'].to_numpy()[owner_pos] != new_plan
+        users.loc[owner_pos[plan_changed], 'plan_id'] = new_plan[plan_changed]
+        user_changed[owner_pos[plan_changed]] = True
+
+        # New signups with their initial subscription
+        signups = generate_users(int(rng.poisson(self.daily_signups)), rng=rng, fake=fake, id_prefix=id_prefix)
+        signups['signup_date'] = day_str
+        signup_subs = generate_subscriptions(signups, rng=rng, id_prefix=f"{id_prefix}n", renewals=False)
+        signup_subs['status'] = 'active'
+        signups['engagement'] = _draw_engagement(rng, len(signups))
+
+        users = pd.concat([users, signups], ignore_index=True)
+        user_changed = np.concatenate([user_changed, np.ones(len(signups), dtype=bool)])
+        user_pos = pd.Index(users['user_id'])
+
+        added = pd.concat([new_subs, signup_subs], ignore_index=True)
+        engagement = users['engagement'].to_numpy()[user_pos.get_indexer(added['user_id'])]
+        subs = pd.concat([subs, _subscription_state(added, engagement, rng)], ignore_index=True)
+        sub_changed = np.concatenate([sub_changed, np.ones(len(added), dtype=bool)])
+
+        usage = self._record_usage(subs, users, day, rng, id_prefix)
+
+        delta = {
+            'users': users.loc[user_changed, list(User.model_fields)].reset_index(drop=True),
+            'subscriptions': subs.loc[sub_changed, list(Subscription.model_fields)].reset_index(drop=True),
+            'usage': usage,
+        }
+
+        self.users = users
+        self.subscriptions = subs[_changeable(subs)].reset_index(drop=True)
+        self.clock = day
+        self.step_count = step
+        return delta
+
+    def _record_usage(
+        self,
+        subs: pd.DataFrame,
+        users: pd.DataFrame,
+        day: np.datetime64,
+        rng: np.random.Generator,
+        id_prefix: str,
+    ) -> pd.DataFrame:
+        """
+        Draws the day's usage of all running subscriptions and adds it to their quota usage.
+
+        Returns:
+            DataFrame with the day's usage records
+        """
+        plans = reference_data().plans
+        plan_ids = subs['plan_id'].to_numpy(dtype=np.int64)
+        start = _to_days(subs['start_date'])
+        end = _to_days(subs['end_date'])
+        api_used = subs['api_used'].to_numpy()
+        storage_used = subs['storage_used'].to_numpy()
+        api_limit = plans.api_limit[plan_ids]
+        storage_limit = plans.storage_limit_mb[plan_ids]
+
+        running = (
+            (subs['status'] == 'active').to_numpy()
+            & (start <= day)
+            & (np.isnat(end) | (end >= day))
+            & (subs['usage_count'].to_numpy() < MAX_USAGE_PER_SUBSCRIPTION)
+            & (api_used < api_limit)
+            & (storage_used < storage_limit)
+        )
+
+        # Users use the product about once every `days between usage` days
+        engagement = users['engagement'].to_numpy()[pd.Index(users['user_id']).get_indexer(subs['user_id'])]
+        usage_probability = np.where(plans.is_free[plan_ids], FREE_PLAN_USAGE_PROBABILITY, 1.0) / LEVEL_TABLE[engagement, 1]
+        idx = np.flatnonzero(running & (rng.random(len(subs)) < usage_probability))
+
+        # Same multipliers as generate_usage: weekends, growth within the period, quota hitters
+        weekend_factor = 0.6 if (day.astype(np.int64) + 3) % 7 >= 5 else 1.0
+        elapsed = (day - start[idx]).astype(np.int64)
+        total_days = np.where(np.isnat(end[idx]), elapsed, (end[idx] - start[idx]).astype(np.int64))
+        growth_factor = 1.0 + elapsed / np.maximum(total_days, 1) * 0.3
+        aggressive = subs['aggressive'].to_numpy()[idx]
+        aggressive_factor = rng.uniform(np.where(aggressive, 1.5, 0.5), np.where(aggressive, 2.5, 1.2))
+
+        storage, api, actions, active_mins = draw_usage_metrics(
+            rng, plan_ids[idx], weekend_factor * growth_factor * aggressive_factor
+        )
+
+        # The record that exhausts a quota is capped at what was left of it
+        api = np.minimum(api, api_limit[idx] - api_used[idx])
+        storage = np.minimum(storage, storage_limit[idx] - storage_used[idx])
+        keep = (api > 0) | (storage > 0)
+        idx, storage, api, actions, active_mins = idx[keep], storage[keep], api[keep], actions[keep], active_mins[keep]
+
+        subs.loc[idx, 'api_used'] = api_used[idx] + api
+        subs.loc[idx, 'storage_used'] = storage_used[idx] + storage
+        subs.loc[idx, 'usage_count'] = subs['usage_count'].to_numpy()[idx] + 1
+
+        return pd.DataFrame(
+            {
+                'usage_id': generate_ids(len(idx), rng, prefix=id_prefix),
+                'user_id': subs['user_id'].to_numpy()[idx],
+                'subscription_id': subs['subscription_id'].to_numpy()[idx],
+                'usage_date': str(day),
+                'actions_performed': np.maximum(1, actions),
+                'storage_used_mb': np.maximum(0.1, storage),
+                'api_calls': np.maximum(1, api),
+                'active_minutes': np.maximum(1, active_mins),
+            },
+            columns=list(Usage.model_fields),
+        )
+
+    def save(self) -> None:
+        """Persists the current state; the state file is replaced last, so it always points at complete files."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.users.to_parquet(self.state_dir / f'users-{self.step_count}.parquet', index=False)
+        self.subscriptions.to_parquet(self.state_dir / f'subscriptions-{self.step_count}.parquet', index=False)
+
+        state = {
+            'seed': self.seed,
+            'step': self.step_count,
+            'clock': str(self.clock),
+            'daily_signups': self.daily_signups,
+        }
+        staging = self.state_dir / f'.{STATE_FILE}.tmp'
+        staging.write_text(json.dumps(state, indent=2))
+        os.replace(staging, self.state_dir / STATE_FILE)
+
+        # Drop the files of earlier steps
+        for path in self.state_dir.glob('*.parquet'):
+            if not path.stem.endswith(f'-{self.step_count}'):
+                path.unlink()
+
+    def _load(self) -> None:
+        state = json.loads((self.state_dir / STATE_FILE).read_text())
+        self.seed = state['seed']
+        self.step_count = state['step']
+        self.clock = np.datetime64(state['clock'], 'D')
+        self.daily_signups = state['daily_signups']
+        self.users = pd.read_parquet(self.state_dir / f'users-{self.step_count}.parquet')
+        self.subscriptions = pd.read_parquet(self.state_dir / f'subscriptions-{self.step_count}.parquet')
@@ -0,0 +1,133 @@
+"""
+On-disk cache of generated datasets
+
+Each dataset is stored as one Parquet file per table in a directory named after
+its cache key. The key covers the seed, the user count, the shard count, the
+as-of date the data was generated for and a hash of the generator sources, so
+editing any generator invalidates old entries, and entries of earlier days are
+not served as current data.
+Entries are evicted least-recently-used first once the cache grows past its
+size budget.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Sources whose changes alter the generated data
+GENERATOR_SOURCE_DIRS = [
+    Path(__file__).resolve().parent.parent / 'data_generation',
+    Path(__file__).resolve().parent.parent / 'models',
+]
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3  # 10 GB
+
+
+def generator_version() -> str:
+    """Hash of the generator sources, used to invalidate stale cache entries."""
+    digest = hashlib.sha256()
+    for source_dir in GENERATOR_SOURCE_DIRS:
+        for path in sorted(source_dir.rglob('*.py')):
+            digest.update(path.relative_to(source_dir.parent).as_posix().encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class DatasetCache:
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Directory holding the cached datasets
+            max_bytes: Size budget; least recently used entries are evicted beyond it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(seed: int, user_count: int, shards: int, as_of: date) -> str:
+        """Cache key of a dataset generated with the given parameters."""
+        raw = f"seed={seed};users={user_count};shards={shards};as_of={as_of.isoformat()};version={generator_version()}"
+        return hashlib.sha256(raw.encode()).hexdigest()[:24]
+
+    def load(self, key: str) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Loads a cached dataset, or returns None on a cache miss.
+
+        Files are memory-mapped and converted to pandas without consolidating
+        columns into new blocks, so the Arrow buffers are not copied twice.
+        """
+        entry = self.cache_dir / key
+        if not entry.is_dir():
+            return None
+
+        data = {}
+        for path in sorted(entry.glob('*.parquet')):
+            table = pq.read_table(path, memory_map=True)
+            data[path.stem] = table.to_pandas(split_blocks=True, self_destruct=True)
+
+        # Mark the entry as recently used
+        os.utime(entry)
+        return data
+
+    def store(self, key: str, data: Dict[str, pd.DataFrame]) -> Path:
+        """
+        Stores a dataset under `key` and evicts old entries beyond the size budget.
+
+        If another process stores the same key first, its entry is kept and
+        this one is discarded; both hold the same data, as the key determines it.
+
+        Returns:
+            Directory of the entry
+        """
+        entry = self.cache_dir / key
+        if entry.exists():
+            return entry
+
+        # Write to a temporary directory first so readers never see partial entries
+        staging = Path(tempfile.mkdtemp(prefix=f'.{key}-', dir=self.cache_dir))
+        try:
+            for table_name, df in data.items():
+                df.to_parquet(staging / f'{table_name}.parquet', index=False)
+            staging.rename(entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            # Renaming onto a non-empty directory fails: another process won the race
+            if entry.is_dir():
+                return entry
+            raise
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self.evict(keep=key)
+        return entry
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Removes least recently used entries until the cache fits its size budget.
+
+        Args:
+            keep: Key of an entry that must not be evicted (e.g. the one just stored)
+
+        Returns:
+            Keys of the evicted entries
+        """
+        entries = [path for path in self.cache_dir.iterdir() if path.is_dir() and not path.name.startswith('.')]
+        sizes = {path: sum(f.stat().st_size for f in path.glob('*.parquet')) for path in entries}
+        total = sum(sizes.values())
+
+        evicted = []
+        for path in sorted(entries, key=lambda p: p.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            if path.name == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= sizes[path]
+            evicted.append(path.name)
+        return evicted
@@ -6,170 +6,491 @@ and can load them into a database using DLT.
 """
 import sys
 import os
-from datetime import datetime
-from typing import Dict, Any, Optional
+import math
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, Optional
+import faker
+import numpy as np
 import pandas as pd
 import dlt
 
-# Add parent directory to path to allow imports from sibling directories
+# Add parent directory to path to allow imports from sibling directories,
+# and the repository root for the table registry
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from data_generation.generate_regions import generate_regions
-from data_generation.generate_referral_sources import generate_referral_sources
-from data_generation.generate_payment_methods import generate_payment_methods
-from data_generation.generate_plans import generate_plans
-from data_generation.generate_plan_features import generate_plan_features
+from table_registry import TABLES, DATASET_NAME, MISSING_DATE, SCD2_DISPOSITION, UPSERT_DISPOSITION
+
+from data_generation.reference_data import reference_data
 from data_generation.generate_users import generate_users
 from data_generation.generate_subscriptions import generate_subscriptions
 from data_generation.generate_usage import generate_usage
+from pipeline.dataset_cache import DatasetCache, DEFAULT_MAX_BYTES
+from pipeline.copy_loader import copy_load
+from pipeline.daily_simulation import DailySimulation
+from pipeline.profiling import StageProfiler, PROFILERS
+
+PIPELINE_NAME = DATASET_NAME
+
+# Tables generated per shard, in dependency order
+SHARDED_TABLES = [table.key for table in TABLES.values() if table.sharded]
+
+# Destination table, write disposition, primary key and column types per key in FakerETL.data, in dependency order
+TABLE_HINTS = {
+    table.key: {
+        'table_name': table.table_name,
+        'write_disposition': table.write_disposition,
+        'primary_key': table.primary_key,
+        'columns': {
+            # SCD2 validity columns lead: DLT's sqlalchemy destination inserts SCD2 rows assuming they come first
+            **{
+                column: {'name': column, 'data_type': 'timestamp'}
+                for column in table.write_disposition.get('validity_column_names', [])
+            },
+            **{column: {'name': column, 'data_type': 'date'} for column in table.date_columns},
+        },
+    }
+    for table in TABLES.values()
+}
+LOOKUP_TABLES = [table for table in TABLE_HINTS if table not in SHARDED_TABLES]
+
+RECORDS_PER_ITEM = 10000  # Rows converted to dicts at a time when handing a DataFrame to DLT
+DEFAULT_FILE_FORMAT = "parquet"
+
+
+def generate_shard(
+    user_count: int,
+    seed: np.random.SeedSequence,
+    id_prefix: str = '',
+    profiler: Optional[StageProfiler] = None,
+    as_of: Optional[date] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Generate users, then their subscriptions, then their usage for one shard.
+
+    The shard gets its own random generator and Faker instance, both derived from
+    `seed`, so its output only depends on the seed and the as-of date, never
+    on other shards.
+
+    Args:
+        user_count: Number of users in this shard
+        seed: Seed sequence of this shard
+        id_prefix: Prefix added to every generated ID to keep shards apart
+        profiler: Profiler measuring each generator as a stage
+        as_of: Date the data is generated as of (defaults to today)
+
+    Returns:
+        Dictionary with the users, subscriptions and usage DataFrames
+    """
+    rng = np.random.default_rng(seed)
+    fake = faker.Faker(locale='en_US')
+    fake.seed_instance(int(seed.generate_state(1)[0]))
+
+    profiler = profiler or StageProfiler()
+    with profiler.stage('generate_users') as stage:
+        users = generate_users(user_count, rng=rng, fake=fake, id_prefix=id_prefix, as_of=as_of)
+        stage.rows = len(users)
+    with profiler.stage('generate_subscriptions') as stage:
+        subscriptions = generate_subscriptions(users, rng=rng, id_prefix=id_prefix, as_of=as_of)
+        stage.rows = len(subscriptions)
+    with profiler.stage('generate_usage') as stage:
+        usage = generate_usage(users, subscriptions, rng=rng, id_prefix=id_prefix, as_of=as_of)
+        stage.rows = len(usage)
+    return {'users': users, 'subscriptions': subscriptions, 'usage': usage}
+
+
+def _records(df: pd.DataFrame, key: str) -> Iterator[list]:
+    """
+    Yields the rows of table `key` as lists of dicts, RECORDS_PER_ITEM rows at a time.
+
+    Missing dates ('N/A') in the table's date columns are yielded as None, as
+    they are stored as NULL in DATE columns.
+    """
+    missing_dates = {column: {MISSING_DATE: None} for column in TABLES[key].date_columns}
+    for start in range(0, len(df), RECORDS_PER_ITEM):
+        chunk = df.iloc[start:start + RECORDS_PER_ITEM]
+        if missing_dates:
+            chunk = chunk.replace(missing_dates)
+        yield chunk.to_dict(orient='records')
+
+
+def _resource_hints(key: str, incremental: bool) -> Dict[str, Any]:
+    """
+    Resource hints of a table: its TABLE_HINTS plus merge key hints if it is SCD2.
+
+    Incremental loads use the primary key as merge key. Full loads explicitly
+    unset it, as a merge key set by an earlier incremental load would otherwise
+    stay in the stored schema and stop full loads from retiring absent rows.
+    """
+    hints = TABLE_HINTS[key]
+    if hints['write_disposition'] is not SCD2_DISPOSITION:
+        return hints
+    primary_key = hints['primary_key']
+    if incremental:
+        return {**hints, 'merge_key': primary_key}
+    return {**hints, 'columns': {**hints['columns'], primary_key: {'name': primary_key, 'merge_key': False}}}
+
+
+def _table_resources(data: Dict[str, pd.DataFrame], incremental: bool = False) -> list:
+    """
+    One DLT resource per table in `data`, carrying the table's hints from TABLE_HINTS.
+
+    Args:
+        data: Tables keyed as in FakerETL.data
+        incremental: Whether `data` is a delta; SCD2 tables then get their primary
+            key as merge key, so rows absent from the delta are not retired
+    """
+    return [
+        dlt.resource(_records(data[key], key), name=key, **_resource_hints(key, incremental))
+        for key in TABLE_HINTS
+        if key in data
+    ]
+
+
+@dlt.source(name=PIPELINE_NAME)
+def faker_source(data: Dict[str, pd.DataFrame]):
+    """
+    A DLT source with one resource per generated table.
+
+    Loading the whole source in one pipeline run writes all tables in a single
+    load package, instead of one extract/normalize/load cycle per table.
+
+    Args:
+        data: Generated tables keyed as in FakerETL.data
+    """
+    return _table_resources(data)
+
+
+@dlt.source(name=PIPELINE_NAME)
+def incremental_source(delta: Dict[str, pd.DataFrame]):
+    """
+    A DLT source that loads a delta of new and changed rows.
+
+    SCD2 tables get their primary key as merge key, so only rows whose key is in
+    the delta get a new version; rows absent from the delta stay current instead
+    of being retired as they would be in a full load.
+
+    Args:
+        delta: New and changed rows keyed as in FakerETL.data
+    """
+    return _table_resources(delta, incremental=True)
+
+
+@dlt.source(name=PIPELINE_NAME)
+def streaming_source(shards: Iterable[Dict[str, pd.DataFrame]], lookups: Optional[Dict[str, pd.DataFrame]] = None):
+    """
+    A DLT source that loads users, subscriptions and usage shard by shard.
+
+    Each shard is handed to the table resources as soon as it is generated and
+    dropped once they have written it, so the source itself holds one shard at
+    a time.
+    The source shares its schema name with the pipeline, so the tables are the
+    same ones that load() writes to.
+
+    Args:
+        shards: Iterable of shard dictionaries as produced by FakerETL.iter_shards()
+        lookups: Lookup tables loaded in the same run, keyed as in FakerETL.data
+    """
+    @dlt.resource(selected=False)
+    def shard_data():
+        yield from shards
+
+    @dlt.transformer(data_from=shard_data, **_resource_hints('users', False))
+    def users(shard: Dict[str, pd.DataFrame]):
+        yield from _records(shard['users'], 'users')
+
+    @dlt.transformer(data_from=shard_data, **_resource_hints('subscriptions', False))
+    def subscriptions(shard: Dict[str, pd.DataFrame]):
+        yield from _records(shard['subscriptions'], 'subscriptions')
+
+    @dlt.transformer(data_from=shard_data, **_resource_hints('usage', False))
+    def usage(shard: Dict[str, pd.DataFrame]):
+        yield from _records(shard['usage'], 'usage')
+
+    return [*_table_resources(lookups or {}), shard_data, users, subscriptions, usage]
 
 
 class FakerETL:
-    def __init__(self, user_count: int = 1000):
+    def __init__(
+        self,
+        user_count: int = 1000,
+        shards: int = 1,
+        seed: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        normalize_workers: int = 1,
+        load_workers: int = 20,
+        loader_file_format: str = DEFAULT_FILE_FORMAT,
+        profiler: Optional[StageProfiler] = None,
+        as_of: Optional[date] = None,
+    ):
+        """
+        Args:
+            user_count: Total number of users to generate
+            shards: Number of shards the users are split into; shards > 1 are
+                generated in a process pool
+            seed: Root seed; the same seed, shard count and as-of date reproduce the same data
+            max_workers: Size of the process pool (defaults to the CPU count)
+            cache_dir: Directory of the generated-dataset cache; seeded runs reuse
+                a cached dataset instead of regenerating it
+            cache_max_bytes: Size budget of the dataset cache
+            normalize_workers: Processes DLT uses to normalize extracted files
+            load_workers: Load jobs DLT runs against the destination in parallel
+            loader_file_format: File format of the load jobs; "parquet" on Postgres
+                requires the ADBC Postgres driver
+            profiler: Stage profiler measuring each generation and load phase;
+                phases are not measured if omitted
+            as_of: Date the data is generated as of, which decides signup dates,
+                subscription statuses and how long open-ended usage runs
+                (defaults to the day the ETL is created)
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+
         self.user_count = user_count
+        self.shards = shards
+        self.seed = seed
+        self.as_of = as_of or date.today()
+        self.max_workers = max_workers
+        self.normalize_workers = normalize_workers
+        self.load_workers = load_workers
+        self.loader_file_format = loader_file_format
+        self.cache = DatasetCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.profiler = profiler or StageProfiler()
         self.data: Dict[str, pd.DataFrame] = {}
         self.pipeline = dlt.pipeline(
-            pipeline_name="test_dlt_dataset",
+            pipeline_name=PIPELINE_NAME,
             destination="postgres",
-            dataset_name="test_dlt_dataset",
+            dataset_name=PIPELINE_NAME,
         )
 
     def extract(self) -> None:
         """
         Generates data in the correct dependency order.
         Stores data in memory (self.data).
+
+        With a cache configured and a seed set, transactional tables cached for
+        the same seed, size, shard count, as-of date and generator sources are loaded
+        instead of being regenerated.
         """
         print(f"[{datetime.now()}] Starting data extraction...")
+        with self.profiler.stage('extract') as stage:
+            self._extract()
+            stage.rows = sum(len(df) for df in self.data.values())
+        print(f"[{datetime.now()}] Data extraction complete.")
 
+    def _extract(self) -> None:
         # Phase 1: Generate Lookup/Reference Tables (no dependencies)
+        with self.profiler.stage('lookup_tables') as stage:
+            self._extract_lookup_tables()
+            stage.rows = sum(len(self.data[table]) for table in LOOKUP_TABLES)
+
+        cache_key = None
+        if self.cache is not None and self.seed is not None:
+            cache_key = self.cache.key(self.seed, self.user_count, self.shards, self.as_of)
+            with self.profiler.stage('cache_load') as stage:
+                cached = self.cache.load(cache_key)
+                if cached is not None:
+                    stage.rows = sum(len(df) for df in cached.values())
+            if cached is not None:
+                self.data.update(cached)
+                print(f"[{datetime.now()}] ✓ Loaded transactional tables from cache entry {cache_key}")
+                return
+
+        # Phase 2: Generate Transactional Tables (have dependencies)
+        print(f"[{datetime.now()}] Generating transactional tables in {self.shards} shard(s)...")
+
+        with self.profiler.stage('generate') as stage:
+            shard_data = list(self.iter_shards())
+            for table in SHARDED_TABLES:
+                self.data[table] = pd.concat([shard[table] for shard in shard_data], ignore_index=True)
+            stage.rows = sum(len(self.data[table]) for table in SHARDED_TABLES)
+
+        print(f"[{datetime.now()}] ✓ Generated {len(self.data['users'])} users")
+        print(f"[{datetime.now()}] ✓ Generated {len(self.data['subscriptions'])} subscriptions")
+        print(f"[{datetime.now()}] ✓ Generated {len(self.data['usage'])} usage records")
+
+        if cache_key is not None:
+            with self.profiler.stage('cache_store'):
+                self.cache.store(cache_key, {table: self.data[table] for table in SHARDED_TABLES})
+            print(f"[{datetime.now()}] ✓ Stored dataset in cache entry {cache_key}")
+
+    def _extract_lookup_tables(self) -> None:
+        """Copies the static lookup/reference tables from the reference data registry into self.data."""
         print(f"[{datetime.now()}] Generating lookup tables...")
-        self.data['regions'] = generate_regions()
+        reference = reference_data()
+        self.data['regions'] = reference.table('regions')
         print(f"[{datetime.now()}] ✓ Generated {len(self.data['regions'])} regions")
         
-        self.data['referral_sources'] = generate_referral_sources()
+        self.data['referral_sources'] = reference.table('referral_sources')
         print(f"[{datetime.now()}] ✓ Generated {len(self.data['referral_sources'])} referral sources")
         
-        self.data['payment_methods'] = generate_payment_methods()
+        self.data['payment_methods'] = reference.table('payment_methods')
         print(f"[{datetime.now()}] ✓ Generated {len(self.data['payment_methods'])} payment methods")
         
-        self.data['plans'] = generate_plans()
+        self.data['plans'] = reference.table('plans')
         print(f"[{datetime.now()}] ✓ Generated {len(self.data['plans'])} plans")
         
-        self.data['plan_features'] = generate_plan_features()
+        self.data['plan_features'] = reference.table('plan_features')
         print(f"[{datetime.now()}] ✓ Generated {len(self.data['plan_features'])} plan features")
-        
-        # Phase 2: Generate Transactional Tables (have dependencies)
-        print(f"[{datetime.now()}] Generating transactional tables...")
-        
-        self.data['users'] = generate_users(self.user_count)
-        print(f"[{datetime.now()}] ✓ Generated {len(self.data['users'])} users")
-        
-        self.data['subscriptions'] = generate_subscriptions(self.data['users'])
-        print(f"[{datetime.now()}] ✓ Generated {len(self.data['subscriptions'])} subscriptions")
-        
-        self.data['usage'] = generate_usage(self.data['users'], self.data['subscriptions'])
-        print(f"[{datetime.now()}] ✓ Generated {len(self.data['usage'])} usage records")
-        
-        print(f"[{datetime.now()}] Data extraction complete.")
+
+    def iter_shards(self, shards: Optional[int] = None) -> Iterator[Dict[str, pd.DataFrame]]:
+        """
+        Generates the transactional tables shard by shard.
+
+        Shards are yielded in shard order. At most one shard per worker is in
+        flight at a time, and finished shards wait in this process until they
+        are yielded, so up to `workers` shards are held besides the one the
+        caller consumes. A single shard is generated in-process without any
+        ID prefix, with its generators measured as profiler stages; shards from
+        the process pool are only measured as a whole.
+
+        Args:
+            shards: Number of shards to split the users into (defaults to self.shards)
+        """
+        shards = shards or self.shards
+        seeds = np.random.SeedSequence(self.seed).spawn(shards)
+        sizes = [len(part) for part in np.array_split(np.arange(self.user_count), shards)]
+
+        if shards == 1:
+            yield generate_shard(sizes[0], seeds[0], profiler=self.profiler, as_of=self.as_of)
+            return
+
+        # Fixed-width prefixes keep IDs unique across shards
+        width = len(f"{shards - 1:x}")
+        prefixes = [f"{shard:0{width}x}" for shard in range(shards)]
+
+        workers = self.max_workers or os.cpu_count() or 1
+        jobs = iter(zip(sizes, seeds, prefixes))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque(
+                executor.submit(generate_shard, *job, as_of=self.as_of) for job in islice(jobs, workers)
+            )
+            for shard in range(1, shards + 1):
+                result = pending.popleft().result()
+                # Keep the pool busy while the caller consumes this shard
+                for job in islice(jobs, 1):
+                    pending.append(executor.submit(generate_shard, *job, as_of=self.as_of))
+                print(f"[{datetime.now()}] ✓ Generated shard {shard}/{shards}")
+                yield result
+
+    def stream(self, chunk_size: int = 10000) -> None:
+        """
+        Generates and loads the data in chunks of at most `chunk_size` users.
+
+        Lookup tables are loaded first. Users, subscriptions and usage are then
+        generated chunk by chunk and passed to DLT as soon as each chunk is
+        ready, all within a single pipeline run. Peak memory does not depend on
+        user_count but on the chunk size times the number of shards in flight,
+        i.e. about (workers + 1) × chunk_size, see iter_shards(). Nothing is
+        kept in self.data.
+        """
+        shards = max(self.shards, math.ceil(self.user_count / chunk_size))
+        print(f"[{datetime.now()}] Streaming {self.user_count} users in {shards} chunk(s)...")
+
+        self._extract_lookup_tables()
+        lookups = {table: self.data.pop(table) for table in LOOKUP_TABLES}
+        self.data.clear()
+
+        with self.profiler.stage('stream'):
+            self._run(streaming_source(self.iter_shards(shards), lookups))
+        print(f"[{datetime.now()}] Streaming load complete.")
+
+    def simulate(self, days: int, state_dir: str) -> None:
+        """
+        Advances the daily simulation in `state_dir` by `days` days.
+
+        Each simulated day's new and changed rows are loaded as a delta. If
+        `state_dir` holds no simulation yet, the full dataset is generated and
+        loaded first and the simulation starts from it.
+
+        Args:
+            days: Number of days to simulate
+            state_dir: Directory holding the persisted simulation state
+        """
+        simulation = DailySimulation(state_dir)
+        if not simulation.initialized:
+            self.run()
+            simulation.bootstrap(self.data, seed=self.seed, clock=self.as_of)
+            self.data.clear()
+            print(f"[{datetime.now()}] ✓ Started simulation at {simulation.clock}")
+
+        for _ in range(days):
+            with self.profiler.stage('simulate_day'):
+                with self.profiler.stage('simulate_step') as stage:
+                    delta = simulation.step()
+                    stage.rows = sum(len(df) for df in delta.values())
+                print(
+                    f"[{datetime.now()}] Simulated {simulation.clock}: "
+                    + ", ".join(f"{len(df)} {table}" for table, df in delta.items())
+                )
+                self._run(incremental_source(delta))
+                # Only advance the persisted clock once the day's delta is loaded
+                simulation.save()
+
+        print(f"[{datetime.now()}] Simulation complete.")
+
+    def _run(self, source) -> None:
+        """
+        Loads `source` in a single pipeline run.
+
+        The extract, normalize and load steps are run one by one, equivalent to
+        pipeline.run(), so that each step gets its configured parallelism.
+        """
+        print(f"[{datetime.now()}] Extracting {', '.join(source.selected_resources)}...")
+        with self.profiler.stage('dlt_extract'):
+            self.pipeline.extract(source, loader_file_format=self.loader_file_format)
+
+        print(f"[{datetime.now()}] Normalizing with {self.normalize_workers} worker(s)...")
+        with self.profiler.stage('dlt_normalize') as stage:
+            normalize_info = self.pipeline.normalize(workers=self.normalize_workers)
+            rows = sum(normalize_info.row_counts.values())
+            stage.rows = rows
+
+        print(f"[{datetime.now()}] Loading with {self.load_workers} worker(s)...")
+        with self.profiler.stage('dlt_load') as stage:
+            load_info = self.pipeline.load(workers=self.load_workers)
+            stage.rows = rows
+        print(f"[{datetime.now()}] ✓ Loaded {len(load_info.loads_ids)} load package(s)")
 
     def load(self) -> None:
         """
         Loads the generated data into the destination using DLT.
-        Loads in dependency order: lookup tables first, then transactional tables.
+        All tables are loaded in a single pipeline run, as one load package.
         """
         if not self.data:
             print("No data to load. Run extract() first.")
             return
 
         print(f"[{datetime.now()}] Starting data load...")
+        with self.profiler.stage('load') as stage:
+            self._run(faker_source(self.data))
+            stage.rows = sum(len(df) for df in self.data.values())
+        print(f"[{datetime.now()}] Data load complete.")
 
-        # === PHASE 1: Load Lookup/Reference Tables ===
-        print(f"[{datetime.now()}] Loading lookup tables...")
-        
-        # Regions
-        print(f"[{datetime.now()}] Loading regions...")
-        self.pipeline.run(
-            self.data['regions'].to_dict(orient='records'),
-            table_name="regions",
-            write_disposition={"disposition": "merge", "strategy": "upsert"},
-            primary_key="region_id"
-        )
-        
-        # Referral Sources
-        print(f"[{datetime.now()}] Loading referral_sources...")
-        self.pipeline.run(
-            self.data['referral_sources'].to_dict(orient='records'),
-            table_name="referral",
-            write_disposition={"disposition": "merge", "strategy": "upsert"},
-            primary_key="referral_source_id"
-        )
-        
-        # Payment Methods
-        print(f"[{datetime.now()}] Loading payment_methods...")
-        self.pipeline.run(
-            self.data['payment_methods'].to_dict(orient='records'),
-            table_name="payment_methods",
-            write_disposition={"disposition": "merge", "strategy": "upsert"},
-            primary_key="payment_method_id"
-        )
-        
-        # Plans
-        print(f"[{datetime.now()}] Loading plans...")
-        self.pipeline.run(
-            self.data['plans'].to_dict(orient='records'),
-            table_name="plans",
-            write_disposition={"disposition": "merge", "strategy": "upsert"},
-            primary_key="plan_id"
-        )
-        
-        # Plan Features
-        print(f"[{datetime.now()}] Loading plan_features...")
-        self.pipeline.run(
-            self.data['plan_features'].to_dict(orient='records'),
-            table_name="features",
-            write_disposition={"disposition": "merge", "strategy": "upsert"},
-            primary_key="feature_id"
-        )
-
-        # === PHASE 2: Load Transactional Tables ===
-        print(f"[{datetime.now()}] Loading transactional tables...")
-        
-        # Users
-        print(f"[{datetime.now()}] Loading users...")
-        self.pipeline.run(
-            self.data['users'].to_dict(orient='records'),
-            table_name="users",
-            write_disposition={
-                "disposition": "merge", 
-                "strategy": "scd2", 
-                "validity_column_names": ["valid_from", "valid_to"]
-            },
-            primary_key="user_id"
-        )
+    def copy_load(self, truncate: bool = False) -> None:
+        """
+        Loads the generated data with Postgres COPY instead of DLT normalize/merge.
 
-        # Subscriptions
-        print(f"[{datetime.now()}] Loading subscriptions...")
-        self.pipeline.run(
-            self.data['subscriptions'].to_dict(orient='records'),
-            table_name="subscriptions",
-            write_disposition={
-                "disposition": "merge", 
-                "strategy": "scd2", 
-                "validity_column_names": ["valid_from", "valid_to"]
-            },
-            primary_key="subscription_id"
-        )
+        Meant for seeding an empty database: all tables are copied in dependency
+        order in one transaction, using the pipeline's destination credentials.
 
-        # Usage
-        print(f"[{datetime.now()}] Loading usage...")
-        self.pipeline.run(
-            self.data['usage'].to_dict(orient='records'),
-            table_name="usage",
-            write_disposition={"disposition": "merge", "strategy": "upsert"},
-            primary_key="usage_id"
-        )
+        Args:
+            truncate: Empty each table before copying into it
+        """
+        if not self.data:
+            print("No data to load. Run extract() first.")
+            return
 
-        print(f"[{datetime.now()}] Data load complete.")
+        print(f"[{datetime.now()}] Starting COPY load...")
+        with self.profiler.stage('copy_load') as stage, self.pipeline.sql_client() as client:
+            copy_load(client, self.data, truncate=truncate)
+            stage.rows = sum(len(df) for df in self.data.values())
+        print(f"[{datetime.now()}] COPY load complete.")
 
     def run(self):
         """Run the full ETL process"""
@@ -178,6 +499,51 @@ class FakerETL:
 
 
 if __name__ == "__main__":
-    # Allow configuration via command line or environment variables could be added here
-    etl = FakerETL(user_count=10)
-    etl.run()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate fake data and load it with DLT")
+    parser.add_argument("--users", type=int, default=10, help="Number of users to generate")
+    parser.add_argument("--shards", type=int, default=1, help="Number of shards generated in parallel")
+    parser.add_argument("--seed", type=int, default=None, help="Root seed for reproducible runs")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None, help="Generate data as of this date (YYYY-MM-DD, defaults to today)")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for sharded runs")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Stream users in chunks of this size")
+    parser.add_argument("--cache-dir", default=None, help="Reuse generated datasets cached in this directory")
+    parser.add_argument("--copy", action="store_true", help="Seed Postgres with COPY instead of DLT merges")
+    parser.add_argument("--truncate", action="store_true", help="Empty the tables before a --copy load")
+    parser.add_argument("--cache-max-gb", type=float, default=DEFAULT_MAX_BYTES / 1024 ** 3, help="Dataset cache size budget")
+    parser.add_argument("--simulate-days", type=int, default=None, help="Advance the daily simulation by this many days")
+    parser.add_argument("--state-dir", default=".simulation", help="Directory holding the daily simulation state")
+    parser.add_argument("--normalize-workers", type=int, default=1, help="DLT normalize processes")
+    parser.add_argument("--load-workers", type=int, default=20, help="DLT parallel load jobs")
+    parser.add_argument("--file-format", default=DEFAULT_FILE_FORMAT, help="DLT loader file format")
+    parser.add_argument("--profile-dir", default=None, help="Measure each phase and write the stage report here")
+    parser.add_argument("--profile-stage", default=None, help="Also profile this stage, e.g. generate_usage")
+    parser.add_argument("--profiler", choices=PROFILERS, default=None, help="Profiler used for --profile-stage (default: cprofile)")
+    args = parser.parse_args()
+    if args.profile_dir is None and (args.profile_stage or args.profiler):
+        parser.error("--profile-stage and --profiler require --profile-dir")
+
+    etl = FakerETL(
+        user_count=args.users,
+        shards=args.shards,
+        seed=args.seed,
+        as_of=args.as_of,
+        max_workers=args.workers,
+        cache_dir=args.cache_dir,
+        cache_max_bytes=int(args.cache_max_gb * 1024 ** 3),
+        normalize_workers=args.normalize_workers,
+        load_workers=args.load_workers,
+        loader_file_format=args.file_format,
+        profiler=StageProfiler(args.profile_dir, args.profile_stage, args.profiler or 'cprofile'),
+    )
+    if args.simulate_days:
+        etl.simulate(args.simulate_days, args.state_dir)
+    elif args.chunk_size:
+        etl.stream(chunk_size=args.chunk_size)
+    elif args.copy:
+        etl.extract()
+        etl.copy_load(truncate=args.truncate)
+    else:
+        etl.run()
+    etl.profiler.report()
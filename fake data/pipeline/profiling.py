@@ -0,0 +1,195 @@
+"""
+Stage-level instrumentation for FakerETL
+
+FakerETL wraps each generation and load phase in a profiler stage. When
+profiling is enabled, every stage records its wall time, CPU time (including
+finished worker processes), peak traced memory and row count, and the stages
+are written as a JSON report. A chosen stage can additionally be run under
+cProfile or pyinstrument, producing a profile that flamegraph tools read
+directly (snakeviz/flameprof for .prof files, speedscope for pyinstrument).
+
+When profiling is disabled the stages are no-ops, so the hooks cost nothing in
+regular runs.
+"""
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+PROFILERS = ['cprofile', 'pyinstrument']
+REPORT_FILE = 'stages.json'
+
+
+@dataclass
+class StageRecord:
+    """Measurements of one run of a stage."""
+    name: str
+    path: str  # Names of the enclosing stages and this one, joined by '/'
+    rows: Optional[int] = None
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_mb: float = 0.0
+    profile: Optional[str] = None  # File of the stage's cProfile/pyinstrument profile
+    _peak: int = field(default=0, repr=False)
+
+    @property
+    def rows_per_s(self) -> Optional[float]:
+        if self.rows is None or not self.wall_s:
+            return None
+        return self.rows / self.wall_s
+
+    def to_dict(self) -> dict:
+        record = {key: value for key, value in asdict(self).items() if not key.startswith('_')}
+        record['rows_per_s'] = round(self.rows_per_s, 1) if self.rows_per_s is not None else None
+        return record
+
+
+def _cpu_time() -> float:
+    """CPU time of this process and of its finished child processes."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class StageProfiler:
+    def __init__(
+        self,
+        output_dir: Optional[str] = None,
+        profile_stage: Optional[str] = None,
+        profiler: str = 'cprofile',
+    ):
+        """
+        Args:
+            output_dir: Directory the report and profiles are written to;
+                profiling is disabled if omitted
+            profile_stage: Name of the stage to run under `profiler`, every time it runs
+            profiler: 'cprofile' or 'pyinstrument' (requires the pyinstrument package)
+        """
+        if profiler not in PROFILERS:
+            raise ValueError(f"profiler must be one of {PROFILERS}")
+
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.profile_stage = profile_stage
+        self.profiler = profiler
+        self.records: List[StageRecord] = []  # In the order the stages started
+        self._stack: List[StageRecord] = []
+        self._profile_counts: Dict[str, int] = {}
+        self._started_tracing = False  # Whether this profiler started tracemalloc, and so stops it
+
+    @property
+    def enabled(self) -> bool:
+        return self.output_dir is not None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        """
+        Measures the enclosed block as stage `name`.
+
+        Set `rows` on the yielded record to report the stage's row count.
+        Stages nest; a stage's peak memory includes its inner stages. Memory is
+        traced with tracemalloc, which slows allocation-heavy code down, so
+        compare timings between profiled runs only.
+        """
+        path = '/'.join([record.name for record in self._stack] + [name])
+        record = StageRecord(name=name, path=path)
+        if not self.enabled:
+            yield record
+            return
+
+        if not self._stack and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        # Hand the peak so far to the enclosing stage before measuring this one
+        if self._stack:
+            self._stack[-1]._peak = max(self._stack[-1]._peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+        self._stack.append(record)
+        self.records.append(record)
+        profiler = self._start_profiler() if name == self.profile_stage else None
+        wall_start, cpu_start = time.perf_counter(), _cpu_time()
+        try:
+            yield record
+        finally:
+            record.wall_s = round(time.perf_counter() - wall_start, 4)
+            record.cpu_s = round(_cpu_time() - cpu_start, 4)
+            if profiler is not None:
+                record.profile = self._stop_profiler(profiler, name)
+
+            record._peak = max(record._peak, tracemalloc.get_traced_memory()[1])
+            record.peak_mb = round(record._peak / 1024 ** 2, 1)
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]._peak = max(self._stack[-1]._peak, record._peak)
+                tracemalloc.reset_peak()
+            elif self._started_tracing:
+                # Tracing started by the caller keeps running after the outermost stage
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def _start_profiler(self):
+        if self.profiler == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError as e:
+                raise ImportError("The pyinstrument profiler requires `pip install pyinstrument`") from e
+            profiler = Profiler()
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+
+    def _stop_profiler(self, profiler, name: str) -> str:
+        """Stops `profiler` and writes its profile, returning the file name."""
+        count = self._profile_counts.get(name, 0) + 1
+        self._profile_counts[name] = count
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.profiler == 'pyinstrument':
+            from pyinstrument.renderers import SpeedscopeRenderer
+
+            profiler.stop()
+            path = self.output_dir / f'{name}-{count}.speedscope.json'
+            path.write_text(profiler.output(renderer=SpeedscopeRenderer()))
+        else:
+            profiler.disable()
+            path = self.output_dir / f'{name}-{count}.prof'
+            profiler.dump_stats(str(path))
+        return path.name
+
+    def report(self) -> Optional[Path]:
+        """
+        Prints a summary of all stages and writes them to the JSON report.
+
+        Returns:
+            Path of the report, or None if profiling is disabled
+        """
+        if not self.enabled:
+            return None
+
+        print(f"\n{'stage':<50} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'rows':>12} {'rows/s':>12}")
+        for record in self.records:
+            rows = '' if record.rows is None else record.rows
+            rows_per_s = '' if record.rows_per_s is None else f"{record.rows_per_s:.0f}"
+            print(
+                f"{record.path:<50} {record.wall_s:>9.3f} {record.cpu_s:>9.3f} "
+                f"{record.peak_mb:>9.1f} {rows:>12} {rows_per_s:>12}"
+            )
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / REPORT_FILE
+        report = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'profiler': self.profiler if self.profile_stage else None,
+            'profile_stage': self.profile_stage,
+            'stages': [record.to_dict() for record in self.records],
+        }
+        path.write_text(json.dumps(report, indent=2))
+        print(f"[{datetime.now()}] ✓ Stage report written to {path}")
+        return path
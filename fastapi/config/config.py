@@ -3,9 +3,17 @@ Configuration for database connections and session management
 """
 
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from dotenv import load_dotenv
+from pathlib import Path
 import os
+import sys
+
+from config.replicas import ReadRouter
+
+# The table registry lives at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from table_registry import TABLES, DATASET_NAME, MISSING_DATE
 
 load_dotenv(dotenv_path="../.env")  # provide correct path to your .env file
 
@@ -19,58 +27,76 @@ if not RAILWAY_DATABASE_URL:
 if not LOCAL_DATABASE_URL:
     raise ValueError("LOCAL_DATABASE_URL environment variable is not set")
 
-# Create SQLAlchemy engine and session for Railway database
+# Optional comma-separated URLs of read replicas of the Railway database
+RAILWAY_READ_REPLICA_URLS = [
+    url.strip() for url in os.environ.get("RAILWAY_READ_REPLICA_URLS", "").split(",") if url.strip()
+]
+
+# Interactive reads and bulk exports (the paginated crawls of the lake
+# pipeline) get separate pools on every database, so a nightly crawl can hold
+# at most EXPORT_POOL_SIZE connections and never starves interactive reads
+READ_POOL_SIZE = int(os.environ.get("READ_POOL_SIZE", "5"))
+READ_POOL_OVERFLOW = int(os.environ.get("READ_POOL_OVERFLOW", "10"))
+EXPORT_POOL_SIZE = int(os.environ.get("EXPORT_POOL_SIZE", "2"))
+EXPORT_POOL_TIMEOUT = int(os.environ.get("EXPORT_POOL_TIMEOUT", "60"))  # Seconds an export waits for a connection
+CONNECT_TIMEOUT = 5  # Seconds before an unreachable Postgres server counts as down
+REPLICA_RETRY_SECONDS = int(os.environ.get("REPLICA_RETRY_SECONDS", "30"))  # Seconds a failed replica is skipped
+
+DATASET_SCHEMA = DATASET_NAME
+
+
+def _attach_sqlite_dataset(engine):
+    """
+    Serves a local SQLite database seeded by DLT. DLT keeps each dataset of a
+    SQLite database in its own file next to it (`<name>__<dataset>.db`), which
+    is attached to every connection under the dataset's schema name.
+    """
+    database = Path(engine.url.database)
+    dataset_file = database.parent / f"{database.stem}__{DATASET_SCHEMA}{database.suffix}"
+
+    @event.listens_for(engine, "connect")
+    def attach_dataset(dbapi_connection, _):
+        dbapi_connection.execute(f"ATTACH DATABASE '{dataset_file}' AS {DATASET_SCHEMA}")
+
+
+def _create_engine(url, **pool_options):
+    """Engine on `url` that checks pooled connections before handing them out."""
+    connect_args = {"connect_timeout": CONNECT_TIMEOUT} if url.startswith("postgresql") else {}
+    engine = create_engine(url, pool_pre_ping=True, connect_args=connect_args, **pool_options)
+    if engine.dialect.name == "sqlite":
+        _attach_sqlite_dataset(engine)
+    return engine
+
+
+# Create SQLAlchemy engines and session for Railway database
 try:
-    engine = create_engine(RAILWAY_DATABASE_URL)  # Use Railway database for engine
-    # Create a configured "Session" class
+    # Primary: writes, schema inspection, and reads while no replica is available
+    engine = _create_engine(RAILWAY_DATABASE_URL, pool_size=READ_POOL_SIZE, max_overflow=READ_POOL_OVERFLOW)
+    export_engine = _create_engine(
+        RAILWAY_DATABASE_URL, pool_size=EXPORT_POOL_SIZE, max_overflow=0, pool_timeout=EXPORT_POOL_TIMEOUT
+    )
+    read_router = ReadRouter("read", [
+        _create_engine(url, pool_size=READ_POOL_SIZE, max_overflow=READ_POOL_OVERFLOW)
+        for url in RAILWAY_READ_REPLICA_URLS
+    ], primary=engine, retry_seconds=REPLICA_RETRY_SECONDS)
+    # Exports are pinned to the first replica: the pages of a crawl then come from one database,
+    # or from the primary while it is down, which is never behind the replica
+    export_router = ReadRouter("export", [
+        _create_engine(url, pool_size=EXPORT_POOL_SIZE, max_overflow=0, pool_timeout=EXPORT_POOL_TIMEOUT)
+        for url in RAILWAY_READ_REPLICA_URLS[:1]
+    ], primary=export_engine, retry_seconds=REPLICA_RETRY_SECONDS)
+    # Create a configured "Session" class; sessions of reads are bound to a router's connection
     session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 except Exception as e:
     print(f"Error creating database engine: {e}")
     raise
 
-# TABLE CONFIGURATIONS FOR DLT PIPELINES
+# TABLE CONFIGURATIONS FOR DLT PIPELINES, by table name in the API database
 TABLE_CONFIGS = {
-    # Lookup Tables
-    "regions": {
-        "write_disposition": {"disposition": "merge", "strategy": "upsert"},
-        "primary_key": ["region_id"],
-    },
-    "referral": {
-        "write_disposition": {"disposition": "merge", "strategy": "upsert"},
-        "primary_key": ["referral_source_id"],
-    },
-    "payment_methods": {
-        "write_disposition": {"disposition": "merge", "strategy": "upsert"},
-        "primary_key": ["payment_method_id"],
-    },
-    "features": {
-        "write_disposition": {"disposition": "merge", "strategy": "upsert"},
-        "primary_key": ["feature_id"],
-    },    
-    "plans": {
-        "write_disposition": {"disposition": "merge", "strategy": "upsert"},
-        "primary_key": ["plan_id"],
-    },
-    
-    # Transactional Tables
-    "users": {
-        "write_disposition": {
-            "disposition": "merge",
-            "strategy": "scd2",
-            "validity_column_names": ["valid_from", "valid_to"],
-        },
-        "primary_key": ["user_id"],
-    },
-    "subscriptions": {
-        "write_disposition": {
-            "disposition": "merge",
-            "strategy": "scd2",
-            "validity_column_names": ["valid_from", "valid_to"],
-        },
-        "primary_key": ["subscription_id"],
-    },
-    "usage": {
-        "write_disposition": {"disposition": "merge", "strategy": "upsert"},
-        "primary_key": ["usage_id"],
-    },
-}
\ No newline at end of file
+    table.table_name: {
+        "write_disposition": table.write_disposition,
+        "primary_key": [table.primary_key],
+        "columns": {column: {"data_type": "date"} for column in table.date_columns},
+    }
+    for table in TABLES.values()
+}
@@ -0,0 +1,116 @@
+"""
+Routing of API reads over the read replicas of the database
+
+A ReadRouter hands out connections from its replicas in round-robin order.
+Connecting doubles as the health check: a replica that refuses connections
+is taken out of the rotation for `retry_seconds`, after which the next read
+tries it again. While no replica is available, reads go to the router's
+primary engine. A router with a single replica pins its reads to it, which
+keeps the pages of a crawl on one database.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+RETRY_SECONDS = 30  # Seconds a failed replica stays out of the rotation
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    """Connections of the pool of `engine`, for pools that keep a fixed number of them."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"status": pool.status()}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+class ReadRouter:
+    """
+    Round-robin over read replicas with failover to the primary.
+
+    Args:
+        name: Name of the router in logs and pool stats
+        replicas: Engines of the read replicas, possibly none
+        primary: Engine reads fall back to while no replica is available
+        retry_seconds: Seconds a replica that failed to connect is skipped
+    """
+
+    def __init__(self, name: str, replicas: List[Engine], primary: Engine, retry_seconds: float = RETRY_SECONDS):
+        self.name = name
+        self.replicas = replicas
+        self.primary = primary
+        self.retry_seconds = retry_seconds
+        self._down_until: Dict[Engine, float] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _rotation(self) -> List[Engine]:
+        """Replicas in the order this read tries them, starting one further than the previous read."""
+        with self._lock:
+            start = self._next
+            self._next = (start + 1) % max(len(self.replicas), 1)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def _is_down(self, replica: Engine) -> bool:
+        with self._lock:
+            down_until = self._down_until.get(replica)
+        return down_until is not None and time.monotonic() < down_until
+
+    def _mark_down(self, replica: Engine, error: Exception):
+        with self._lock:
+            self._down_until[replica] = time.monotonic() + self.retry_seconds
+        print(
+            f"[{datetime.now()}] ⚠ {self.name} replica {replica.url.render_as_string(hide_password=True)} "
+            f"is unavailable, retrying in {self.retry_seconds}s: {error}"
+        )
+
+    def _mark_up(self, replica: Engine):
+        with self._lock:
+            was_down = self._down_until.pop(replica, None) is not None
+        if was_down:
+            print(f"[{datetime.now()}] ✓ {self.name} replica {replica.url.render_as_string(hide_password=True)} is back")
+
+    def connect(self) -> Connection:
+        """
+        Connection to the next available replica, or to the primary if none is.
+
+        Engines are created with pool_pre_ping, so a pooled connection to a
+        replica that went down fails here rather than in the middle of a query.
+        """
+        for replica in self._rotation():
+            if self._is_down(replica):
+                continue
+            try:
+                connection = replica.connect()
+            except DBAPIError as e:
+                self._mark_down(replica, e)
+                continue
+            self._mark_up(replica)
+            return connection
+        return self.primary.connect()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Health and pool connections of every engine of the router."""
+        engines: List[tuple] = [(replica, "replica") for replica in self.replicas]
+        engines.append((self.primary, "primary"))
+        stats = []
+        for engine, role in engines:
+            with self._lock:
+                down_until: Optional[float] = self._down_until.get(engine) if role == "replica" else None
+            stats.append({
+                "router": self.name,
+                "role": role,
+                "url": engine.url.render_as_string(hide_password=True),
+                "healthy": not self._is_down(engine),
+                "retry_in_seconds": round(max(down_until - time.monotonic(), 0), 1) if down_until else None,
+                **pool_stats(engine),
+            })
+        return stats
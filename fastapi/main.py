@@ -7,12 +7,16 @@ from fastapi import FastAPI, Depends, HTTPException, status, Query
 from fastapi.security import HTTPBasicCredentials, HTTPBasic
 from fastapi_pagination.ext.sqlalchemy import paginate
 from fastapi_pagination import Page, add_pagination
-from config.config import session, engine
+from fastapi_pagination.cursor import CursorPage, CursorParams
+from fastapi_pagination.customization import CustomizedPage, UseIncludeTotal, UseName
+from config.config import session, engine, read_router, export_router, TABLES, DATASET_SCHEMA
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from typing import Annotated
+from typing import Annotated, List, Optional, Tuple, TypeVar
+from datetime import date
 from model import model
+from model.queries import users_query, subscriptions_query, usages_query, latest_load_query, changes_query, CHANGE_KEYS
 from model.schema import User, Subscription, Usage
+import json
 import os
 from dotenv import load_dotenv
 
@@ -27,6 +31,16 @@ if os.getenv("RUN_CREATE_ALL", "false").lower() == "true":
 
 security = HTTPBasic()
 
+T = TypeVar("T")
+# Keyset pages of a change feed; counting the rows left would cost a scan per page
+ChangesPage = CustomizedPage[CursorPage[T], UseName("ChangesPage"), UseIncludeTotal(False)]
+
+
+def _path(key):
+    """API path of the table of registry entry `key`."""
+    return f"/{TABLES[key].api_path}"
+
+
 username = os.environ["BASIC_AUTH_USERNAME"]
 password = os.environ["BASIC_AUTH_PASSWORD"]
 
@@ -58,13 +72,66 @@ def home(credentials: Annotated[HTTPBasicCredentials, Depends(security)]):
     )
     
 
-def get_db():
-    # Dummy database session generator
-    db = session()
+def _routed_session(router):
+    # Session on the next available replica of `router`, or on its primary
+    connection = router.connect()
+    db = session(bind=connection)
     try:
         yield db
     finally:
         db.close()
+        connection.close()
+
+
+def get_db():
+    # Interactive reads
+    yield from _routed_session(read_router)
+
+
+def get_export_db():
+    # Bulk exports: the paginated endpoints crawled by the lake pipeline, on their own pools
+    yield from _routed_session(export_router)
+
+
+def _change_position(params: CursorParams) -> Optional[Tuple[str, List[str]]]:
+    # (load the crawl stops at, [load ID, key] of the last row read) of a change feed cursor
+    cursor = params.to_raw_params().cursor
+    if not cursor:
+        return None
+    try:
+        loaded_until, *after = json.loads(cursor)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor value")
+    return loaded_until, after
+
+
+def _changes(db: Session, table, params: CursorParams, loaded_after: Optional[str], position):
+    # One page of the change feed of `table`. The first page fixes the latest load the crawl
+    # reads, and every cursor carries it along with the position of the page's last row
+    if position is None:
+        loaded_until, after = db.scalar(latest_load_query(table)), None
+        if loaded_until is None:
+            return ChangesPage.create([], params)
+    else:
+        loaded_until, after = position
+        # Exports fail back from the primary to their replica, which may still lag behind the crawl
+        latest_load = db.scalar(latest_load_query(table))
+        if latest_load is None or latest_load < loaded_until:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The database serving this crawl has not caught up with it yet; retry",
+            )
+    rows = db.scalars(changes_query(table, loaded_until, loaded_after, after).limit(params.size)).all()
+    next_cursor = None
+    if rows and len(rows) == params.size:
+        last = rows[-1]
+        next_cursor = json.dumps([loaded_until, last.load_id, getattr(last, CHANGE_KEYS[table].key)])
+    return ChangesPage.create(rows, params, next_=next_cursor)
+
+
+@app.get("/pool-stats")
+def get_pool_stats(auth = Depends(verify_credentials)):
+    return {"items": read_router.stats() + export_router.stats()}
 
 @app.get("/check-tables")
 def check_tables(db: Session = Depends(get_db)):
@@ -72,7 +139,7 @@ def check_tables(db: Session = Depends(get_db)):
         # Check what tables exist in test_dlt schema
         from sqlalchemy import inspect
         inspector = inspect(engine)
-        tables = inspector.get_table_names(schema='test_dlt_dataset')
+        tables = inspector.get_table_names(schema=DATASET_SCHEMA)
         return {"Table List": tables}
     except Exception as e:
         import traceback
@@ -82,7 +149,7 @@ def check_tables(db: Session = Depends(get_db)):
         )
 
 # Lookup Table Endpoints
-@app.get("/regions")
+@app.get(_path("regions"))
 def get_regions(auth = Depends(verify_credentials), db: Session = Depends(get_db)):
     try:        
         regions = db.query(model.Region).all()
@@ -97,7 +164,7 @@ def get_regions(auth = Depends(verify_credentials), db: Session = Depends(get_db
             detail={"error": str(e), "traceback": traceback.format_exc()}
         )
 
-@app.get("/referral-sources")
+@app.get(_path("referral_sources"))
 def get_referral_sources(auth = Depends(verify_credentials), db: Session = Depends(get_db)):
     try:        
         sources = db.query(model.ReferralSource).all()
@@ -112,7 +179,7 @@ def get_referral_sources(auth = Depends(verify_credentials), db: Session = Depen
             detail={"error": str(e), "traceback": traceback.format_exc()}
         )
 
-@app.get("/payment-methods")
+@app.get(_path("payment_methods"))
 def get_payment_methods(auth = Depends(verify_credentials), db: Session = Depends(get_db)):
     try:        
         methods = db.query(model.PaymentMethod).all()
@@ -126,7 +193,7 @@ def get_payment_methods(auth = Depends(verify_credentials), db: Session = Depend
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={"error": str(e), "traceback": traceback.format_exc()}
         )
-@app.get("/plan-features")
+@app.get(_path("plan_features"))
 def get_plan_features(auth = Depends(verify_credentials), db: Session = Depends(get_db)):
     try:        
         features = db.query(model.PlanFeature).all()
@@ -142,10 +209,10 @@ def get_plan_features(auth = Depends(verify_credentials), db: Session = Depends(
         )
 
 # Main Entity Endpoints
-@app.get("/users", response_model=Page[User])
-def get_users(auth = Depends(verify_credentials), db: Session = Depends(get_db)):
+@app.get(_path("users"), response_model=Page[User])
+def get_users(auth = Depends(verify_credentials), db: Session = Depends(get_export_db)):
     try:
-        return paginate(db, select(model.User))
+        return paginate(db, users_query())
     except Exception as e:
         import traceback
         raise HTTPException(
@@ -153,7 +220,7 @@ def get_users(auth = Depends(verify_credentials), db: Session = Depends(get_db))
             detail={"error": str(e), "traceback": traceback.format_exc()}
         )
         
-@app.get("/plans")
+@app.get(_path("plans"))
 def get_plans(auth = Depends(verify_credentials), db: Session = Depends(get_db)):
     try:
         plans = db.query(model.Plan).all()
@@ -168,10 +235,14 @@ def get_plans(auth = Depends(verify_credentials), db: Session = Depends(get_db))
             detail={"error": str(e), "traceback": traceback.format_exc()}
         )
     
-@app.get("/subscriptions", response_model=Page[Subscription])
-def get_subscriptions(auth = Depends(verify_credentials), db: Session = Depends(get_db)):
+@app.get(_path("subscriptions"), response_model=Page[Subscription])
+def get_subscriptions(
+    user_id: Optional[str] = Query(None, description="Only subscriptions of this user"),
+    auth = Depends(verify_credentials),
+    db: Session = Depends(get_export_db),
+):
     try:
-        return paginate(db, select(model.Subscription))
+        return paginate(db, subscriptions_query(user_id))
     except Exception as e:
         import traceback
         raise HTTPException(
@@ -180,13 +251,81 @@ def get_subscriptions(auth = Depends(verify_credentials), db: Session = Depends(
         )
     
 
-@app.get("/usages", response_model=Page[Usage])
-def get_usages(auth = Depends(verify_credentials), db: Session = Depends(get_db)):
+@app.get(_path("usage"), response_model=Page[Usage])
+def get_usages(
+    user_id: Optional[str] = Query(None, description="Only usage of this user"),
+    subscription_id: Optional[str] = Query(None, description="Only usage under this subscription"),
+    start_date: Optional[date] = Query(None, description="Only usage on or after this date"),
+    end_date: Optional[date] = Query(None, description="Only usage on or before this date"),
+    auth = Depends(verify_credentials),
+    db: Session = Depends(get_export_db),
+):
+    try:
+        return paginate(db, usages_query(user_id, subscription_id, start_date, end_date))
+    except Exception as e:
+        import traceback
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"error": str(e), "traceback": traceback.format_exc()}
+        )
+
+
+# Change feeds: every row by the DLT load that wrote it, for the lake pipeline's incremental crawls
+@app.get(f"{_path('users')}/changes", response_model=ChangesPage[User])
+def get_user_changes(
+    loaded_after: Optional[str] = Query(None, description="Only rows written by a DLT load after this one"),
+    params: CursorParams = Depends(),
+    auth = Depends(verify_credentials),
+    db: Session = Depends(get_export_db),
+):
+    position = _change_position(params)
     try:
-        return paginate(db, select(model.Usage))
+        return _changes(db, model.User, params, loaded_after, position)
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={"error": str(e), "traceback": traceback.format_exc()}
-        )
\ No newline at end of file
+        )
+
+
+@app.get(f"{_path('subscriptions')}/changes", response_model=ChangesPage[Subscription])
+def get_subscription_changes(
+    loaded_after: Optional[str] = Query(None, description="Only rows written by a DLT load after this one"),
+    params: CursorParams = Depends(),
+    auth = Depends(verify_credentials),
+    db: Session = Depends(get_export_db),
+):
+    position = _change_position(params)
+    try:
+        return _changes(db, model.Subscription, params, loaded_after, position)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"error": str(e), "traceback": traceback.format_exc()}
+        )
+
+
+@app.get(f"{_path('usage')}/changes", response_model=ChangesPage[Usage])
+def get_usage_changes(
+    loaded_after: Optional[str] = Query(None, description="Only rows written by a DLT load after this one"),
+    params: CursorParams = Depends(),
+    auth = Depends(verify_credentials),
+    db: Session = Depends(get_export_db),
+):
+    position = _change_position(params)
+    try:
+        return _changes(db, model.Usage, params, loaded_after, position)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"error": str(e), "traceback": traceback.format_exc()}
+        )
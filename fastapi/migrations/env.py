@@ -0,0 +1,54 @@
+"""
+Alembic environment of the API database
+
+DLT creates and loads the tables of the dataset schema; these migrations
+only change their column types, partitioning and indexes afterwards. The
+database is picked with `-x database=railway|local` (railway by default).
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from config.config import RAILWAY_DATABASE_URL, LOCAL_DATABASE_URL, DATASET_SCHEMA
+from model.model import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+DATABASE_URLS = {"railway": RAILWAY_DATABASE_URL, "local": LOCAL_DATABASE_URL}
+
+target_metadata = Base.metadata
+
+
+def _database_url() -> str:
+    database = context.get_x_argument(as_dictionary=True).get("database", "railway")
+    if database not in DATABASE_URLS:
+        raise ValueError(f"Unknown database {database}, expected one of {', '.join(DATABASE_URLS)}")
+    return DATABASE_URLS[database]
+
+
+def _include_name(name, type_, parent_names):
+    # Only compare the dataset schema; DLT's tables and other schemas are not modelled
+    if type_ == "schema":
+        return name == DATASET_SCHEMA
+    return True
+
+
+def run_migrations_online() -> None:
+    engine = create_engine(_database_url())
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_schemas=True,
+            include_name=_include_name,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    raise RuntimeError("The migrations inspect the loaded tables and cannot be rendered as SQL (--sql)")
+run_migrations_online()
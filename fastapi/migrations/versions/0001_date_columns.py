@@ -0,0 +1,74 @@
+"""Store dates as DATE
+
+The generated dates were loaded as varchar, so range filters compared
+strings and could not use typed indexes. Open-ended subscriptions had
+end_date 'N/A', which becomes NULL. Columns already created as DATE, by
+loads made since the registry types them, are left as they are.
+
+DLT merges through tables of the same name in its staging schema, which
+keep the column types they were created with, so they are converted too.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from config.config import DATASET_SCHEMA
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DATE_COLUMNS = {
+    "users": ["signup_date"],
+    "subscriptions": ["start_date", "end_date"],
+    "usage": ["usage_date"],
+}
+MISSING_DATE = "N/A"
+SCHEMAS = [DATASET_SCHEMA, f"{DATASET_SCHEMA}_staging"]  # DLT's default staging schema name
+
+
+def _tables():
+    """Yields (schema, table, date columns, their current types) of every existing table to convert."""
+    inspector = sa.inspect(op.get_bind())
+    for schema in SCHEMAS:
+        for table, columns in DATE_COLUMNS.items():
+            # The staging schema only exists once DLT has merged into it
+            if not inspector.has_table(table, schema=schema):
+                if schema == DATASET_SCHEMA:
+                    raise RuntimeError(f"Table {schema}.{table} does not exist; load the data with DLT first")
+                continue
+            types = {column["name"]: column["type"] for column in inspector.get_columns(table, schema=schema)}
+            yield schema, table, columns, types
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for schema, table, columns, types in _tables():
+        for column in columns:
+            if isinstance(types[column], sa.Date):
+                continue
+            op.alter_column(
+                table, column, schema=schema, type_=sa.Date(),
+                postgresql_using=f"cast(nullif({column}, '{MISSING_DATE}') as date)",
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for schema, table, columns, types in _tables():
+        for column in columns:
+            if not isinstance(types[column], sa.Date):
+                continue
+            op.alter_column(
+                table, column, schema=schema, type_=sa.String(),
+                postgresql_using=f"coalesce(to_char({column}, 'YYYY-MM-DD'), '{MISSING_DATE}')"
+                if column == "end_date" else f"to_char({column}, 'YYYY-MM-DD')",
+            )
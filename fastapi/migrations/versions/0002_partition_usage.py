@@ -0,0 +1,62 @@
+"""Range-partition usage by month of usage_date
+
+Date-filtered queries then only scan the partitions of the requested
+months. The table is rebuilt as a partitioned table with the same columns,
+with a partition per month from its first usage date to MONTHS_AHEAD months
+after today and a default partition for anything else. Later months are
+added by pipeline/usage_partitions.py. Requires Postgres 15 or later, whose
+MERGE statement DLT uses to upsert usage.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from config.config import DATASET_SCHEMA
+from pipeline.usage_partitions import DEFAULT_PARTITION, MONTHS_AHEAD, ensure_partitions, month_start, next_month
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = f"{DATASET_SCHEMA}.usage"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    connection = op.get_bind()
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO usage_unpartitioned")
+    op.execute(
+        f"CREATE TABLE {TABLE} (LIKE {DATASET_SCHEMA}.usage_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE (usage_date)"
+    )
+    op.execute(f"CREATE TABLE {DATASET_SCHEMA}.{DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT")
+
+    first, last = connection.execute(
+        sa.text(f"SELECT min(usage_date), max(usage_date) FROM {DATASET_SCHEMA}.usage_unpartitioned")
+    ).one()
+    last_month = month_start(max(last or date.today(), date.today()))
+    for _ in range(MONTHS_AHEAD):
+        last_month = next_month(last_month)
+    ensure_partitions(connection, DATASET_SCHEMA, first or date.today(), last_month)
+
+    op.execute(f"INSERT INTO {TABLE} SELECT * FROM {DATASET_SCHEMA}.usage_unpartitioned")
+    op.execute(f"DROP TABLE {DATASET_SCHEMA}.usage_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO usage_partitioned")
+    op.execute(
+        f"CREATE TABLE {TABLE} (LIKE {DATASET_SCHEMA}.usage_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute(f"INSERT INTO {TABLE} SELECT * FROM {DATASET_SCHEMA}.usage_partitioned")
+    op.execute(f"DROP TABLE {DATASET_SCHEMA}.usage_partitioned")
@@ -0,0 +1,46 @@
+"""Add indexes for the paginated and filtered API queries
+
+Each index matches the ORDER BY of a query in model/queries.py, led by the
+column the query filters on, so a page is read from the index instead of
+sorting the table. The index on usage is created on every partition.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from config.config import DATASET_SCHEMA
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_users_user_id_valid_from": ("users", ["user_id", "valid_from"]),
+    "ix_subscriptions_subscription_id_valid_from": ("subscriptions", ["subscription_id", "valid_from"]),
+    "ix_subscriptions_user_id_subscription_id_valid_from": ("subscriptions", ["user_id", "subscription_id", "valid_from"]),
+    "ix_usage_usage_date_usage_id": ("usage", ["usage_date", "usage_id"]),
+    "ix_usage_user_id_usage_date_usage_id": ("usage", ["user_id", "usage_date", "usage_id"]),
+    "ix_usage_subscription_id_usage_date_usage_id": ("usage", ["subscription_id", "usage_date", "usage_id"]),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, (table, columns) in INDEXES.items():
+        op.create_index(name, table, columns, schema=DATASET_SCHEMA, if_not_exists=True)
+    # Fresh statistics, so the planner costs the new indexes and partitions correctly
+    for table in sorted({table for table, _ in INDEXES.values()}):
+        op.execute(f"ANALYZE {DATASET_SCHEMA}.{table}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, (table, _) in INDEXES.items():
+        op.drop_index(name, table_name=table, schema=DATASET_SCHEMA, if_exists=True)
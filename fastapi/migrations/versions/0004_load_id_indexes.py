@@ -0,0 +1,44 @@
+"""Add indexes for the change feeds
+
+The lake pipeline crawls the change feeds of model/queries.py, which filter
+and page on the DLT load that wrote each row. Each index is led by
+_dlt_load_id and followed by the feed's key, matching its ORDER BY, and also
+serves the latest load a crawl stops at. The index on usage is created on
+every partition.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from config.config import DATASET_SCHEMA
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_users_dlt_load_id_user_id": ("users", ["_dlt_load_id", "user_id"]),
+    "ix_subscriptions_dlt_load_id_subscription_id": ("subscriptions", ["_dlt_load_id", "subscription_id"]),
+    "ix_usage_dlt_load_id_usage_id": ("usage", ["_dlt_load_id", "usage_id"]),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, (table, columns) in INDEXES.items():
+        op.create_index(name, table, columns, schema=DATASET_SCHEMA, if_not_exists=True)
+    for table in sorted({table for table, _ in INDEXES.values()}):
+        op.execute(f"ANALYZE {DATASET_SCHEMA}.{table}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, (table, _) in INDEXES.items():
+        op.drop_index(name, table_name=table, schema=DATASET_SCHEMA, if_exists=True)
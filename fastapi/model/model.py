@@ -2,58 +2,79 @@
 SQLAlchemy models for the test_dlt_dataset schema (normalized)
 """
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
+from config.config import TABLES, DATASET_SCHEMA
 
 Base = declarative_base()
 
+
+def _column(key, column):
+    """Qualified name of `column` in the table of registry entry `key`, for foreign keys."""
+    return f"{DATASET_SCHEMA}.{TABLES[key].table_name}.{column}"
+
+
+class Loaded:
+    """Columns DLT adds to every table it loads."""
+    # DLT load that last wrote the row; load IDs are timestamps, so later loads sort after earlier ones
+    load_id = Column('_dlt_load_id', String)
+
+
 # Lookup/Reference Tables
-class Region(Base):
-    __tablename__ = 'regions'
-    __table_args__ = {'schema': 'test_dlt_dataset'}
+class Region(Loaded, Base):
+    __tablename__ = TABLES['regions'].table_name
+    __table_args__ = {'schema': DATASET_SCHEMA}
     
     region_id = Column(Integer, primary_key=True, index=True)
     region_name = Column(String, index=True)
 
-class ReferralSource(Base):
-    __tablename__ = 'referral'
-    __table_args__ = {'schema': 'test_dlt_dataset'}
+class ReferralSource(Loaded, Base):
+    __tablename__ = TABLES['referral_sources'].table_name
+    __table_args__ = {'schema': DATASET_SCHEMA}
     
     referral_source_id = Column(Integer, primary_key=True, index=True)
     source_name = Column(String, index=True)
 
-class PaymentMethod(Base):
-    __tablename__ = 'payment_methods'
-    __table_args__ = {'schema': 'test_dlt_dataset'}
+class PaymentMethod(Loaded, Base):
+    __tablename__ = TABLES['payment_methods'].table_name
+    __table_args__ = {'schema': DATASET_SCHEMA}
     
     payment_method_id = Column(Integer, primary_key=True, index=True)
     method_name = Column(String, index=True)
 
-class PlanFeature(Base):
-    __tablename__ = 'features'
-    __table_args__ = {'schema': 'test_dlt_dataset'}
+class PlanFeature(Loaded, Base):
+    __tablename__ = TABLES['plan_features'].table_name
+    __table_args__ = {'schema': DATASET_SCHEMA}
     
     feature_id = Column(Integer, primary_key=True, index=True)
-    plan_id = Column(Integer, ForeignKey('test_dlt_dataset.plans.plan_id'))
+    plan_id = Column(Integer, ForeignKey(_column('plans', 'plan_id')))
     feature_name = Column(String)
 
 # Main Entity Tables (Normalized)
-class User(Base):
-    __tablename__ = 'users'
-    __table_args__ = {'schema': 'test_dlt_dataset'}
+class User(Loaded, Base):
+    __tablename__ = TABLES['users'].table_name
+    __table_args__ = (
+        Index('ix_users_user_id_valid_from', 'user_id', 'valid_from'),
+        Index('ix_users_dlt_load_id_user_id', '_dlt_load_id', 'user_id'),
+        {'schema': DATASET_SCHEMA},
+    )
     
+    # SCD2 history: one row per version, identified by the business key and valid_from
     user_id = Column(String, primary_key=True, index=True)
     first_name = Column(String, index=True)
     last_name = Column(String, index=True)
-    email = Column(String, unique=True, index=True)
-    signup_date = Column(String)
-    plan_id = Column(Integer, ForeignKey('test_dlt_dataset.plans.plan_id'))
-    region_id = Column(Integer, ForeignKey('test_dlt_dataset.regions.region_id'))
-    referral_source_id = Column(Integer, ForeignKey('test_dlt_dataset.referral.referral_source_id'))
+    email = Column(String, index=True)  # Shared by the versions of a user
+    signup_date = Column(Date)
+    plan_id = Column(Integer, ForeignKey(_column('plans', 'plan_id')))
+    region_id = Column(Integer, ForeignKey(_column('regions', 'region_id')))
+    referral_source_id = Column(Integer, ForeignKey(_column('referral_sources', 'referral_source_id')))
+    # SCD2 validity of the row version, maintained by DLT
+    valid_from = Column(DateTime(timezone=True), primary_key=True)
+    valid_to = Column(DateTime(timezone=True))  # NULL for the current version
     
-class Plan(Base):
-    __tablename__ = 'plans'
-    __table_args__ = {'schema': 'test_dlt_dataset'}
+class Plan(Loaded, Base):
+    __tablename__ = TABLES['plans'].table_name
+    __table_args__ = {'schema': DATASET_SCHEMA}
     
     plan_id = Column(Integer, primary_key=True, index=True)
     plan_name = Column(String, index=True)
@@ -63,26 +84,42 @@ class Plan(Base):
     storage_limit_mb = Column(Integer)
     project_limit = Column(String)
     
-class Subscription(Base):
-    __tablename__ = 'subscriptions'
-    __table_args__ = {'schema': 'test_dlt_dataset'}
+class Subscription(Loaded, Base):
+    __tablename__ = TABLES['subscriptions'].table_name
+    __table_args__ = (
+        Index('ix_subscriptions_subscription_id_valid_from', 'subscription_id', 'valid_from'),
+        Index('ix_subscriptions_user_id_subscription_id_valid_from', 'user_id', 'subscription_id', 'valid_from'),
+        Index('ix_subscriptions_dlt_load_id_subscription_id', '_dlt_load_id', 'subscription_id'),
+        {'schema': DATASET_SCHEMA},
+    )
     
+    # SCD2 history, like users; user_id is not unique in users, so it has no foreign key
     subscription_id = Column(String, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey('test_dlt_dataset.users.user_id'))
-    plan_id = Column(Integer, ForeignKey('test_dlt_dataset.plans.plan_id'))
-    start_date = Column(String)
-    end_date = Column(String)
-    payment_method_id = Column(Integer, ForeignKey('test_dlt_dataset.payment_methods.payment_method_id'))
+    user_id = Column(String)
+    plan_id = Column(Integer, ForeignKey(_column('plans', 'plan_id')))
+    start_date = Column(Date)
+    end_date = Column(Date)  # NULL for open-ended subscriptions
+    payment_method_id = Column(Integer, ForeignKey(_column('payment_methods', 'payment_method_id')))
     status = Column(String, index=True)
+    valid_from = Column(DateTime(timezone=True), primary_key=True)
+    valid_to = Column(DateTime(timezone=True))
 
-class Usage(Base):
-    __tablename__ = 'usage'
-    __table_args__ = {'schema': 'test_dlt_dataset'}
+# Range-partitioned by month of usage_date in Postgres (see migrations/)
+class Usage(Loaded, Base):
+    __tablename__ = TABLES['usage'].table_name
+    __table_args__ = (
+        Index('ix_usage_usage_date_usage_id', 'usage_date', 'usage_id'),
+        Index('ix_usage_user_id_usage_date_usage_id', 'user_id', 'usage_date', 'usage_id'),
+        Index('ix_usage_subscription_id_usage_date_usage_id', 'subscription_id', 'usage_date', 'usage_id'),
+        Index('ix_usage_dlt_load_id_usage_id', '_dlt_load_id', 'usage_id'),
+        {'schema': DATASET_SCHEMA},
+    )
     
     usage_id = Column(String, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey('test_dlt_dataset.users.user_id'))
-    subscription_id = Column(String, ForeignKey('test_dlt_dataset.subscriptions.subscription_id'))
-    usage_date = Column(String)
+    # Versioned in users and subscriptions, so neither key is unique there
+    user_id = Column(String)
+    subscription_id = Column(String)
+    usage_date = Column(Date)
     actions_performed = Column(Integer)
     storage_used_mb = Column(Float)
     api_calls = Column(Integer)
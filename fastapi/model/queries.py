@@ -0,0 +1,96 @@
+"""
+Queries behind the paginated endpoints
+
+Shared by the API and the query plan check (pipeline/explain_queries.py), so
+the check explains the same queries the API runs. Each query is ordered by
+the columns of an index: offset pagination then returns stable pages, and
+Postgres reads each page from the index instead of sorting the whole table.
+
+The change feeds, which the lake pipeline crawls, page by keyset on the DLT
+load that wrote each row and the row's key instead of by offset: a load that
+commits mid-crawl rewrites and moves rows, which would shift offset pages
+and skip rows on pages already read.
+"""
+from datetime import date
+from typing import Optional, Sequence
+from sqlalchemy import func, select, tuple_
+from model import model
+
+# Key of the rows of each change feed; a load writes at most one version per key
+CHANGE_KEYS = {
+    model.User: model.User.user_id,
+    model.Subscription: model.Subscription.subscription_id,
+    model.Usage: model.Usage.usage_id,
+}
+
+
+def users_query():
+    """User versions by user and validity."""
+    return select(model.User).order_by(model.User.user_id, model.User.valid_from)
+
+
+def subscriptions_query(user_id: Optional[str] = None):
+    """Subscription versions, optionally of one user, by subscription and validity."""
+    query = select(model.Subscription)
+    if user_id is not None:
+        query = query.where(model.Subscription.user_id == user_id)
+    return query.order_by(model.Subscription.subscription_id, model.Subscription.valid_from)
+
+
+def usages_query(
+    user_id: Optional[str] = None,
+    subscription_id: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
+    """
+    Usage records by date, optionally filtered.
+
+    Args:
+        user_id: Only usage of this user
+        subscription_id: Only usage under this subscription
+        start_date: Only usage on or after this date
+        end_date: Only usage on or before this date
+    """
+    query = select(model.Usage)
+    if user_id is not None:
+        query = query.where(model.Usage.user_id == user_id)
+    if subscription_id is not None:
+        query = query.where(model.Usage.subscription_id == subscription_id)
+    if start_date is not None:
+        query = query.where(model.Usage.usage_date >= start_date)
+    if end_date is not None:
+        query = query.where(model.Usage.usage_date <= end_date)
+    return query.order_by(model.Usage.usage_date, model.Usage.usage_id)
+
+
+def latest_load_query(table):
+    """Latest DLT load that wrote a row of `table`, the model of a change feed."""
+    return select(func.max(table.load_id))
+
+
+def changes_query(
+    table,
+    loaded_until: str,
+    loaded_after: Optional[str] = None,
+    after: Optional[Sequence[str]] = None,
+):
+    """
+    Rows of a change feed by load and key.
+
+    Args:
+        table: Model of the change feed, a key of CHANGE_KEYS
+        loaded_until: Only rows written by this DLT load or earlier ones. Fixed
+            for a whole crawl, so loads that commit mid-crawl are left to the
+            next one
+        loaded_after: Only rows written by a DLT load after this one
+        after: (load ID, key) of the last row of the previous page; only rows
+            after it
+    """
+    key = CHANGE_KEYS[table]
+    query = select(table).where(table.load_id <= loaded_until)
+    if after is not None:
+        query = query.where(tuple_(table.load_id, key) > tuple_(*after))
+    elif loaded_after is not None:
+        query = query.where(table.load_id > loaded_after)
+    return query.order_by(table.load_id, key)
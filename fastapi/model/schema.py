@@ -1,6 +1,8 @@
 """
 Pydantic models defining the schema for various entities in the FastAPI application.
 """
+from datetime import date, datetime
+from typing import Optional
 from pydantic import BaseModel, EmailStr
 
 # Main Entity Models (Normalized)
@@ -9,27 +11,34 @@ class User(BaseModel):
     first_name: str
     last_name: str
     email: EmailStr
-    signup_date: str
+    signup_date: date
     plan_id: int
     region_id: int  # FK to regions
     referral_source_id: int  # FK to referral_sources
+    load_id: str  # DLT load that last wrote the row
+    valid_from: datetime  # Start of this version of the user
+    valid_to: Optional[datetime]  # None for the current version
 
 class Subscription(BaseModel):
     subscription_id: str
     user_id: str
     plan_id: int
-    start_date: str
-    end_date: str
+    start_date: date
+    end_date: Optional[date]  # None for open-ended subscriptions
     payment_method_id: int  # FK to payment_methods
     status: str
+    load_id: str  # DLT load that last wrote the row
+    valid_from: datetime  # Start of this version of the subscription
+    valid_to: Optional[datetime]  # None for the current version
 
 
 class Usage(BaseModel):
     usage_id: str
     user_id: str
     subscription_id: str  # FK to subscriptions
-    usage_date: str
+    usage_date: date
     actions_performed: int
     storage_used_mb: float
     api_calls: int
     active_minutes: int
+    load_id: str  # DLT load that last wrote the row
@@ -0,0 +1,182 @@
+"""
+Checks that the paginated and filtered API queries are served by indexes
+
+Runs EXPLAIN on the queries of model/queries.py as the API pages them
+(LIMIT/OFFSET, as fastapi-pagination does, and keyset pages for the change
+feeds), with filter values taken from the loaded data. A query fails the check if any table in its plan is read
+with a sequential scan, or, when filtered on a date range, if it scans
+usage partitions outside that range.
+
+Sequential scans are disabled while explaining: on a small database the
+planner rightly reads a tiny table instead of an index, which says nothing
+about the plan it picks once the table is large. The check therefore
+verifies that an index can serve each query.
+
+Usage:
+    python explain_queries.py
+    python explain_queries.py --database local --page 50
+"""
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine, func, select, text
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.config import RAILWAY_DATABASE_URL, LOCAL_DATABASE_URL, DATASET_SCHEMA
+from model import model
+from model.queries import users_query, subscriptions_query, usages_query, latest_load_query, changes_query
+from pipeline.usage_partitions import USAGE_TABLE, month_start, next_month
+from table_registry import MAX_PAGE_SIZE
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def _nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def explain(connection, query, page: int = 1, size: int = MAX_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Explains one page of `query`.
+
+    Returns:
+        Root node of the JSON plan
+    """
+    paged = query.limit(size).offset((page - 1) * size)
+    compiled = paged.compile(dialect=connection.dialect)
+    result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    plan = result if isinstance(result, list) else json.loads(result)
+    return plan[0]["Plan"]
+
+
+def check_plan(plan: Dict[str, Any], partitions: Optional[int] = None) -> List[str]:
+    """
+    Problems with a query plan.
+
+    Args:
+        plan: Root node of a JSON plan
+        partitions: Number of usage partitions the query may scan, if it is limited
+
+    Returns:
+        Description of every problem found (empty if none)
+    """
+    problems = []
+    scanned_partitions = set()
+    for node in _nodes(plan):
+        relation = node.get("Relation Name")
+        if node["Node Type"] == "Seq Scan":
+            problems.append(f"sequential scan on {relation}")
+        if relation and relation.startswith(f"{USAGE_TABLE}_"):
+            scanned_partitions.add(relation)
+
+    if partitions is not None and len(scanned_partitions) > partitions:
+        problems.append(
+            f"scans {len(scanned_partitions)} usage partitions instead of {partitions}: "
+            f"{', '.join(sorted(scanned_partitions))}"
+        )
+    return problems
+
+
+def _partition_index_parents(connection) -> Dict[str, str]:
+    """Name of the partitioned index each partition's index belongs to, by partition index name."""
+    return dict(connection.execute(text(
+        "SELECT child.relname, parent.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "WHERE child.relkind = 'i'"
+    )).all())
+
+
+def _indexes(plan: Dict[str, Any], parents: Dict[str, str]) -> str:
+    """Indexes scanned by a plan, with scans of partition indexes counted under their partitioned index."""
+    scans: Dict[str, int] = {}
+    for node in _nodes(plan):
+        if node["Node Type"] in INDEX_SCANS:
+            index = parents.get(node["Index Name"], node["Index Name"])
+            scans[index] = scans.get(index, 0) + 1
+    return ", ".join(
+        index if index not in parents.values() else f"{index} ({count} partition(s))"
+        for index, count in sorted(scans.items())
+    )
+
+
+def run_checks(connection, page: int = 1) -> List[str]:
+    """
+    Explains every paginated and filtered API query and checks its plan.
+
+    Args:
+        connection: SQLAlchemy connection to the API database
+        page: Page of each query to explain
+
+    Returns:
+        Description of every failed check (empty if all passed)
+    """
+    sample = connection.execute(
+        select(model.Usage.user_id, model.Usage.subscription_id, model.Usage.usage_id, model.Usage.usage_date,
+               model.Usage.load_id.label("load_id"))
+        .where(model.Usage.usage_date.is_not(None))
+        .limit(1)
+    ).one_or_none()
+    if sample is None:
+        raise ValueError(f"No usage rows in {DATASET_SCHEMA}; load data before checking query plans")
+    first_day = month_start(sample.usage_date)
+    last_day = next_month(first_day) - timedelta(days=1)
+
+    # Name -> (query, usage partitions it may scan, whether it is paged by offset)
+    cases = {
+        "users": (users_query(), None, True),
+        "subscriptions": (subscriptions_query(), None, True),
+        "subscriptions by user": (subscriptions_query(user_id=sample.user_id), None, True),
+        "usages": (usages_query(), None, True),
+        "usages by user": (usages_query(user_id=sample.user_id), None, True),
+        "usages by subscription": (usages_query(subscription_id=sample.subscription_id), None, True),
+        "usages in a month": (usages_query(start_date=first_day, end_date=last_day), 1, True),
+        "usages by user in a month": (usages_query(user_id=sample.user_id, start_date=first_day, end_date=last_day), 1, True),
+    }
+    # Change feeds, paged by keyset: the first page of a crawl, of an incremental crawl and a later page
+    first_load, latest_load = connection.execute(select(func.min(model.Usage.load_id), func.max(model.Usage.load_id))).one()
+    for table, key in [(model.User, sample.user_id), (model.Subscription, sample.subscription_id), (model.Usage, sample.usage_id)]:
+        name = table.__tablename__
+        cases[f"latest {name} load"] = (latest_load_query(table), None, False)
+        cases[f"{name} changes"] = (changes_query(table, latest_load), None, False)
+        cases[f"{name} changes loaded after"] = (changes_query(table, latest_load, loaded_after=first_load), None, False)
+        cases[f"{name} changes after a row"] = (changes_query(table, latest_load, after=(sample.load_id, key)), None, False)
+
+    parents = _partition_index_parents(connection)
+    failures = []
+    connection.execute(text("SET enable_seqscan = off"))
+    try:
+        for name, (query, partitions, offset_paged) in cases.items():
+            plan = explain(connection, query, page if offset_paged else 1)
+            problems = check_plan(plan, partitions)
+            if problems:
+                failures += [f"{name}: {problem}" for problem in problems]
+                print(f"[{datetime.now()}] ✗ {name}: {'; '.join(problems)}")
+            else:
+                print(f"[{datetime.now()}] ✓ {name}: {_indexes(plan, parents)} (cost {plan['Total Cost']})")
+    finally:
+        connection.execute(text("RESET enable_seqscan"))
+    return failures
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check that the API queries are served by indexes")
+    parser.add_argument("--database", choices=["railway", "local"], default="railway", help="Database to check")
+    parser.add_argument("--page", type=int, default=1, help="Page of each query to explain")
+    args = parser.parse_args()
+
+    url = RAILWAY_DATABASE_URL if args.database == "railway" else LOCAL_DATABASE_URL
+    with create_engine(url).connect() as connection:
+        failures = run_checks(connection, args.page)
+
+    if failures:
+        print(f"\n{len(failures)} query plan check(s) failed")
+        sys.exit(1)
+    print("\nAll queries are served by indexes")
@@ -12,12 +12,12 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path="../../.env")
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from config.config import TABLE_CONFIGS
+from config.config import TABLE_CONFIGS, DATASET_SCHEMA, MISSING_DATE
 
 # Environment variables
 LOCAL_DB_URL = os.environ.get("LOCAL_DATABASE_URL")
 RAILWAY_DB_URL = os.environ.get("RAILWAY_DATABASE_URL")
-DATASET_NAME = os.environ.get("RAILWAY_DATASET_NAME", "test_dlt_dataset")
+DATASET_NAME = os.environ.get("RAILWAY_DATASET_NAME", DATASET_SCHEMA)
 PIPELINE_NAME = os.environ.get("RAILWAY_PIPELINE_NAME", "railway_migration_pipeline")
 DESTINATION = os.environ.get("POSTGRES_DESTINATION", "postgres")
 
@@ -40,7 +40,15 @@ def get_data_from_local_db(cursor, table_name):
             raise ValueError(f"No description available for table {table_name}")
 
         cols = [desc[0] for desc in cursor.description]
-        return [dict(zip(cols, row)) for row in rows]
+        records = [dict(zip(cols, row)) for row in rows]
+
+        # Databases not yet migrated to DATE columns still hold missing dates as 'N/A'
+        date_columns = TABLE_CONFIGS[table_name]["columns"]
+        for record in records:
+            for column in date_columns:
+                if record.get(column) == MISSING_DATE:
+                    record[column] = None
+        return records
     except psycopg2.Error as e:
         print(f"Error fetching data from local table {table_name}: {e}")
         return None
@@ -94,6 +102,7 @@ def main():
                     table_name=table_name,
                     write_disposition=config["write_disposition"],
                     primary_key=config["primary_key"],
+                    columns=config["columns"],
                 )
                 print(load_info)
                 print(f"Successfully migrated table '{table_name}'.")
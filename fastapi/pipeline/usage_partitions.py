@@ -0,0 +1,138 @@
+"""
+Monthly range partitions of the usage table
+
+The usage table is range-partitioned by usage_date (see migrations/), with
+one partition per month (usage_pYYYY_MM) and a default partition catching
+NULL dates and months without a partition. Loads keep adding recent dates,
+so run this script regularly, e.g. before each load, to create the
+partitions of the coming months ahead of time. Rows that already landed in
+the default partition are moved into the partition created for their month.
+
+Usage:
+    python usage_partitions.py
+    python usage_partitions.py --database local --months-ahead 6
+"""
+import os
+import sys
+from datetime import date, datetime, timedelta
+from typing import List
+
+import sqlalchemy as sa
+
+USAGE_TABLE = "usage"
+DEFAULT_PARTITION = f"{USAGE_TABLE}_default"
+MONTHS_AHEAD = 3  # Months after the current one that get a partition ahead of time
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"{USAGE_TABLE}_p{month:%Y_%m}"
+
+
+def _exists(connection, schema: str, table: str) -> bool:
+    return connection.execute(
+        sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": f"{schema}.{table}"}
+    ).scalar()
+
+
+def create_partition(connection, schema: str, month: date) -> bool:
+    """
+    Creates the partition of `month`, moving its rows out of the default partition.
+
+    The partition is filled while still detached and only then attached, as
+    Postgres refuses to attach a partition whose rows are in the default one.
+
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+        schema: Schema of the usage table
+        month: First day of the month
+
+    Returns:
+        True if the partition was created, False if it already existed
+    """
+    name = partition_name(month)
+    if _exists(connection, schema, name):
+        return False
+
+    bounds = {"start": month, "end": next_month(month)}
+    connection.execute(sa.text(
+        f"CREATE TABLE {schema}.{name} "
+        f"(LIKE {schema}.{USAGE_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    if _exists(connection, schema, DEFAULT_PARTITION):
+        connection.execute(sa.text(
+            f"WITH moved AS ("
+            f"DELETE FROM {schema}.{DEFAULT_PARTITION} WHERE usage_date >= :start AND usage_date < :end RETURNING *"
+            f") INSERT INTO {schema}.{name} SELECT * FROM moved"
+        ), bounds)
+    connection.execute(sa.text(
+        f"ALTER TABLE {schema}.{USAGE_TABLE} ATTACH PARTITION {schema}.{name} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+    return True
+
+
+def ensure_partitions(connection, schema: str, first_month: date, last_month: date) -> List[str]:
+    """
+    Creates the missing partitions from `first_month` to `last_month`, inclusive.
+
+    Returns:
+        Names of the partitions created
+    """
+    created = []
+    month = month_start(first_month)
+    while month <= last_month:
+        if create_partition(connection, schema, month):
+            created.append(partition_name(month))
+        month = next_month(month)
+    return created
+
+
+def ensure_upcoming_partitions(connection, schema: str, months_ahead: int = MONTHS_AHEAD) -> List[str]:
+    """
+    Creates the partitions of the current month, the `months_ahead` months
+    after it and every month with rows in the default partition.
+
+    Returns:
+        Names of the partitions created
+    """
+    first_month = last_month = month_start(date.today())
+    for _ in range(months_ahead):
+        last_month = next_month(last_month)
+
+    stray = connection.execute(sa.text(
+        f"SELECT min(usage_date), max(usage_date) FROM {schema}.{DEFAULT_PARTITION}"
+    )).one()
+    if stray[0] is not None:
+        first_month = min(first_month, month_start(stray[0]))
+        last_month = max(last_month, month_start(stray[1]))
+
+    return ensure_partitions(connection, schema, first_month, last_month)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from config.config import DATASET_SCHEMA, RAILWAY_DATABASE_URL, LOCAL_DATABASE_URL
+
+    parser = argparse.ArgumentParser(description="Create the upcoming monthly partitions of the usage table")
+    parser.add_argument("--database", choices=["railway", "local"], default="railway", help="Database to maintain")
+    parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD, help="Months to create partitions ahead for")
+    args = parser.parse_args()
+
+    url = RAILWAY_DATABASE_URL if args.database == "railway" else LOCAL_DATABASE_URL
+    with sa.create_engine(url).begin() as connection:
+        created = ensure_upcoming_partitions(connection, DATASET_SCHEMA, args.months_ahead)
+
+    if created:
+        print(f"[{datetime.now()}] ✓ Created partitions {', '.join(created)}")
+    else:
+        print(f"[{datetime.now()}] ✓ All partitions up to {args.months_ahead} month(s) ahead exist")
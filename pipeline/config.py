@@ -2,90 +2,51 @@
 Configuration for data sources in the ETL pipeline.
 """
 import os
+import re
+import sys
 from dotenv import load_dotenv
+from dlt.destinations.adapters import athena_partition
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from table_registry import TABLES
 
 load_dotenv(dotenv_path="../.env")
 
 USERNAME = os.environ["BASIC_AUTH_USERNAME"]
 PASSWORD = os.environ["BASIC_AUTH_PASSWORD"]
 
-# Define configurations for each data source
-# You can customize the write_disposition, primary_key, etc. for each source.
+
+def _athena_partition(spec):
+    """
+    Parses a registry partition transform, e.g. "bucket(8, user_id)", into an
+    athena_partition; a bare column name is an identity partition.
+    """
+    match = re.fullmatch(r"(\w+)\((.*)\)", spec.strip())
+    if match is None:
+        return spec
+    transform, args = match.group(1), [arg.strip() for arg in match.group(2).split(",")]
+    if transform in ("bucket", "truncate"):
+        return getattr(athena_partition, transform)(int(args[0]), args[1])
+    return getattr(athena_partition, transform)(*args)
+
+
+# Source configuration of every table in the registry, keyed by its lake name.
+# `partition` is the table's Iceberg partition spec, `columns` holds column type
+# hints and `maintenance` overrides the thresholds of
+# iceberg_maintenance.MaintenancePolicy. Tables are tuned in table_registry.py.
 SOURCES = {
-    "users": {
-        "path": "users",
-        "paginated": True,  # Uses fastapi_pagination
-        "write_disposition": {
-            "disposition": "merge",
-            "strategy": "scd2",
-            "validity_column_names": ["valid_from", "valid_to"]
-        },
-        "primary_key": "user_id",
-    },
-    "plans": {
-        "path": "plans",
-        "paginated": False,  # Returns all records
-        "write_disposition": {
-            "disposition": "merge",
-            "strategy": "upsert"
-        },
-        "primary_key": "plan_id",
-    },
-    "subscriptions": {
-        "path": "subscriptions",
-        "paginated": True,  # Uses fastapi_pagination
-        "write_disposition": {
-            "disposition": "merge",
-            "strategy": "scd2",
-            "validity_column_names": ["valid_from", "valid_to"]
-        },
-        "primary_key": "subscription_id",
-    },
-    "usages": {
-        "path": "usages",
-        "paginated": True,  # Uses fastapi_pagination
-        "write_disposition": {
-            "disposition": "merge",
-            "strategy": "upsert"
-        },
-        "primary_key": "usage_id",
-    },
-    "features": {
-        "path": "plan-features",
-        "paginated": False,  # Returns all records
-        "write_disposition": {
-            "disposition": "merge",
-            "strategy": "upsert"
-        },
-        "primary_key": "feature_id",
-    },
-    "payment_methods": {
-        "path": "payment-methods",
-        "paginated": False,  # Returns all records
-        "write_disposition": {
-            "disposition": "merge",
-            "strategy": "upsert"
-        },
-        "primary_key": "payment_method_id",
-    },
-    "referrals": {
-        "path": "referral-sources",
-        "paginated": False,  # Returns all records
-        "write_disposition": {
-            "disposition": "merge",
-            "strategy": "upsert"
-        },
-        "primary_key": "referral_source_id",
-    },
-    "regions": {
-        "path": "regions",
-        "paginated": False,  # Returns all records
-        "write_disposition": {
-            "disposition": "merge",
-            "strategy": "upsert"
-        },
-        "primary_key": "region_id",
+    table.lake_name: {
+        "path": table.api_path,
+        "paginated": table.paginated,
+        "page_size": table.page_size,
+        "parallelized": table.parallelized,
+        "write_disposition": table.write_disposition,
+        "primary_key": table.primary_key,
+        "columns": table.columns,
+        "partition": [_athena_partition(spec) for spec in table.partition],
+        "maintenance": table.maintenance,
     }
+    for table in TABLES.values()
 }
 
 
@@ -0,0 +1,329 @@
+"""
+Maintenance of the Iceberg tables written by rest_athena_pipeline.py
+
+Every merge adds data files, delete files and a snapshot to the table it loads,
+so reads slow down and cost more over time. The maintenance stage runs after a
+load and, per table:
+
+1. bin-packs small data files and rewrites delete files into the data files,
+2. expires snapshots older than the retention period,
+3. removes orphan files that no remaining snapshot references.
+
+On Athena this is done with OPTIMIZE and VACUUM, configured through table
+properties. On the filesystem destination (local Iceberg tables, e.g. a SQLite
+catalog with a local warehouse) the same steps run through pyiceberg.
+
+Thresholds default to MaintenancePolicy() and are overridden per table with
+the `maintenance` field of its entry in table_registry.py.
+"""
+from collections import Counter
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+MB = 1024 ** 2
+
+
+@dataclass(frozen=True)
+class MaintenancePolicy:
+    """Maintenance thresholds of one table."""
+    small_file_mb: int = 96  # Data files below this size are compacted
+    min_input_files: int = 5  # Small files a partition needs before it is compacted
+    min_delete_files: int = 2  # Delete files a partition needs before they are rewritten
+    max_snapshot_age_hours: int = 120  # Snapshots and orphan files older than this are removed
+    min_snapshots_to_keep: int = 1
+
+
+@dataclass(frozen=True)
+class TableMetrics:
+    """File layout of a table at one point in time."""
+    data_files: int
+    data_bytes: int
+    delete_files: int
+    snapshots: int
+
+
+def policy_for(config: Dict[str, Any]) -> MaintenancePolicy:
+    """
+    Maintenance policy of a source: the defaults updated with its "maintenance" overrides.
+
+    Args:
+        config: Configuration dictionary of the source in SOURCES
+
+    Raises:
+        ValueError: If the overrides name an unknown threshold
+    """
+    overrides = config.get("maintenance", {})
+    unknown = set(overrides) - {f.name for f in fields(MaintenancePolicy)}
+    if unknown:
+        raise ValueError(f"Unknown maintenance thresholds: {sorted(unknown)}")
+    return replace(MaintenancePolicy(), **overrides)
+
+
+# --- Athena ---
+
+def _athena_metrics(client, table_name: str) -> TableMetrics:
+    files_table = client.make_qualified_table_name(f"{table_name}$files")
+    snapshots_table = client.make_qualified_table_name(f"{table_name}$snapshots")
+    with client.execute_query(
+        f"SELECT count_if(content = 0), coalesce(sum(if(content = 0, file_size_in_bytes)), 0), "
+        f"count_if(content <> 0) FROM {files_table}"
+    ) as cursor:
+        data_files, data_bytes, delete_files = cursor.fetchone()
+    with client.execute_query(f"SELECT count(*) FROM {snapshots_table}") as cursor:
+        snapshots = cursor.fetchone()[0]
+    return TableMetrics(int(data_files), int(data_bytes), int(delete_files), int(snapshots))
+
+
+def maintain_athena_table(client, table_name: str, policy: MaintenancePolicy) -> Tuple[TableMetrics, TableMetrics]:
+    """
+    Compacts an Athena Iceberg table and removes its expired snapshots and orphan files.
+
+    The thresholds are stored as table properties, which OPTIMIZE (bin-packing
+    and delete file rewrites) and VACUUM (snapshot expiry and orphan removal) read.
+
+    Args:
+        client: SQL client of the Athena pipeline
+        table_name: Name of the table in the pipeline's dataset
+        policy: Thresholds of the table
+
+    Returns:
+        Metrics of the table before and after maintenance
+    """
+    before = _athena_metrics(client, table_name)
+    properties = {
+        "optimize_rewrite_min_data_file_size_bytes": policy.small_file_mb * MB,
+        "optimize_rewrite_data_file_threshold": policy.min_input_files,
+        "optimize_rewrite_delete_file_threshold": policy.min_delete_files,
+        "vacuum_max_snapshot_age_seconds": policy.max_snapshot_age_hours * 3600,
+        "vacuum_min_snapshots_to_keep": policy.min_snapshots_to_keep,
+    }
+    properties_sql = ", ".join(f"'{key}'='{value}'" for key, value in properties.items())
+    client.execute_sql(f"ALTER TABLE {client.make_qualified_ddl_table_name(table_name)} SET TBLPROPERTIES ({properties_sql})")
+
+    qualified_name = client.make_qualified_table_name(table_name)
+    client.execute_sql(f"OPTIMIZE {qualified_name} REWRITE DATA USING BIN_PACK")
+    client.execute_sql(f"VACUUM {qualified_name}")
+    return before, _athena_metrics(client, table_name)
+
+
+# --- pyiceberg (filesystem destination and local catalogs) ---
+
+def iceberg_metrics(table) -> TableMetrics:
+    """Current file layout of a pyiceberg table."""
+    table = table.refresh()
+    if table.current_snapshot() is None:
+        return TableMetrics(0, 0, 0, len(table.metadata.snapshots))
+    data_files = table.inspect.data_files()
+    return TableMetrics(
+        data_files=data_files.num_rows,
+        data_bytes=int(sum(data_files["file_size_in_bytes"].to_pylist())),
+        delete_files=table.inspect.delete_files().num_rows,
+        snapshots=len(table.metadata.snapshots),
+    )
+
+
+def _partition_filter(table, partition: Dict[str, Any]):
+    """
+    Row filter matching exactly the rows of one partition, or None if the
+    partition spec has transforms other than identity.
+    """
+    from pyiceberg.expressions import AlwaysTrue, And, EqualTo, IsNull
+    from pyiceberg.transforms import IdentityTransform
+
+    row_filter = AlwaysTrue()
+    for field in table.spec().fields:
+        if not isinstance(field.transform, IdentityTransform):
+            return None
+        column_name = table.schema().find_column_name(field.source_id)
+        value = partition[field.name]
+        row_filter = And(row_filter, IsNull(column_name) if value is None else EqualTo(column_name, value))
+    return row_filter
+
+
+def _compact(table, policy: MaintenancePolicy) -> int:
+    """
+    Rewrites every partition with enough small data files or delete files into
+    as few files as the table's target file size allows.
+
+    Returns:
+        Number of partitions rewritten
+    """
+    if table.current_snapshot() is None:
+        return 0
+
+    def key(file: Dict[str, Any]) -> tuple:
+        return tuple(sorted((file.get("partition") or {}).items()))
+
+    partitions: Dict[tuple, Dict[str, Any]] = {}
+    small_files: Counter = Counter()
+    for data_file in table.inspect.data_files().to_pylist():
+        partitions[key(data_file)] = data_file.get("partition") or {}
+        if data_file["file_size_in_bytes"] < policy.small_file_mb * MB:
+            small_files[key(data_file)] += 1
+    delete_files = Counter(key(delete_file) for delete_file in table.inspect.delete_files().to_pylist())
+
+    rewritten = 0
+    for partition_key, partition in partitions.items():
+        if (small_files[partition_key] < policy.min_input_files
+                and delete_files[partition_key] < policy.min_delete_files):
+            continue
+        row_filter = _partition_filter(table, partition)
+        if row_filter is None:
+            print(f"⚠ Cannot compact {table.name()}: only identity partitions are supported")
+            return rewritten
+        # Reading the partition applies its delete files; overwriting it replaces all its files
+        rows = table.scan(row_filter=row_filter).to_arrow()
+        table.overwrite(rows, overwrite_filter=row_filter)
+        table = table.refresh()
+        rewritten += 1
+    return rewritten
+
+
+def _expire_snapshots(table, policy: MaintenancePolicy, now: datetime) -> int:
+    """Expires the snapshots older than the retention period, keeping the newest ones. Returns their number."""
+    cutoff_ms = (now - timedelta(hours=policy.max_snapshot_age_hours)).timestamp() * 1000
+    snapshots = sorted(table.metadata.snapshots, key=lambda s: s.timestamp_ms, reverse=True)
+    kept = {s.snapshot_id for s in snapshots[:policy.min_snapshots_to_keep]}
+    kept |= {ref.snapshot_id for ref in table.metadata.refs.values()}
+    expired = [s.snapshot_id for s in snapshots if s.timestamp_ms < cutoff_ms and s.snapshot_id not in kept]
+    if expired:
+        table.maintenance.expire_snapshots().by_ids(expired).commit()
+    return len(expired)
+
+
+def _fs_path(uri: str) -> str:
+    """Path of `uri` as the pyarrow file system of its scheme names it."""
+    parsed = urlparse(uri)
+    return parsed.path if parsed.scheme in ('', 'file') else parsed.netloc + parsed.path
+
+
+def _remove_orphan_files(table, policy: MaintenancePolicy, now: datetime) -> int:
+    """
+    Deletes data files and manifests under the table location that no snapshot
+    references and that are older than the retention period. Metadata JSON
+    files are left to the catalog.
+
+    Returns:
+        Number of files deleted
+    """
+    from pyarrow import fs
+
+    table = table.refresh()
+    referenced = {_fs_path(s.manifest_list) for s in table.metadata.snapshots}
+    if table.metadata.snapshots:
+        referenced |= {_fs_path(path) for path in table.inspect.all_files()["file_path"].to_pylist()}
+        referenced |= {_fs_path(path) for path in table.inspect.all_manifests()["path"].to_pylist()}
+
+    filesystem, location = fs.FileSystem.from_uri(table.location())
+    cutoff = now - timedelta(hours=policy.max_snapshot_age_hours)
+    orphans = []
+    for directory, suffix in ((f"{location}/data", ""), (f"{location}/metadata", ".avro")):
+        for info in filesystem.get_file_info(fs.FileSelector(directory, recursive=True, allow_not_found=True)):
+            if (info.type == fs.FileType.File and info.path.endswith(suffix)
+                    and info.path not in referenced and info.mtime < cutoff):
+                orphans.append(info.path)
+
+    for path in orphans:
+        filesystem.delete_file(path)
+    return len(orphans)
+
+
+def maintain_iceberg_table(table, policy: MaintenancePolicy, now: Optional[datetime] = None) -> Tuple[TableMetrics, TableMetrics]:
+    """
+    Compacts a pyiceberg table and removes its expired snapshots and orphan files.
+
+    Partitions are compacted by rewriting them whole, which requires an
+    identity (or no) partition spec, as on tables of the filesystem destination.
+
+    Args:
+        table: pyiceberg table to maintain
+        policy: Thresholds of the table
+        now: Time the retention period is measured from (defaults to the current time)
+
+    Returns:
+        Metrics of the table before and after maintenance
+    """
+    now = now or datetime.now(timezone.utc)
+    before = iceberg_metrics(table)
+    rewritten = _compact(table, policy)
+    expired = _expire_snapshots(table.refresh(), policy, now)
+    removed = _remove_orphan_files(table, policy, now)
+    print(
+        f"[{datetime.now()}] ✓ {table.name()[-1]}: rewrote {rewritten} partition(s), "
+        f"expired {expired} snapshot(s), removed {removed} orphan file(s)"
+    )
+    return before, iceberg_metrics(table)
+
+
+# --- Pipeline stage ---
+
+def run_maintenance(pipeline, sources: Dict[str, Dict[str, Any]], tables: Optional[List[str]] = None) -> Dict[str, Tuple[TableMetrics, TableMetrics]]:
+    """
+    Maintains the Iceberg tables the pipeline loaded, using each source's policy.
+
+    Args:
+        pipeline: DLT pipeline with an athena or filesystem destination
+        sources: Source configurations, as SOURCES in config.py
+        tables: Names of the tables to maintain (defaults to all sources)
+
+    Returns:
+        Metrics before and after maintenance, by table name
+    """
+    tables = tables or list(sources)
+    destination = pipeline.destination.destination_name
+    print(f"[{datetime.now()}] Starting Iceberg maintenance of {len(tables)} table(s) on {destination}...")
+
+    results = {}
+    if destination == "athena":
+        with pipeline.sql_client() as client:
+            for table_name in tables:
+                results[table_name] = maintain_athena_table(client, table_name, policy_for(sources[table_name]))
+    elif destination == "filesystem":
+        from dlt.common.libs.pyiceberg import get_iceberg_tables
+
+        iceberg_tables = get_iceberg_tables(pipeline)
+        for table_name in tables:
+            if table_name not in iceberg_tables:
+                print(f"⚠ Skipping {table_name}: no Iceberg table loaded")
+                continue
+            results[table_name] = maintain_iceberg_table(iceberg_tables[table_name], policy_for(sources[table_name]))
+    else:
+        raise ValueError(f"Iceberg maintenance is not supported on the {destination} destination")
+
+    print_metrics(results)
+    return results
+
+
+def print_metrics(results: Dict[str, Tuple[TableMetrics, TableMetrics]]) -> None:
+    """Prints the file counts and sizes of each table before and after maintenance."""
+    print(f"\n{'table':<20} {'data files':>16} {'data MB':>20} {'delete files':>14} {'snapshots':>12}")
+    for table_name, (before, after) in results.items():
+        print(
+            f"{table_name:<20} {f'{before.data_files} → {after.data_files}':>16} "
+            f"{f'{before.data_bytes / MB:.1f} → {after.data_bytes / MB:.1f}':>20} "
+            f"{f'{before.delete_files} → {after.delete_files}':>14} "
+            f"{f'{before.snapshots} → {after.snapshots}':>12}"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+    from pyiceberg.catalog import load_catalog
+
+    parser = argparse.ArgumentParser(description="Maintain the Iceberg tables of a local SQL catalog")
+    parser.add_argument("--catalog-uri", required=True, help="SQLAlchemy URI of the catalog, e.g. sqlite:///catalog.db")
+    parser.add_argument("--warehouse", required=True, help="Warehouse location, e.g. file:///tmp/warehouse")
+    parser.add_argument("--namespace", required=True, help="Namespace holding the tables")
+    parser.add_argument("--tables", nargs='+', default=None, help="Tables to maintain (defaults to all)")
+    parser.add_argument("--max-snapshot-age-hours", type=int, default=MaintenancePolicy.max_snapshot_age_hours)
+    args = parser.parse_args()
+
+    catalog = load_catalog("local", type="sql", uri=args.catalog_uri, warehouse=args.warehouse)
+    table_names = args.tables or [identifier[-1] for identifier in catalog.list_tables(args.namespace)]
+    policy = MaintenancePolicy(max_snapshot_age_hours=args.max_snapshot_age_hours)
+    print_metrics({
+        name: maintain_iceberg_table(catalog.load_table((args.namespace, name)), policy)
+        for name in table_names
+    })
@@ -0,0 +1,190 @@
+"""
+Change-aware orchestration of the extract and transform steps
+
+Runs rest_athena_pipeline.py, reads which tables received rows from the dlt
+LoadInfo and builds only the dbt models downstream of those tables
+(`source:fake_source.<table>+`). Runs that loaded no rows skip dbt entirely,
+so the transform time follows what actually changed.
+
+This relies on the extraction being incremental: rest_athena_pipeline.py
+only loads the rows the API database received since its previous run
+(its cursor on the API's load_id), so a table receives rows exactly when
+it changed upstream. Resetting the lake pipeline's state makes the next
+run load, and therefore rebuild, everything.
+
+The manifest of the last successful dbt run is kept in the state directory.
+Later runs pass it as --state with --defer, so unselected upstream models
+resolve to the relations that run built, and models whose code changed since
+(`state:modified+`) are rebuilt along with the changed sources.
+
+Usage:
+    python orchestrate.py
+    python orchestrate.py --tables usages --dry-run
+"""
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import yaml
+
+DBT_PROJECT_DIR = Path(os.getenv("DBT_PROJECT_DIR", Path(__file__).resolve().parent.parent / "dbt_modelling"))
+DBT_STATE_DIR = Path(os.getenv("DBT_STATE_DIR", DBT_PROJECT_DIR / "state"))
+DBT_SOURCE_NAME = "fake_source"
+MANIFEST_FILE = "manifest.json"
+
+
+def source_tables(project_dir: Path = DBT_PROJECT_DIR, source_name: str = DBT_SOURCE_NAME) -> Dict[str, str]:
+    """
+    Maps the destination table names of a dbt source to its dbt table names.
+
+    Args:
+        project_dir: Directory of the dbt project
+        source_name: Name of the source in models/source.yaml
+
+    Returns:
+        dbt table name by destination table name (the table's identifier, if set)
+    """
+    with open(project_dir / "models" / "source.yaml") as f:
+        sources = yaml.safe_load(f)["sources"]
+
+    for source in sources:
+        if source["name"] == source_name:
+            return {table.get("identifier", table["name"]): table["name"] for table in source["tables"]}
+    raise ValueError(f"Source {source_name} not found in {project_dir / 'models' / 'source.yaml'}")
+
+
+def changed_tables(info, project_dir: Path = DBT_PROJECT_DIR) -> List[str]:
+    """
+    Names the dbt source tables that received rows in a dlt run.
+
+    Nested tables (users__emails) count as changes to their parent table;
+    dlt's own tables and tables that are not dbt sources are ignored.
+
+    Args:
+        info: LoadInfo returned by pipeline.run()
+        project_dir: Directory of the dbt project
+
+    Returns:
+        Sorted dbt table names of the changed sources
+    """
+    normalize_info = info.pipeline.last_trace.last_normalize_info
+    row_counts = normalize_info.row_counts if normalize_info else {}
+    tables = source_tables(project_dir)
+
+    changed = set()
+    for table_name, rows in row_counts.items():
+        parent = table_name.split("__")[0]
+        if rows and parent in tables:
+            changed.add(tables[parent])
+    return sorted(changed)
+
+
+def dbt_args(
+    tables: Iterable[str],
+    command: str = "build",
+    project_dir: Path = DBT_PROJECT_DIR,
+    state_dir: Path = DBT_STATE_DIR,
+    target: Optional[str] = None,
+) -> List[str]:
+    """
+    Builds the dbt command line selecting the models downstream of `tables`.
+
+    Args:
+        tables: dbt table names of the changed sources
+        command: dbt command to run
+        project_dir: Directory of the dbt project
+        state_dir: Directory holding the manifest of the last successful run
+        target: dbt target; the profile's default if omitted
+
+    Returns:
+        Arguments for dbtRunner.invoke()
+    """
+    select = [f"source:{DBT_SOURCE_NAME}.{table}+" for table in tables]
+    args = [command, "--project-dir", str(project_dir), "--profiles-dir", str(project_dir)]
+    if target:
+        args += ["--target", target]
+
+    if (state_dir / MANIFEST_FILE).exists():
+        select.append("state:modified+")
+        args += ["--state", str(state_dir), "--defer"]
+    else:
+        print(f"⚠ No dbt state in {state_dir}: building without deferral")
+
+    return args + ["--select", *select]
+
+
+def run_dbt(
+    tables: List[str],
+    command: str = "build",
+    project_dir: Path = DBT_PROJECT_DIR,
+    state_dir: Path = DBT_STATE_DIR,
+    target: Optional[str] = None,
+) -> bool:
+    """
+    Runs dbt for the models downstream of `tables` and saves the state of a
+    successful run.
+
+    Args:
+        tables: dbt table names of the changed sources; dbt is skipped if empty
+        command: dbt command to run
+        project_dir: Directory of the dbt project
+        state_dir: Directory holding the manifest of the last successful run
+        target: dbt target; the profile's default if omitted
+
+    Returns:
+        True if dbt ran, False if it was skipped
+    """
+    if not tables:
+        print(f"[{datetime.now()}] ✓ No source tables received rows, skipping dbt")
+        return False
+
+    from dbt.cli.main import dbtRunner
+
+    args = dbt_args(tables, command, project_dir, state_dir, target)
+    print(f"[{datetime.now()}] Running dbt {' '.join(args)}")
+    result = dbtRunner().invoke(args)
+    if not result.success:
+        raise RuntimeError(f"dbt {command} failed for {', '.join(tables)}") from result.exception
+
+    # The next run defers to the relations this run built
+    state_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copy(project_dir / "target" / MANIFEST_FILE, state_dir / MANIFEST_FILE)
+    print(f"[{datetime.now()}] ✓ dbt {command} finished for {', '.join(tables)}; state saved to {state_dir}")
+    return True
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load the API data and build the dbt models it changed")
+    parser.add_argument("--tables", nargs='+', default=None, help="Skip the load and treat these source tables as changed")
+    parser.add_argument("--command", default="build", choices=["build", "run"], help="dbt command to run")
+    parser.add_argument("--target", default=None, help="dbt target (defaults to the profile's default)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the dbt command instead of running it")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Starting orchestration run at {datetime.now()}")
+    print("=" * 60)
+
+    if args.tables is None:
+        from rest_athena_pipeline import run_pipeline
+
+        _, info = run_pipeline()
+        tables = changed_tables(info)
+    else:
+        unknown = set(args.tables) - set(source_tables().values())
+        if unknown:
+            parser.error(f"Not tables of {DBT_SOURCE_NAME}: {', '.join(sorted(unknown))}")
+        tables = args.tables
+    print(f"Changed source tables: {', '.join(tables) or 'none'}")
+
+    if args.dry_run:
+        if tables:
+            print(f"dbt {' '.join(dbt_args(tables, args.command, target=args.target))}")
+    else:
+        run_dbt(tables, args.command, target=args.target)
+
+    print(f"Orchestration completed at {datetime.now()}")
@@ -1,9 +1,11 @@
 import os
 import dlt
 from dlt.sources.helpers.rest_client.client import RESTClient
-from dlt.sources.helpers.rest_client.paginators import PageNumberPaginator
+from dlt.sources.helpers.rest_client.paginators import JSONResponseCursorPaginator
+from dlt.destinations.adapters import athena_adapter
 from dotenv import load_dotenv
 from config import SOURCES, PARAMS
+from iceberg_maintenance import run_maintenance
 from requests.exceptions import HTTPError, ConnectionError, Timeout, RequestException
 from datetime import datetime
 
@@ -15,6 +17,10 @@ BASE_URL = os.getenv("APP_URL")
 DESTINATION = os.getenv("ATHENA_DESTINATION")
 PIPELINE_NAME = os.getenv("ATHENA_PIPELINE_NAME")
 DATASET_NAME = os.getenv("ATHENA_DATASET_NAME")
+# Compact the Iceberg tables and expire their snapshots after each load
+RUN_MAINTENANCE = os.getenv("ICEBERG_MAINTENANCE", "false").lower() == "true"
+# Field of every API record naming the DLT load that wrote it in the API database
+LOAD_ID_CURSOR = "load_id"
 
 # Validate required environment variables
 if BASE_URL is None or DESTINATION is None or PIPELINE_NAME is None or DATASET_NAME is None:
@@ -30,22 +36,122 @@ def rest_api_source():
     """
     A DLT source that dynamically creates resources for each configured endpoint.
     Handles both paginated and non-paginated endpoints based on configuration.
+
+    Every resource is incremental on the API's load_id, so each run only loads
+    the rows the API database received since the previous run. SCD2 resources
+    therefore merge on their primary key: keys missing from a run are left
+    as they are instead of being retired. A key the API database retires
+    without a new version keeps its load_id, so it stays current in the lake
+    until the pipeline's state is dropped and everything is reloaded.
     """
     for source_name, config in SOURCES.items():
         resource_config = {
             "name": source_name,
             "write_disposition": config["write_disposition"],
-            "primary_key": config.get("primary_key", None)
+            "primary_key": config.get("primary_key", None),
+            "columns": config.get("columns", None),
+            "parallelized": config.get("parallelized", False),
         }
+        if config["write_disposition"].get("strategy") == "scd2":
+            resource_config["merge_key"] = config["primary_key"]
         
-        yield dlt.resource(
-            _get_data(source_name, config),
+        resource = dlt.resource(
+            _get_data,
             **resource_config,
             table_format="iceberg"
-        )
+        )(source_name, config)
+        yield _apply_partition(_current_versions(resource, config), config)
+
+
+def _current_versions(resource, config):
+    """
+    Keeps only the current version of each record of an SCD2 source.
+
+    The API serves every version of an SCD2 table with its validity columns,
+    while the lake builds its own history from the snapshots it loads. So the
+    lake gets the current versions without the API's validity columns, which
+    its SCD2 merge fills in itself.
+
+    Args:
+        resource: The DLT resource of the source
+        config: Configuration dictionary of the source in SOURCES
+
+    Returns:
+        The resource, filtered if the source is SCD2
+    """
+    write_disposition = config["write_disposition"]
+    if write_disposition.get("strategy") != "scd2":
+        return resource
+    valid_from, valid_to = write_disposition["validity_column_names"]
+
+    def _drop_validity(record):
+        return {column: value for column, value in record.items() if column not in (valid_from, valid_to)}
+
+    return resource.add_filter(lambda record: record.get(valid_to) is None).add_map(_drop_validity)
+
+
+def _apply_partition(resource, config):
+    """
+    Applies the Iceberg partition spec of a source to its resource.
+
+    Athena creates the table with the spec's transforms. The filesystem
+    destination only supports identity partitions, so transforms that amount to
+    one there (plain columns, and day() of a date column) become partition
+    columns and any other transform is skipped.
+    Partition specs only take effect when the table is created.
+
+    Args:
+        resource: The DLT resource of the source
+        config: Configuration dictionary of the source in SOURCES
+
+    Returns:
+        The resource with its partition hints applied
+    """
+    partition = config.get("partition")
+    if not partition:
+        return resource
+    if DESTINATION == "athena":
+        return athena_adapter(resource, partition=partition)
+
+    column_types = config.get("columns", {})
+    partition_columns = {}
+    for transform in partition:
+        if isinstance(transform, str):
+            partition_columns[transform] = {"name": transform, "partition": True}
+            continue
+
+        column_name = transform.column_name
+        is_date = column_types.get(column_name, {}).get("data_type") == "date"
+        if transform.template == "{column_name}" or (transform.template == "day({column_name})" and is_date):
+            partition_columns[column_name] = {"name": column_name, "partition": True}
+        else:
+            spec = transform.template.format(column_name=column_name)
+            print(f"⚠ Skipping partition {spec} of {resource.name}: {DESTINATION} only supports identity partitions")
+
+    resource.apply_hints(columns=partition_columns)
+    return resource
+
 
+def print_file_layout(pipeline):
+    """
+    Prints the partition spec and the data files per partition of every Iceberg
+    table the pipeline wrote to a filesystem destination.
 
-def _get_data(source_name, config):
+    Args:
+        pipeline: The DLT pipeline that loaded the tables
+    """
+    from dlt.common.libs.pyiceberg import get_iceberg_tables
+
+    for table_name, table in get_iceberg_tables(pipeline).items():
+        print(f"{table_name}: {table.spec()}")
+        partitions = table.inspect.partitions().to_pylist()
+        for partition in sorted(partitions, key=lambda p: [str(v) for v in (p.get("partition") or {}).values()]):
+            values = partition.get("partition") or {}
+            label = ", ".join(f"{column}={value}" for column, value in values.items()) or "(unpartitioned)"
+            print(f"  {label}: {partition['file_count']} file(s), {partition['record_count']} record(s)")
+
+
+def _get_data(source_name, config, load_id=dlt.sources.incremental(LOAD_ID_CURSOR, range_start="open")):
     """
     Fetches data from a specified REST API endpoint.
     Handles both paginated and non-paginated endpoints with comprehensive error handling.
@@ -53,6 +159,12 @@ def _get_data(source_name, config):
     Args:
         source_name: Name of the data source
         config: Configuration dictionary containing path, pagination flag, etc.
+        load_id: Incremental cursor on the API's load_id; the change feeds of
+            paginated endpoints only return rows of loads after the last one
+            loaded, and DLT drops the other rows of the other endpoints. The
+            range is open, as the rows a load writes to a table are committed
+            together; this spares DLT from keeping the hashes of a whole load
+            to deduplicate
     
     Yields:
         Records from the API endpoint
@@ -62,10 +174,10 @@ def _get_data(source_name, config):
     try:
         # Configure REST client with appropriate paginator
         if is_paginated:
-            paginator = PageNumberPaginator(
-                base_page=1,
-                page_param="page",
-                total_path="total"
+            # Change feed pages are keyset pages, each linking to the next with a cursor
+            paginator = JSONResponseCursorPaginator(
+                cursor_path="next_page",
+                cursor_param="cursor"
             )
         else:
             paginator = None
@@ -78,10 +190,15 @@ def _get_data(source_name, config):
         try:
             if is_paginated:
                 # Add page size to params for paginated endpoints
-                paginated_params = {**PARAMS, "size": 100}
+                paginated_params = {**PARAMS, "size": config.get("page_size", 100)}
+                if load_id.last_value is not None:
+                    paginated_params["loaded_after"] = load_id.last_value
                 
+                # The change feed serves rows by the load that wrote them, up to the
+                # latest load when the crawl started, so loads committing mid-crawl
+                # neither shift pages nor get skipped
                 pages = client.paginate(
-                    path=config["path"],
+                    path=f"{config['path']}/changes",
                     params=paginated_params,
                     data_selector="items"
                 )
@@ -157,21 +274,48 @@ def _get_data(source_name, config):
 
 # --- Pipeline Execution ---
 
+def run_pipeline():
+    """
+    Loads every configured source into the destination.
+
+    Returns:
+        The DLT pipeline and the LoadInfo of the run
+    """
+    pipeline = dlt.pipeline(
+        pipeline_name=PIPELINE_NAME,
+        destination=DESTINATION,
+        dataset_name=DATASET_NAME
+    )
+
+    source = rest_api_source()
+    if DESTINATION == "filesystem":
+        # Iceberg tables on the filesystem destination only support upsert merges
+        scd2_sources = [
+            name for name, config in SOURCES.items()
+            if config["write_disposition"].get("strategy") == "scd2"
+        ]
+        print(f"⚠ Skipping {', '.join(scd2_sources)}: the filesystem destination does not support scd2 merges")
+        source = source.with_resources(*[name for name in SOURCES if name not in scd2_sources])
+
+    info = pipeline.run(source)
+    print(info)
+
+    if RUN_MAINTENANCE:
+        run_maintenance(pipeline, SOURCES, tables=list(source.selected_resources))
+
+    if DESTINATION == "filesystem":
+        print_file_layout(pipeline)
+
+    return pipeline, info
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print(f"Starting pipeline run at {datetime.now()}")
     print("=" * 60)
     
     try:
-        pipeline = dlt.pipeline(
-            pipeline_name=PIPELINE_NAME,
-            destination=DESTINATION,
-            dataset_name=DATASET_NAME
-        )
-        
-        source = rest_api_source()
-        info = pipeline.run(source)
-        print(info)
+        run_pipeline()
         
     except Exception as e:
         print(f"✗ Pipeline failed: {str(e)}")
@@ -0,0 +1,116 @@
+"""
+Registry of the tables shared by every component of the project
+
+Each table is described once here and read by the fake data generator and its
+loaders (fake data/pipeline), the API and its ORM models (fastapi), the Railway
+migration and the lake pipeline (pipeline). Tuning a table, such as its page
+size or partitioning, is therefore a single change here.
+
+Components name the same table differently, and existing databases and the
+dbt sources rely on those names, so a table keeps one name per component:
+`key` in the generated data, `table_name` in the API database and `lake_name`
+in the lake and the dbt sources.
+
+Only the standard library is used, so the API can read the registry without
+the pipeline dependencies.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Tuple
+
+# Dataset (Postgres schema) the generated data is loaded into and the API serves
+DATASET_NAME = "test_dlt_dataset"
+
+MAX_PAGE_SIZE = 100  # Largest page size fastapi-pagination accepts
+
+# Generated end date of open-ended subscriptions, loaded as NULL into DATE columns
+MISSING_DATE = "N/A"
+
+SCD2_DISPOSITION = {
+    "disposition": "merge",
+    "strategy": "scd2",
+    "validity_column_names": ["valid_from", "valid_to"]
+}
+UPSERT_DISPOSITION = {"disposition": "merge", "strategy": "upsert"}
+
+
+@dataclass(frozen=True)
+class Table:
+    key: str  # Key in FakerETL.data
+    table_name: str  # Table in the API database
+    lake_name: str  # Table in the lake and source table in dbt
+    primary_key: str
+    write_disposition: Dict[str, Any]
+    api_path: str
+    paginated: bool = False  # Served as pages by fastapi_pagination instead of all at once
+    page_size: int = MAX_PAGE_SIZE  # Rows per page the lake pipeline requests
+    sharded: bool = False  # Generated per shard instead of once as reference data
+    parallelized: bool = False  # Extracted in its own thread by the lake pipeline
+    # Iceberg partition transforms, e.g. "day(usage_date)", "bucket(8, user_id)" or a column name
+    partition: Tuple[str, ...] = ()
+    columns: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # Lake column type hints
+    date_columns: Tuple[str, ...] = ()  # Columns typed as DATE in the API database
+    maintenance: Dict[str, Any] = field(default_factory=dict)  # Overrides of iceberg_maintenance.MaintenancePolicy
+
+    def __post_init__(self):
+        if not 0 < self.page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page_size of {self.key} must be between 1 and {MAX_PAGE_SIZE}")
+
+    @property
+    def is_scd2(self) -> bool:
+        return self.write_disposition.get("strategy") == "scd2"
+
+
+# Tables by key, in dependency (foreign-key) order
+TABLES: Dict[str, Table] = {table.key: table for table in [
+    # Lookup tables
+    Table(
+        key="regions", table_name="regions", lake_name="regions",
+        primary_key="region_id", write_disposition=UPSERT_DISPOSITION, api_path="regions",
+    ),
+    Table(
+        key="referral_sources", table_name="referral", lake_name="referrals",
+        primary_key="referral_source_id", write_disposition=UPSERT_DISPOSITION, api_path="referral-sources",
+    ),
+    Table(
+        key="payment_methods", table_name="payment_methods", lake_name="payment_methods",
+        primary_key="payment_method_id", write_disposition=UPSERT_DISPOSITION, api_path="payment-methods",
+    ),
+    Table(
+        key="plans", table_name="plans", lake_name="plans",
+        primary_key="plan_id", write_disposition=UPSERT_DISPOSITION, api_path="plans",
+    ),
+    Table(
+        key="plan_features", table_name="features", lake_name="features",
+        primary_key="feature_id", write_disposition=UPSERT_DISPOSITION, api_path="plan-features",
+    ),
+
+    # Transactional tables
+    Table(
+        key="users", table_name="users", lake_name="users",
+        primary_key="user_id", write_disposition=SCD2_DISPOSITION, api_path="users",
+        paginated=True, sharded=True, parallelized=True,
+        partition=("bucket(8, user_id)",),
+        date_columns=("signup_date",),
+        # SCD2 merges write delete files on every load
+        maintenance={"min_delete_files": 1},
+    ),
+    Table(
+        key="subscriptions", table_name="subscriptions", lake_name="subscriptions",
+        primary_key="subscription_id", write_disposition=SCD2_DISPOSITION, api_path="subscriptions",
+        paginated=True, sharded=True, parallelized=True,
+        partition=("bucket(8, user_id)",),
+        date_columns=("start_date", "end_date"),
+        maintenance={"min_delete_files": 1},
+    ),
+    Table(
+        key="usage", table_name="usage", lake_name="usages",
+        primary_key="usage_id", write_disposition=UPSERT_DISPOSITION, api_path="usages",
+        paginated=True, sharded=True, parallelized=True,
+        partition=("day(usage_date)",),
+        # The API returns dates as strings; partitioned date columns are typed as dates
+        columns={"usage_date": {"data_type": "date"}},
+        date_columns=("usage_date",),
+        # Daily loads add one small file per day partition
+        maintenance={"small_file_mb": 32, "min_input_files": 2},
+    ),
+]}
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The generators import their siblings relative to the fake data directory, and
+# the pipeline imports the table registry from the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'fake data')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
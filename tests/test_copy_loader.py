@@ -0,0 +1,65 @@
+"""
+Parity test of the `_dlt_id` hashes copy_load writes to SCD2 tables
+
+Later DLT runs retire and insert SCD2 versions by comparing the `_dlt_id`
+of the stored rows with the hashes of the incoming ones, so the hashes
+copy_load computes must be the ones DLT's own SCD2 merge writes.
+"""
+from datetime import date
+
+import dlt
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.copy_loader import row_hashes
+from pipeline.etl_pipeline import faker_source, generate_shard
+from table_registry import MISSING_DATE, TABLES
+
+AS_OF = date(2026, 10, 19)
+SCD2_KEYS = ['users', 'subscriptions']
+
+
+def _shard() -> dict:
+    shard = generate_shard(200, np.random.SeedSequence(0), as_of=AS_OF)
+    users = shard['users'].copy()
+    # Strings JSON has to escape, including a control character
+    users.loc[0, 'first_name'] = 'Zoë "Zee"'
+    users.loc[1, 'last_name'] = 'Back\\slash'
+    users.loc[2, 'last_name'] = 'Tab\there'
+    return {'users': users, 'subscriptions': shard['subscriptions']}
+
+
+@pytest.fixture(scope='module')
+def loaded(tmp_path_factory) -> dict:
+    """The shard and the `_dlt_id` per primary key DLT wrote for each SCD2 table."""
+    workdir = tmp_path_factory.mktemp('dlt')
+    data = _shard()
+    pipeline = dlt.pipeline(
+        pipeline_name='copy_loader_parity',
+        pipelines_dir=str(workdir),
+        destination=dlt.destinations.duckdb(str(workdir / 'loaded.duckdb')),
+        dataset_name='parity',
+    )
+    pipeline.run(faker_source(data))
+    ids = {}
+    with pipeline.sql_client() as client:
+        for key in SCD2_KEYS:
+            table = TABLES[key]
+            rows = client.execute_sql(f"SELECT {table.primary_key}, _dlt_id FROM {table.table_name}")
+            ids[key] = dict(rows)
+    return {'data': data, 'ids': ids}
+
+
+@pytest.mark.parametrize('key', SCD2_KEYS)
+def test_row_hashes_match_dlt_scd2_ids(loaded, key):
+    table = TABLES[key]
+    # copy_load hashes the rows as DLT receives them, with missing dates as None
+    df = loaded['data'][key].replace({column: {MISSING_DATE: None} for column in table.date_columns})
+    expected = df[table.primary_key].map(loaded['ids'][key])
+    assert expected.notna().all()
+    assert row_hashes(df) == expected.tolist()
+
+
+def test_row_hashes_of_an_empty_frame():
+    assert row_hashes(pd.DataFrame({'user_id': pd.Series([], dtype=str)})) == []
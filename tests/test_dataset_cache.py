@@ -0,0 +1,38 @@
+"""
+Tests of the dataset cache's handling of concurrent writers
+"""
+import pandas as pd
+
+from pipeline import dataset_cache
+from pipeline.dataset_cache import DatasetCache
+
+KEY = 'dataset'
+
+
+def _data(value: int) -> dict:
+    return {'users': pd.DataFrame({'user_id': [f'u{value}'], 'plan_id': [value]})}
+
+
+def test_store_round_trip(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    assert cache.load(KEY) is None
+    assert cache.store(KEY, _data(1)) == tmp_path / KEY
+    pd.testing.assert_frame_equal(cache.load(KEY)['users'], _data(1)['users'])
+
+
+def test_store_keeps_the_entry_of_a_concurrent_writer(tmp_path, monkeypatch):
+    cache = DatasetCache(str(tmp_path))
+    mkdtemp = dataset_cache.tempfile.mkdtemp
+
+    def mkdtemp_after_other_writer(*args, **kwargs):
+        # Another process stores the key while this one is still staging it
+        monkeypatch.setattr(dataset_cache.tempfile, 'mkdtemp', mkdtemp)
+        DatasetCache(str(tmp_path)).store(KEY, _data(1))
+        return mkdtemp(*args, **kwargs)
+
+    monkeypatch.setattr(dataset_cache.tempfile, 'mkdtemp', mkdtemp_after_other_writer)
+    assert cache.store(KEY, _data(2)) == tmp_path / KEY
+
+    pd.testing.assert_frame_equal(cache.load(KEY)['users'], _data(1)['users'])
+    # The staging directory of the losing writer is removed
+    assert [path.name for path in tmp_path.iterdir()] == [KEY]
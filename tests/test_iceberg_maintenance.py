@@ -0,0 +1,79 @@
+"""
+Tests of the pyiceberg maintenance stage on a local SQL catalog
+
+pyiceberg is an optional dependency of the filesystem destination, so the
+tests are skipped without it.
+"""
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pyarrow as pa
+import pytest
+
+pytest.importorskip("pyiceberg.catalog.sql")
+from pyiceberg.catalog.sql import SqlCatalog  # noqa: E402
+
+from pipeline.iceberg_maintenance import MaintenancePolicy, TableMetrics, maintain_iceberg_table  # noqa: E402
+
+PLAN_IDS = [1, 2]
+APPENDS = 3
+# Retention of one hour, measured from two hours after the appends
+POLICY = MaintenancePolicy(min_input_files=APPENDS, max_snapshot_age_hours=1)
+
+
+def _batch(start: int) -> pa.Table:
+    """Four rows spread over both partitions."""
+    return pa.table({
+        "usage_id": pa.array([f"u{i:03d}" for i in range(start, start + 4)]),
+        "plan_id": pa.array([PLAN_IDS[i % 2] for i in range(4)], pa.int64()),
+        "api_calls": pa.array(range(start, start + 4), pa.int64()),
+    })
+
+
+@pytest.fixture
+def table(tmp_path):
+    """A table partitioned by plan_id, with one small data file per partition and append."""
+    catalog = SqlCatalog(
+        "local", uri=f"sqlite:///{tmp_path / 'catalog.db'}", warehouse=(tmp_path / "warehouse").as_uri()
+    )
+    catalog.create_namespace("lake")
+    table = catalog.create_table(("lake", "usage"), schema=_batch(0).schema)
+    with table.update_spec() as update:
+        update.add_identity("plan_id")
+    for append in range(APPENDS):
+        table.append(_batch(append * 4))
+    return table
+
+
+def _rows(table) -> list:
+    return sorted(table.refresh().scan().to_arrow().to_pylist(), key=lambda row: row["usage_id"])
+
+
+def _files_on_disk(table) -> list:
+    return list(Path(urlparse(table.location()).path, "data").rglob("*.parquet"))
+
+
+def test_maintenance_compacts_expires_and_removes_orphans(table):
+    rows = _rows(table)
+    now = datetime.now(timezone.utc) + timedelta(hours=2)
+
+    before, after = maintain_iceberg_table(table, POLICY, now=now)
+
+    assert (before.data_files, before.delete_files, before.snapshots) == (len(PLAN_IDS) * APPENDS, 0, APPENDS)
+    assert after == TableMetrics(data_files=len(PLAN_IDS), data_bytes=after.data_bytes, delete_files=0, snapshots=1)
+    assert after.data_bytes < before.data_bytes
+    assert _rows(table) == rows
+    # The replaced files of the expired snapshots are deleted
+    assert len(_files_on_disk(table)) == after.data_files
+
+
+def test_maintenance_keeps_recent_snapshots_and_small_partitions(table):
+    rows = _rows(table)
+    policy = MaintenancePolicy(min_input_files=APPENDS + 1)
+
+    before, after = maintain_iceberg_table(table, policy)
+
+    assert after == before
+    assert _rows(table) == rows
+    assert len(_files_on_disk(table)) == before.data_files